@@ -0,0 +1,71 @@
+"""
+Benchmark: query-worker startup and first lookups, JSON index
+(load_index_json) vs. memory-mapped binary index (BinaryIndex).
+
+Run from the repository root:
+    python benchmarks/bench_binary_index.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from index.binary_storage import BinaryIndex, convert_json_to_binary
+from index.indexer import Indexer
+from index.storage import load_index_json, save_index_json
+
+
+def build_index(n_docs: int, tokens_per_doc: int, vocab_size: int = 50000, seed: int = 42) -> Indexer:
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+    idx = Indexer()
+    for i in range(n_docs):
+        idx.add_document(rng.choices(vocab, weights=weights, k=tokens_per_doc), f"https://example.com/{i}.pdf")
+    return idx
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms  peak {peak / 1e6:8.1f} MB")
+    return result
+
+
+def main(n_docs: int = 2000, tokens_per_doc: int = 2000):
+    idx = build_index(n_docs, tokens_per_doc)
+    queries = ["term1", "term10", "term100", "term1000", "term10000", "missing"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "index.json")
+        bin_dir = os.path.join(tmp, "bin")
+        save_index_json(idx, json_path)
+        convert_json_to_binary(json_path, bin_dir)
+
+        json_size = os.path.getsize(json_path)
+        bin_size = sum(os.path.getsize(os.path.join(bin_dir, name)) for name in os.listdir(bin_dir))
+        print(f"{len(idx.terms)} terms, {n_docs} docs; JSON {json_size / 1e6:.1f} MB, binary {bin_size / 1e6:.1f} MB")
+
+        def json_worker():
+            index, docs = load_index_json(json_path)
+            return [len(index.get(q, {})) for q in queries]
+
+        def binary_worker():
+            with BinaryIndex(bin_dir) as index:
+                return [len(index.doc_ids(q)) for q in queries]
+
+        a = measure("JSON: load + 6 lookups", json_worker)
+        b = measure("binary (mmap): open + 6 lookups", binary_worker)
+        assert a == b, "indexes disagree"
+
+
+if __name__ == "__main__":
+    main()
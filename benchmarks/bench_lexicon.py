@@ -0,0 +1,55 @@
+"""
+Benchmark: wildcard and fuzzy term expansion, Lexicon (sorted terms +
+k-gram index) vs. scanning the whole vocabulary.
+
+Run from the repository root:
+    python benchmarks/bench_lexicon.py
+"""
+import fnmatch
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from index.lexicon import Lexicon, edit_distance
+
+
+def make_vocabulary(n_terms: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    letters = "abcdefghiklmnoprstuvwy"
+    terms = {"".join(rng.choice(letters) for _ in range(rng.randint(3, 14))) for _ in range(n_terms)}
+    terms.update(["sustainability", "sustainable", "recycling", "wastewater"])
+    return sorted(terms)
+
+
+def timed(fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    terms = make_vocabulary(300_000)
+    start = time.perf_counter()
+    lexicon = Lexicon(terms)
+    print(f"Vocabulary: {len(terms)} terms, lexicon built in {time.perf_counter() - start:.1f}s\n")
+
+    for pattern in ["sustainab*", "*ability", "re*cling", "*stew*"]:
+        indexed, found = timed(lambda: lexicon.wildcard(pattern))
+        scanned, expected = timed(lambda: fnmatch.filter(terms, pattern), repeat=1)
+        assert found == sorted(expected)
+        print(f"wildcard {pattern:<14} {len(found):6d} terms  lexicon {indexed * 1000:8.2f} ms  scan {scanned * 1000:8.1f} ms")
+
+    for word in ["sustainibility", "recyclign"]:
+        indexed, found = timed(lambda: lexicon.fuzzy(word, 2))
+        scanned, _ = timed(lambda: [t for t in terms if edit_distance(word, t, 2) <= 2], repeat=1)
+        print(f"fuzzy    {word:<14} {len(found):6d} terms  lexicon {indexed * 1000:8.2f} ms  scan {scanned * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
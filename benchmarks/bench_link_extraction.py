@@ -0,0 +1,80 @@
+"""
+Benchmark: streaming LinkExtractor vs. the previous BeautifulSoup-based
+SpectrumCrawler._extract_links.
+
+Run from the repository root:
+    python benchmarks/bench_link_extraction.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bs4 import BeautifulSoup
+
+from crawler.links import LinkExtractor
+from crawler.utils import normalize_url, in_same_domain
+
+
+ROOT = "https://spectrum.library.concordia.ca"
+
+
+def make_listing_page(n_items: int, first: int = 0) -> str:
+    """
+    Synthetic Spectrum-style listing page: a navigation header repeated on
+    every page plus one entry (abstract page + PDF) per item, numbered
+    from first.
+    """
+    nav = "".join(f'<li><a href="/view/{name}/">{name}</a></li>' for name in (
+        "year", "divisions", "subjects", "type", "creators", "browse", "search", "help"
+    ))
+    items = "".join(
+        f'<div class="ep_item"><span class="title">Thesis {i}</span>'
+        f'<a href="/id/eprint/{i}/">abstract</a> '
+        f'<a href="/id/eprint/{i}/1/thesis_{i}.pdf">PDF</a>'
+        f'<a href="https://doi.org/10.1000/{i}">doi</a></div>'
+        for i in range(first, first + n_items)
+    )
+    return f"<html><head><title>Listing</title></head><body><ul>{nav}</ul>{items}</body></html>"
+
+
+def soup_extract(base_url: str, html: str, domain_root: str) -> list[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    collected = []
+    for tag in soup.find_all("a"):
+        normalized = normalize_url(base_url, tag.get("href"))
+        if not normalized or not in_same_domain(normalized, domain_root):
+            continue
+        collected.append(normalized)
+    return collected
+
+
+def bench(label, fn, pages):
+    start = time.perf_counter()
+    total = 0
+    for url, html in pages:
+        total += len(fn(url, html))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed * 1000:9.1f} ms  ({len(pages) / elapsed:8.1f} pages/s, {total} links)")
+    return elapsed
+
+
+def main(n_pages: int = 200, items_per_page: int = 100):
+    # Every page URL is distinct, as in a crawl; only the navigation repeats
+    pages = [(f"{ROOT}/view/year/{i}.html", make_listing_page(items_per_page, i * items_per_page)) for i in range(n_pages)]
+    print(f"{n_pages} pages x {items_per_page} items ({sum(len(h) for _, h in pages) / 1e6:.1f} MB of HTML)")
+
+    extractor = LinkExtractor(ROOT)
+    reference = soup_extract(pages[0][0], pages[0][1], ROOT)
+    assert extractor.extract(*pages[0]) == reference, "extractors disagree"
+
+    old = bench("BeautifulSoup", lambda url, html: soup_extract(url, html, ROOT), pages)
+    new = bench("LinkExtractor", extractor.extract, pages)
+    print(f"speedup: {old / new:.1f}x")
+    info = extractor.cache_info()
+    print(f"resolution cache: {info.hits} hits, {info.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
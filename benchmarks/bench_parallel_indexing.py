@@ -0,0 +1,72 @@
+"""
+Benchmark: indexing throughput of build_index_parallel() by worker count,
+against the single-process Tokenizer + Indexer loop. Also checks that every
+parallel build is identical to the single-process index.
+
+Run from the repository root:
+    python benchmarks/bench_parallel_indexing.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from index.indexer import Indexer
+from index.parallel import build_index_parallel
+from index.tokenizer import Tokenizer
+
+
+def make_documents(n_docs: int, words_per_doc: int, vocab_size: int = 30000, seed: int = 42):
+    """
+    Synthetic (url, text) documents with a Zipf-like word distribution.
+    """
+    rng = random.Random(seed)
+    syllables = ["sus", "tain", "abil", "ity", "was", "te", "man", "age", "ment", "en",
+                 "vir", "on", "re", "cy", "cling", "pol", "icy", "ana", "lys", "is"]
+    vocab = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(vocab_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+    return [
+        (f"https://example.com/{i}.pdf", " ".join(rng.choices(vocab, weights=weights, k=words_per_doc)))
+        for i in range(n_docs)
+    ]
+
+
+def same_index(a: Indexer, b: Indexer) -> bool:
+    return (
+        a.terms == b.terms
+        and a.postings_docs == b.postings_docs
+        and a.postings_tfs == b.postings_tfs
+        and {k: dict(v) for k, v in a.docs.items()} == {k: dict(v) for k, v in b.docs.items()}
+    )
+
+
+def main(n_docs: int = 2000, words_per_doc: int = 3000, use_stemming: bool = False):
+    docs = make_documents(n_docs, words_per_doc)
+    mb = sum(len(text) for _, text in docs) / 1e6
+    print(f"{n_docs} documents x {words_per_doc} words ({mb:.0f} MB of text), stemming={use_stemming}, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    tokenizer = Tokenizer(use_stemming=use_stemming)
+    reference = Indexer()
+    for url, text in docs:
+        reference.add_document(tokenizer.tokenize(text), url)
+    base = time.perf_counter() - start
+    print(f"{'single process':<16} {base:7.2f} s  {n_docs / base:8.0f} docs/s  {mb / base:6.1f} MB/s")
+
+    for workers in (1, 2, 4, 8):
+        if workers > (os.cpu_count() or 1) * 2:
+            break
+        start = time.perf_counter()
+        idx = build_index_parallel(docs, workers=workers, use_stemming=use_stemming)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{workers:2d} workers       {elapsed:7.2f} s  {n_docs / elapsed:8.0f} docs/s  "
+            f"{mb / elapsed:6.1f} MB/s  speedup {base / elapsed:4.2f}x  "
+            f"identical={same_index(idx, reference)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: postings size and decode speed, raw arrays vs. gap + vbyte
+compression (index.compression), plus on-disk JSON size of both formats.
+
+Run from the repository root:
+    python benchmarks/bench_postings_compression.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from index.compression import decode_postings, iter_postings
+from index.indexer import Indexer
+from index.storage import save_index_json
+
+
+def make_documents(n_docs: int, tokens_per_doc: int, vocab_size: int = 50000, seed: int = 42):
+    """
+    Token lists with a Zipf-like term distribution.
+    """
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+    for _ in range(n_docs):
+        yield rng.choices(vocab, weights=weights, k=tokens_per_doc)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(n_docs: int = 2000, tokens_per_doc: int = 2000):
+    plain = Indexer()
+    packed = Indexer(compress=True)
+    for i, tokens in enumerate(make_documents(n_docs, tokens_per_doc)):
+        url = f"https://example.com/{i}.pdf"
+        plain.add_document(tokens, url)
+        packed.add_document(tokens, url)
+
+    n_postings = sum(packed.doc_freqs)
+    raw_bytes = sum(a.itemsize * len(a) for a in plain.postings_docs + plain.postings_tfs)
+    vbyte_bytes = sum(len(data) for data in packed.postings_data)
+    print(f"{n_docs} documents, {len(plain.terms)} terms, {n_postings} postings")
+    print(f"raw arrays     {raw_bytes / 1e6:8.2f} MB  ({raw_bytes / n_postings:.2f} bytes/posting)")
+    print(f"gap + vbyte    {vbyte_bytes / 1e6:8.2f} MB  ({vbyte_bytes / n_postings:.2f} bytes/posting)")
+
+    # Decode speed over the whole index
+    _, t_raw = timed(lambda: sum(tf for d, t in zip(plain.postings_docs, plain.postings_tfs) for tf in t))
+    _, t_iter = timed(lambda: sum(tf for data in packed.postings_data for _, tf in iter_postings(data)))
+    _, t_full = timed(lambda: [decode_postings(data) for data in packed.postings_data])
+    print(f"scan raw arrays          {t_raw * 1000:8.1f} ms  ({n_postings / t_raw / 1e6:6.2f} M postings/s)")
+    print(f"iter_postings (lazy)     {t_iter * 1000:8.1f} ms  ({n_postings / t_iter / 1e6:6.2f} M postings/s)")
+    print(f"decode_postings (full)   {t_full * 1000:8.1f} ms  ({n_postings / t_full / 1e6:6.2f} M postings/s)")
+
+    # Long lists only (the frequent terms queries spend most time on)
+    long_lists = [data for data in packed.postings_data if len(data) >= 1024]
+    n_long = sum(packed.doc_freqs[i] for i, data in enumerate(packed.postings_data) if len(data) >= 1024)
+    _, t_iter = timed(lambda: sum(tf for data in long_lists for _, tf in iter_postings(data)))
+    _, t_full = timed(lambda: [decode_postings(data) for data in long_lists])
+    print(f"{len(long_lists)} long lists ({n_long} postings):")
+    print(f"  iter_postings (lazy)   {t_iter * 1000:8.1f} ms  ({n_long / t_iter / 1e6:6.2f} M postings/s)")
+    print(f"  decode_postings (full) {t_full * 1000:8.1f} ms  ({n_long / t_full / 1e6:6.2f} M postings/s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compress in (False, True):
+            path = os.path.join(tmp, "index.json")
+            _, elapsed = timed(lambda: save_index_json(plain, path, compress=compress))
+            label = "compressed" if compress else "plain"
+            print(f"JSON ({label:<10}) {os.path.getsize(path) / 1e6:8.2f} MB, saved in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
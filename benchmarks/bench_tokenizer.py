@@ -0,0 +1,91 @@
+"""
+Benchmark: Tokenizer (compiled single-pass regex + stem cache) vs. the
+previous implementation (uncompiled re.sub + split + per-occurrence stemming).
+
+Run from the repository root:
+    python benchmarks/bench_tokenizer.py
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from index.tokenizer import STOPWORDS, Tokenizer
+
+
+class LegacyTokenizer:
+    """
+    The tokenizer as it was before the fast path, kept for comparison.
+    """
+
+    def __init__(self, use_stemming: bool = False):
+        self.use_stemming = use_stemming
+        if use_stemming:
+            from nltk.stem import SnowballStemmer
+            self.stemmer = SnowballStemmer("english")
+
+    def tokenize(self, text: str) -> list[str]:
+        if not text:
+            return []
+        text = text.lower()
+        text = re.sub(r"[^a-z0-9]+", " ", text)
+        tokens = text.split()
+        tokens = [tok for tok in tokens if tok not in STOPWORDS]
+        if self.use_stemming:
+            tokens = [self.stemmer.stem(tok) for tok in tokens]
+        return tokens
+
+
+def make_corpus(n_docs: int, words_per_doc: int, vocab_size: int = 20000, seed: int = 42) -> list[str]:
+    """
+    Synthetic documents with a Zipf-like word distribution, punctuation and
+    mixed case, roughly like text extracted from theses.
+    """
+    rng = random.Random(seed)
+    syllables = ["sus", "tain", "abil", "ity", "was", "te", "man", "age", "ment", "en",
+                 "vir", "on", "re", "cy", "cling", "pol", "icy", "ana", "lys", "is"]
+    vocab = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(vocab_size)]
+    vocab += sorted(STOPWORDS)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+
+    docs = []
+    for _ in range(n_docs):
+        words = rng.choices(vocab, weights=weights, k=words_per_doc)
+        words = [w.capitalize() if rng.random() < 0.1 else w for w in words]
+        docs.append(" ".join(w + rng.choice(["", "", "", ",", ".", ";", " (1)"]) for w in words))
+    return docs
+
+
+def bench(label, fn, docs):
+    start = time.perf_counter()
+    n_tokens = sum(len(fn(doc)) for doc in docs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<38} {elapsed * 1000:9.1f} ms  ({n_tokens / elapsed / 1e6:6.2f} M tokens/s)")
+    return elapsed
+
+
+def main(n_docs: int = 200, words_per_doc: int = 5000):
+    docs = make_corpus(n_docs, words_per_doc)
+    print(f"{n_docs} documents x {words_per_doc} words")
+
+    for stemming in (False, True):
+        legacy = LegacyTokenizer(use_stemming=stemming)
+        fast = Tokenizer(use_stemming=stemming)
+        assert legacy.tokenize(docs[0]) == fast.tokenize(docs[0]), "tokenizers disagree"
+
+        suffix = "stemmed" if stemming else "unstemmed"
+        old = bench(f"legacy ({suffix})", legacy.tokenize, docs)
+        new = bench(f"Tokenizer ({suffix})", fast.tokenize, docs)
+
+        chunked = lambda doc: list(fast.tokenize_stream(doc[i:i + 8192] for i in range(0, len(doc), 8192)))
+        bench(f"Tokenizer.tokenize_stream ({suffix})", chunked, docs)
+        print(f"speedup ({suffix}): {old / new:.1f}x")
+        if stemming:
+            print(f"stem cache: {fast.stem_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,41 @@
 import os
 import json
+from array import array
+
 import numpy as np #https://pypi.org/project/numpy/2.3.5/
-from sklearn.feature_extraction.text import TfidfVectorizer #https://pypi.org/project/scikit-learn/1.7.2/
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfTransformer, TfidfVectorizer #https://pypi.org/project/scikit-learn/1.7.2/
 from sklearn.cluster import KMeans
 
+from index.forward import ForwardIndex, forward_path_for
 from index.storage import load_index_json
 
 
 class ClusterEngine:
     """
     Handles TF-IDF vectorization and K-Means clustering on the indexed documents.
+
+    If forward_path points to a forward index (see index.forward), the
+    TF-IDF matrix is built straight from the stored term vectors; otherwise
+    each document is rebuilt as a string from the inverted index and
+    re-tokenized by TfidfVectorizer. Both give the same matrix.
     """
 
-    def __init__(self, index_path: str = "data/index.json"):
-        self.index, self.docs_meta = load_index_json(index_path)
+    def __init__(self, index_path: str = "data/index.json", forward_path: str | None = None):
+        self.forward = ForwardIndex(forward_path) if forward_path else None
 
-        # Reconstruct corpus as one string per document
-        self.corpus = self._build_corpus()
+        if self.forward is not None:
+            self.index = None
+            self.docs_meta = {
+                str(doc_id): {"url": url, "length": length}
+                for doc_id, url, length in self.forward.documents()
+            }
+            self.corpus = None
+        else:
+            self.index, self.docs_meta = load_index_json(index_path)
+
+            # Reconstruct corpus as one string per document
+            self.corpus = self._build_corpus()
 
         # TF-IDF vectorizer (configure for medium-sized academic texts)
         self.vectorizer = TfidfVectorizer(
@@ -56,12 +75,64 @@ class ClusterEngine:
         """
         Compute the TF-IDF matrix for the corpus.
         """
+        if self.forward is not None:
+            self._vectorize_forward()
+            return
+
         if not self.corpus:
             raise ValueError("Corpus is empty — ensure documents were indexed.")
 
         self.tfidf_matrix = self.vectorizer.fit_transform(self.corpus)
         self.feature_names = self.vectorizer.get_feature_names_out()
 
+    def _vectorize_forward(self):
+        """
+        Build the TF-IDF matrix from forward-index term vectors.
+        Applies the same vocabulary filtering as self.vectorizer
+        (tokens of 2+ characters, English stop words, max_df, min_df),
+        with features in alphabetical order, then TfidfTransformer.
+        """
+        terms = self.forward.terms
+
+        # Count matrix straight from the stored vectors (CSR, one row per doc)
+        indptr = [0]
+        indices = array("I")
+        counts = array("I")
+        for _, term_ids, tfs in self.forward:
+            indices.extend(term_ids)
+            counts.extend(tfs)
+            indptr.append(len(indices))
+
+        n_docs = len(indptr) - 1
+        if not n_docs:
+            raise ValueError("Corpus is empty — ensure documents were indexed.")
+
+        counts_matrix = csr_matrix(
+            (np.frombuffer(counts, dtype=np.uint32).astype(np.int64),
+             np.frombuffer(indices, dtype=np.uint32).astype(np.int32),
+             np.array(indptr, dtype=np.int64)),
+            shape=(n_docs, len(terms))
+        )
+
+        # Same filtering as the vectorizer's analyzer + document-frequency limits
+        vec = self.vectorizer
+        stop_words = ENGLISH_STOP_WORDS if vec.stop_words == "english" else frozenset(vec.stop_words or ())
+        doc_freq = np.bincount(np.frombuffer(indices, dtype=np.uint32), minlength=len(terms))
+        max_doc_count = vec.max_df if isinstance(vec.max_df, int) else vec.max_df * n_docs
+        min_doc_count = vec.min_df if isinstance(vec.min_df, int) else vec.min_df * n_docs
+
+        kept = [
+            term_id for term_id, term in enumerate(terms)
+            if len(term) >= 2 and term not in stop_words
+            and min_doc_count <= doc_freq[term_id] <= max_doc_count
+        ]
+        if not kept:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+        kept.sort(key=terms.__getitem__)
+
+        self.tfidf_matrix = TfidfTransformer().fit_transform(counts_matrix[:, kept])
+        self.feature_names = np.array([terms[i] for i in kept], dtype=object)
+
     def run_kmeans(self, k: int, output_dir: str):
         """
         Run K-Means clustering with k clusters.
@@ -129,11 +200,28 @@ class ClusterEngine:
                 f.write("\n")
 
 
-def run_all_clusters(index_path="data/index.json"):
+def find_forward_index(index_path: str, forward_path: str | None = None) -> str | None:
+    """
+    The forward index to cluster the index at index_path with: forward_path
+    or the one the pipeline saved next to the index. None if it is missing
+    or older than the index (then it describes an earlier build).
+    """
+    forward_path = forward_path or forward_path_for(index_path)
+    if not os.path.exists(forward_path):
+        return None
+    if os.path.getmtime(forward_path) < os.path.getmtime(index_path):
+        print(f"[Warning] {forward_path} is older than {index_path}; rebuilding documents from the index")
+        return None
+    return forward_path
+
+
+def run_all_clusters(index_path="data/index.json", forward_path=None):
     """
     Run TF-IDF → KMeans for k = 2, 10, 20.
+    Uses the forward index of index_path when the pipeline wrote one.
     """
-    engine = ClusterEngine(index_path)
+    forward_path = find_forward_index(index_path, forward_path)
+    engine = ClusterEngine(index_path, forward_path)
     engine.vectorize()
 
     cluster_settings = {
@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Persistent, size-bounded HTTP response cache for conditional GETs.
+
+    Layout on disk:
+        <directory>/index.json            url -> entry (validators, digest, size, last access)
+        <directory>/objects/ab/abcd...    response bodies, content-addressed by SHA-256
+
+    Bodies are stored once per digest, so identical PDFs served from several
+    URLs share one object. When the total object size exceeds max_bytes the
+    least recently used URLs are evicted until it fits again.
+
+    The URL index is rewritten every flush_every stores rather than on each
+    one (it grows with the cache); call flush() when done to save the rest.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024 ** 3, flush_every: int = 100):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_every = max(1, flush_every)
+        self.objects_dir = os.path.join(directory, "objects")
+        self.index_path = os.path.join(directory, "index.json")
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._unflushed_stores = 0
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.entries = self._load_index()
+
+        # digest -> number of URLs sharing that body, and total stored bytes
+        self._refs = {}
+        self._bytes = 0
+        for entry in self.entries.values():
+            self._ref(entry)
+
+    # ------------------------------------------------------------------
+    # Index persistence
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        # Drop entries whose body has gone missing
+        return {
+            url: entry for url, entry in entries.items()
+            if os.path.exists(self._object_path(entry["digest"]))
+        }
+
+    def flush(self):
+        """
+        Write the URL index to disk if it changed.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+            self._unflushed_stores = 0
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def conditional_headers(self, url: str) -> dict:
+        """
+        If-None-Match / If-Modified-Since headers for a cached URL.
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def lookup(self, url: str) -> dict | None:
+        """
+        Return the cache entry for url and mark it as recently used.
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                entry["atime"] = time.time()
+                self._dirty = True
+            return entry
+
+    def read(self, url: str) -> bytes | None:
+        """
+        Return the cached body for url, or None if it is not cached.
+        """
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        try:
+            with open(self._object_path(entry["digest"]), "rb") as f:
+                return f.read()
+        except OSError:
+            self.remove(url)
+            return None
+
+    def open(self, url: str):
+        """
+        Open the cached body for url as a binary file, or return None.
+        """
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        try:
+            return open(self._object_path(entry["digest"]), "rb")
+        except OSError:
+            self.remove(url)
+            return None
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def is_cacheable(headers) -> bool:
+        """
+        Only responses carrying a validator can be revalidated later.
+        """
+        return bool(headers.get("ETag") or headers.get("Last-Modified"))
+
+    def store(self, url: str, headers, body: bytes) -> bool:
+        """
+        Cache a 200 response body. Returns False if it has no validators.
+        """
+        if not self.is_cacheable(headers):
+            return False
+
+        digest = hashlib.sha256(body).hexdigest()
+        self._add_entry(url, headers, digest, len(body), body=body)
+        return True
+
+    def store_file(self, url: str, headers, fileobj) -> bool:
+        """
+        Cache a body that was spooled to a file (e.g. a streamed PDF).
+        The file is read from its current start and rewound afterwards.
+        """
+        if not self.is_cacheable(headers):
+            return False
+
+        fileobj.seek(0)
+        hasher = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir)
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = fileobj.read(1024 * 1024)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        fileobj.seek(0)
+
+        self._add_entry(url, headers, hasher.hexdigest(), size, tmp_path=tmp_path)
+        return True
+
+    def _ref(self, entry: dict):
+        digest = entry["digest"]
+        count = self._refs.get(digest, 0)
+        if count == 0:
+            self._bytes += entry["size"]
+        self._refs[digest] = count + 1
+
+    def _unref(self, entry: dict):
+        """
+        Release one reference to a body and delete it once unused.
+        Caller holds the lock.
+        """
+        digest = entry["digest"]
+        count = self._refs.get(digest, 0) - 1
+        if count > 0:
+            self._refs[digest] = count
+            return
+
+        self._refs.pop(digest, None)
+        self._bytes -= entry["size"]
+        try:
+            os.remove(self._object_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _write_object(self, digest: str, body: bytes | None, tmp_path: str | None):
+        """
+        Put a body in the object store (from memory, or by moving the file
+        it was spooled to) unless it is already there. Caller holds the
+        lock, so _unref() cannot delete the object between this check and
+        the new entry referencing it.
+        """
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            if tmp_path is not None:
+                os.remove(tmp_path)
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if tmp_path is None:
+            fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+        os.replace(tmp_path, path)
+
+    def _add_entry(self, url: str, headers, digest: str, size: int, body: bytes | None = None, tmp_path: str | None = None):
+        with self._lock:
+            self._write_object(digest, body, tmp_path)
+            entry = {
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "content_type": headers.get("Content-Type"),
+                "digest": digest,
+                "size": size,
+                "atime": time.time(),
+            }
+            # Reference the new body before releasing the old one so an
+            # unchanged body is never deleted
+            self._ref(entry)
+            old = self.entries.get(url)
+            if old is not None:
+                self._unref(old)
+            self.entries[url] = entry
+            self._dirty = True
+            self._evict()
+            self._unflushed_stores += 1
+            due = self._unflushed_stores >= self.flush_every
+        if due:
+            self.flush()
+
+    def remove(self, url: str):
+        with self._lock:
+            entry = self.entries.pop(url, None)
+            if entry is not None:
+                self._unref(entry)
+                self._dirty = True
+
+    def total_bytes(self) -> int:
+        """
+        Size of all stored bodies (shared objects counted once).
+        """
+        with self._lock:
+            return self._bytes
+
+    def _evict(self):
+        """
+        Drop least recently used URLs until the cache fits in max_bytes.
+        Caller holds the lock.
+        """
+        if self._bytes <= self.max_bytes:
+            return
+
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]["atime"]):
+            if self._bytes <= self.max_bytes:
+                break
+            del self.entries[url]
+            self._unref(entry)
+
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        with self._lock:
+            self.entries = {}
+            self._refs = {}
+            self._bytes = 0
+            shutil.rmtree(self.objects_dir, ignore_errors=True)
+            os.makedirs(self.objects_dir, exist_ok=True)
+            self._dirty = True
+        self.flush()
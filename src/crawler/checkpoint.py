@@ -0,0 +1,80 @@
+import json
+import os
+
+
+class CrawlCheckpoint:
+    """
+    Compact on-disk snapshot of a crawl: frontier, URL seen-set, visited
+    page count and PDF list.
+    Snapshots are written to a temporary file and atomically swapped in,
+    so a crash mid-write never leaves a corrupt checkpoint behind.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def save(
+        self,
+        seed_url: str,
+        frontier,
+        seen_state: dict,
+        visited_count: int,
+        pdf_links,
+        visited_log_size: int = 0
+    ):
+        """
+        Write the current crawl state.
+        seen_state is the JSON-friendly form of the seen-set (see seen.seen_to_state);
+        visited_log_size is the size of the visited-page log at snapshot time.
+        """
+        data = {
+            "version": self.VERSION,
+            "seed_url": seed_url,
+            "frontier": list(frontier),
+            "seen": seen_state,
+            "visited_count": visited_count,
+            "visited_log_size": visited_log_size,
+            "pdf_links": list(pdf_links),
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def load(self, seed_url: str) -> dict | None:
+        """
+        Load the last snapshot for seed_url.
+        Returns None if there is no usable checkpoint (missing, unreadable,
+        or written for a different seed).
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != self.VERSION or data.get("seed_url") != seed_url:
+            return None
+
+        return data
+
+    def clear(self):
+        """
+        Remove the checkpoint once a crawl has finished.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,279 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests #https://pypi.org/project/requests/2.32.5/
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+USER_AGENT = "SpectrumCrawler/1.0 (COMP479 project)"
+
+# Status codes worth retrying (server overload / transient gateway errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchStats:
+    """
+    Thread-safe counters for every request made through an HttpClient.
+    Keeps totals plus a bounded history of per-request records:
+        (url, status, elapsed_seconds, bytes, attempts)
+    """
+
+    def __init__(self, history_size: int = 1000):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self.cache_hits = 0
+        self.bytes_saved = 0
+        self.history = deque(maxlen=history_size)
+
+    def record(self, url: str, status: int | None, elapsed: float, nbytes: int, attempts: int):
+        with self._lock:
+            self.requests += 1
+            self.retries += attempts - 1
+            self.bytes += nbytes
+            self.elapsed += elapsed
+            if status is None:
+                self.failures += 1
+            self.history.append((url, status, elapsed, nbytes, attempts))
+
+    def record_cache_hit(self, nbytes: int):
+        """
+        A 304 let us reuse nbytes of cached body instead of downloading it.
+        """
+        with self._lock:
+            self.cache_hits += 1
+            self.bytes_saved += nbytes
+
+    def add_bytes(self, nbytes: int):
+        """
+        Account for bytes read later from a streamed response.
+        """
+        with self._lock:
+            self.bytes += nbytes
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = sorted(rec[2] for rec in self.history)
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "retries": self.retries,
+                "bytes": self.bytes,
+                "cache_hits": self.cache_hits,
+                "bytes_saved": self.bytes_saved,
+                "mean_latency": self.elapsed / self.requests if self.requests else 0.0,
+                "p50_latency": _percentile(latencies, 0.50),
+                "p95_latency": _percentile(latencies, 0.95),
+            }
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    pos = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[pos]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds.
+    Returns None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class HttpClient:
+    """
+    Shared HTTP layer for the crawler, robots.txt and PDF downloads.
+    - keep-alive connection pooling through one requests.Session
+    - bounded retries with exponential backoff and full jitter
+    - honours Retry-After on 429/503
+    - records per-request latency and bytes in self.stats
+    - optional ResponseCache: cached URLs are revalidated with
+      If-None-Match / If-Modified-Since and a 304 is answered from disk
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        user_agent: str = USER_AGENT,
+        cache=None
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = user_agent
+
+        self.stats = FetchStats()
+        self.cache = cache
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        """
+        Delay before retry number `attempt` (0-based).
+        Retry-After wins when the server provides it (capped at backoff_max).
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def get(
+        self,
+        url: str,
+        timeout: float | None = None,
+        headers: dict | None = None,
+        stream: bool = False
+    ) -> requests.Response | None:
+        """
+        GET with retries.
+        Returns the final Response (which may still be an error status once
+        retries are exhausted) or None if no response could be obtained.
+        With a cache, cached URLs are revalidated and a 304 is answered
+        with the cached body.
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        conditional = self.cache.conditional_headers(url) if self.cache is not None else {}
+        if conditional:
+            resp = self._send(url, timeout, {**conditional, **(headers or {})}, stream)
+            if resp is not None and resp.status_code == 304:
+                cached = self._from_cache(url, resp)
+                if cached is not None:
+                    return cached
+                # The entry was evicted (or its body lost) after the
+                # validators were sent: fetch the body again
+                resp.close()
+                resp = self._send(url, timeout, headers, stream)
+        else:
+            resp = self._send(url, timeout, headers, stream)
+
+        if resp is not None and self.cache is not None and resp.status_code == 200 and not stream:
+            self.cache.store(url, resp.headers, resp.content)
+        return resp
+
+    def _send(self, url: str, timeout: float, headers: dict | None, stream: bool) -> requests.Response | None:
+        """
+        One GET with retries, recorded in the stats.
+        """
+        start = time.perf_counter()
+        resp = None
+        attempt = 0
+
+        while True:
+            try:
+                resp = self.session.get(url, timeout=timeout, headers=headers, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                resp = None
+            except requests.RequestException:
+                # Invalid URL, too many redirects, ... : retrying will not help
+                resp = None
+                break
+
+            retryable = resp is None or resp.status_code in RETRY_STATUSES
+            if not retryable or attempt >= self.max_retries:
+                break
+
+            retry_after = None
+            if resp is not None:
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                resp.close()
+
+            time.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+
+        elapsed = time.perf_counter() - start
+        if resp is None:
+            self.stats.record(url, None, elapsed, 0, attempt + 1)
+            return None
+
+        nbytes = 0 if stream else len(resp.content)
+        self.stats.record(url, resp.status_code, elapsed, nbytes, attempt + 1)
+        return resp
+
+    def _from_cache(self, url: str, not_modified: requests.Response) -> requests.Response | None:
+        """
+        Turn a 304 into a 200 response whose body comes from the cache.
+        """
+        entry = self.cache.lookup(url)
+        body = self.cache.read(url) if entry is not None else None
+        if body is None:
+            return None
+
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.url = url
+        cached.request = not_modified.request
+        cached.headers = CaseInsensitiveDict(not_modified.headers)
+        if entry.get("content_type"):
+            cached.headers["Content-Type"] = entry["content_type"]
+        cached.encoding = get_encoding_from_headers(cached.headers)
+        cached._content = body
+        cached._content_consumed = True
+        cached.from_cache = True
+
+        not_modified.close()
+        self.stats.record_cache_hit(len(body))
+        return cached
+
+    def remember(self, url: str, resp: requests.Response, fileobj) -> bool:
+        """
+        Store a streamed 200 response for url whose body was spooled to fileobj.
+        """
+        if self.cache is None or resp.status_code != 200 or getattr(resp, "from_cache", False):
+            return False
+        return self.cache.store_file(url, resp.headers, fileobj)
+
+
+# Process-wide client shared by every fetch path
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """
+    Return the shared HttpClient, creating it on first use.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def set_client(client: HttpClient):
+    """
+    Replace the shared HttpClient (e.g. to change timeouts or retry policy).
+    """
+    global _default_client
+    with _default_lock:
+        _default_client = client
@@ -1,109 +1,372 @@
+import asyncio
+import os
+import tempfile
+import weakref
 from collections import deque
-from bs4 import BeautifulSoup #https://pypi.org/project/beautifulsoup4/4.14.2/
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
-from .robots import RobotsTxt
+from .checkpoint import CrawlCheckpoint
+from .links import LinkExtractor
+from .robots import RobotsCache
+from .seen import make_seen_set, seen_from_state, seen_to_state
+from .throttle import HostThrottle
 from .utils import (
-    normalize_url,
-    in_same_domain,
     is_pdf,
     safe_request
 )
 
-import warnings
-from bs4 import XMLParsedAsHTMLWarning
 
-warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
 
 class SpectrumCrawler:
     """
     BFS-based crawler for Concordia Spectrum.
     Collects PDF URLs while respecting robots.txt and domain restrictions.
+
+    With max_in_flight > 1 pages are fetched concurrently, but results are
+    committed in frontier order, so the crawl visits pages and collects PDFs
+    in the same BFS order as the sequential loop.
+
+    If checkpoint_path is given, the crawl state is snapshotted every
+    checkpoint_every pages and a later crawler with the same seed resumes
+    from the last snapshot instead of starting over.
+
+    URLs are deduplicated when they are enqueued, against a compact seen-set
+    of 64-bit fingerprints (seen_mode="exact") or a scalable Bloom filter
+    (seen_mode="bloom"); seen_capacity is the expected number of URLs, and
+    both grow past it. Visited pages are appended to a log and streamed
+    back by iter_pages_visited(). The log is visited_log, or next to the
+    checkpoint (so a resumed crawl still lists the pages visited before
+    the interruption), or else a temporary file; it is only open while
+    crawl() runs.
+
+    on_pdf, if given, is called with each PDF URL as soon as it is found
+    (including PDFs restored from a checkpoint), so downstream stages can
+    start before the crawl finishes.
     """
 
-    def __init__(self, seed_url: str, max_files: int):
+    def __init__(
+        self,
+        seed_url: str,
+        max_files: int,
+        max_in_flight: int = 1,
+        per_host_concurrency: int = 1,
+        per_host_delay: float = 0.0,
+        checkpoint_path: str | None = None,
+        checkpoint_every: int = 50,
+        seen_mode: str = "exact",
+        seen_capacity: int = 1024,
+        visited_log: str | None = None,
+        on_pdf=None
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
         self.seed_url = seed_url
         self.max_files = max_files
+        self.max_in_flight = max_in_flight
+        self.on_pdf = on_pdf
 
         # Domain root, e.g., "https://spectrum.library.concordia.ca"
         parsed = urlparse(seed_url)
         self.domain_root = f"{parsed.scheme}://{parsed.netloc}"
+        self.netloc = parsed.netloc
+
+        # Streaming href extractor with memoized normalization
+        self.link_extractor = LinkExtractor(self.domain_root)
 
         # Data structures
         self.frontier = deque([seed_url])
-        self.visited = set()
+        self.seen = make_seen_set(seen_mode, seen_capacity)
+        self.seen.add(seed_url)
+        self.visited_count = 0
         self.pdf_links = []
 
-        # Always respect robots.txt (default assignment requirement)
-        self.robots = RobotsTxt(seed_url)
+        # Optional on-disk checkpoint for resumable crawls
+        self.checkpoint = CrawlCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_every = max(1, checkpoint_every)
+        self._pages_since_checkpoint = 0
+        self.resumed = self._resume()
+
+        # Append-only log of visited pages; kept on disk instead of in memory
+        if visited_log is None and checkpoint_path:
+            visited_log = checkpoint_path + ".visited"
+        if visited_log is None:
+            fd, visited_log = tempfile.mkstemp(suffix=".visited")
+            os.close(fd)
+            weakref.finalize(self, _remove_file, visited_log)
+        self.visited_log_path = visited_log
+        self._visited_log = None
+        self._reset_visited_log()
+
+        # Always respect robots.txt (default assignment requirement).
+        # Rules are fetched and compiled once per host.
+        self.robots = RobotsCache()
+        self._delay_hosts = set()
+
+        # Per-host politeness (concurrency + minimum delay between requests)
+        self.throttle = HostThrottle(per_host_concurrency, per_host_delay)
+        self._robots_for(seed_url)
 
     def crawl(self):
         """
         Main BFS crawl loop.
         Returns a dictionary summarizing crawl results.
         """
+        if self.on_pdf is not None:
+            for link in self.pdf_links:
+                self.on_pdf(link)
 
-        while self.frontier and len(self.pdf_links) < self.max_files:
+        if self.max_in_flight > 1:
+            return asyncio.run(self.crawl_async())
 
-            current_url = self.frontier.popleft()
+        try:
+            while self.frontier and len(self.pdf_links) < self.max_files:
 
-            # Skip revisits
-            if current_url in self.visited:
-                continue
+                current_url = self._next_url()
+                if current_url is None:
+                    continue
 
-            # Enforce robots.txt
-            if not self.robots.is_allowed(current_url):
-                continue
+                # Fetch HTML
+                self.throttle.wait(current_url)
+                html = self._fetch_html(current_url)
+                self._commit_page(current_url, html)
+        finally:
+            self._close_visited_log()
 
-            # Enforce domain restriction
-            if not in_same_domain(current_url, self.domain_root):
-                continue
+        return self._finish()
 
-            # Mark visited
-            self.visited.add(current_url)
+    async def crawl_async(self):
+        """
+        Concurrent BFS crawl.
 
-            # Fetch HTML
-            resp = safe_request(current_url)
-            if resp is None or resp.status_code != 200:
-                continue
+        Up to max_in_flight pages are fetched at once (subject to the
+        per-host limits). Fetched pages are processed strictly in the order
+        they were popped from the frontier: every URL already in flight was
+        queued before anything the head page can discover, so the frontier
+        evolves exactly as it does in the sequential loop.
+        """
+        self.throttle.reset()
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
 
-            html = resp.text
-            new_links = self._extract_links(current_url, html)
+        # (url, task) pairs in dispatch order
+        in_flight = deque()
 
-            # Process discovered links
-            for link in new_links:
-                if is_pdf(link):
-                    if len(self.pdf_links) < self.max_files:
-                        self.pdf_links.append(link)
-                else:
-                    self.frontier.append(link)
+        try:
+            while len(self.pdf_links) < self.max_files:
 
-        return {
-            "pdf_urls": self.pdf_links,
-            "visited_count": len(self.visited),
-            "pages_visited": list(self.visited),
-        }
+                # Fill the window from the head of the frontier
+                while self.frontier and len(in_flight) < self.max_in_flight:
+                    url = self._next_url()
+                    if url is None:
+                        continue
+                    task = asyncio.ensure_future(self._fetch_html_async(url, loop, executor))
+                    in_flight.append((url, task))
 
-    def _extract_links(self, base_url: str, html: str):
+                if not in_flight:
+                    break
+
+                # Commit the oldest page first to keep BFS order
+                url, task = in_flight.popleft()
+                html = await task
+
+                # Pages still in flight have not been committed yet
+                self._commit_page(url, html, pending=[u for u, _ in in_flight])
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*(task for _, task in in_flight), return_exceptions=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._close_visited_log()
+
+        return self._finish()
+
+    async def _fetch_html_async(self, url: str, loop, executor) -> str | None:
         """
-        Extract all links, normalize them, and return a list of valid URLs.
+        Fetch a page on the executor while holding a per-host slot.
+        """
+        await self.throttle.acquire(url)
+        try:
+            return await loop.run_in_executor(executor, self._fetch_html, url)
+        finally:
+            self.throttle.release(url)
+
+    def _next_url(self) -> str | None:
         """
-        soup = BeautifulSoup(html, "html.parser")
+        Pop the next frontier URL and apply the visit checks.
+        Returns None if the URL must be skipped.
+        Duplicates never reach the frontier (they are dropped at enqueue time).
+        """
+        current_url = self.frontier.popleft()
 
+        # Enforce robots.txt
+        if not self._robots_for(current_url).is_allowed(current_url):
+            return None
 
-        collected = []
+        # Enforce domain restriction
+        if urlparse(current_url).netloc != self.netloc:
+            return None
 
-        for tag in soup.find_all("a"):
-            href = tag.get("href")
-            normalized = normalize_url(base_url, href)
+        return current_url
 
-            if not normalized:
-                continue
+    def _robots_for(self, url: str):
+        """
+        robots.txt rules for url's host. The first time a host is seen its
+        Crawl-delay (if any) becomes that host's minimum delay in the throttle.
+        """
+        robots = self.robots.get(url)
+
+        host = urlparse(url).netloc
+        if host not in self._delay_hosts:
+            self._delay_hosts.add(host)
+            if robots.crawl_delay:
+                self.throttle.set_delay(host, max(self.throttle.per_host_delay, robots.crawl_delay))
+
+        return robots
+
+    def _fetch_html(self, url: str) -> str | None:
+        """
+        Download a page and return its HTML, or None on failure.
+        """
+        resp = safe_request(url)
+        if resp is None or resp.status_code != 200:
+            return None
+        return resp.text
 
-            # Stay inside allowed domain
-            if not in_same_domain(normalized, self.domain_root):
+    def _commit_page(self, page_url: str, html: str | None, pending=()):
+        """
+        Record a fetched page (html is None if the fetch failed), process
+        its links and checkpoint if due.
+        """
+        self.visited_count += 1
+        if self._visited_log is None:
+            self._visited_log = open(self.visited_log_path, "a", encoding="utf-8")
+        self._visited_log.write(page_url + "\n")
+
+        if html is not None:
+            self._process_page(page_url, html)
+
+        self._maybe_checkpoint(pending)
+
+    def _process_page(self, page_url: str, html: str):
+        """
+        Extract links from a fetched page and route them to the PDF list
+        or the frontier. Links already seen are dropped here, so the frontier
+        never holds duplicates.
+        """
+        new_links = self._extract_links(page_url, html)
+
+        # Process discovered links
+        seen = self.seen
+        for link in new_links:
+            if not seen.add(link):
                 continue
+            if is_pdf(link):
+                if len(self.pdf_links) < self.max_files:
+                    self.pdf_links.append(link)
+                    if self.on_pdf is not None:
+                        self.on_pdf(link)
+            else:
+                self.frontier.append(link)
+
+    def _resume(self) -> bool:
+        """
+        Restore frontier, seen-set and PDF list from the checkpoint.
+        Returns True if a previous crawl was resumed.
+        """
+        if self.checkpoint is None:
+            return False
+
+        state = self.checkpoint.load(self.seed_url)
+        if state is None:
+            return False
+
+        self.frontier = deque(state["frontier"])
+        self.seen = seen_from_state(state["seen"])
+        self.visited_count = state["visited_count"]
+        self._resume_log_size = state["visited_log_size"]
+        self.pdf_links = state["pdf_links"]
+        return True
+
+    def _reset_visited_log(self):
+        """
+        Empty the visited log, or on resume cut it back to its size at
+        the snapshot: pages logged after it will be visited again.
+        """
+        size = self._resume_log_size if self.resumed else 0
+        actual = os.path.getsize(self.visited_log_path) if os.path.exists(self.visited_log_path) else 0
+        if actual < size:
+            print(f"[Warning] Visited log {self.visited_log_path} is missing pages from before the resume")
+        with open(self.visited_log_path, "a", encoding="utf-8") as f:
+            f.truncate(min(size, actual))
+
+    def _close_visited_log(self):
+        if self._visited_log is not None:
+            self._visited_log.close()
+            self._visited_log = None
+
+    def _maybe_checkpoint(self, pending=()):
+        """
+        Snapshot the crawl state every checkpoint_every committed pages.
+
+        pending: URLs that were popped but whose pages have not been
+        committed yet. They are written back to the head of the frontier so a
+        resumed crawl fetches them again.
+        """
+        if self.checkpoint is None:
+            return
+
+        self._pages_since_checkpoint += 1
+        if self._pages_since_checkpoint < self.checkpoint_every:
+            return
+        self._pages_since_checkpoint = 0
+
+        self._visited_log.flush()
+        frontier = list(pending) + list(self.frontier) if pending else self.frontier
+        self.checkpoint.save(
+            self.seed_url,
+            frontier,
+            seen_to_state(self.seen),
+            self.visited_count,
+            self.pdf_links,
+            visited_log_size=self._visited_log.tell()
+        )
+
+    def _finish(self):
+        """
+        Crawl ended normally: the checkpoint is no longer needed.
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+        return self._results()
+
+    def iter_pages_visited(self):
+        """
+        Stream visited page URLs back from the visited log.
+        """
+        if self._visited_log is not None:
+            self._visited_log.flush()
+        with open(self.visited_log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\n")
 
-            collected.append(normalized)
+    def _results(self):
+        return {
+            "pdf_urls": self.pdf_links,
+            "visited_count": self.visited_count,
+            "pages_visited": self.iter_pages_visited(),
+        }
 
-        return collected
+    def _extract_links(self, base_url: str, html: str):
+        """
+        Extract all links, normalize them, and return a list of valid URLs.
+        """
+        return self.link_extractor.extract(base_url, html)
@@ -0,0 +1,100 @@
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from .utils import normalize_url
+
+# "scheme://..." hrefs resolve to themselves whatever page they are on
+_ABSOLUTE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*://")
+
+
+class _HrefParser(HTMLParser):
+    """
+    Streaming tokenizer that only records <a href> values and the first
+    <base href>. No tree is built; every other tag is ignored as it streams by.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+        self.base_href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href":
+                    self.hrefs.append(value)
+                    break
+        elif tag == "base" and self.base_href is None:
+            for name, value in attrs:
+                if name == "href" and value:
+                    self.base_href = value
+                    break
+
+    # <a href="..."/> is still a link
+    handle_startendtag = handle_starttag
+
+
+class LinkExtractor:
+    """
+    Fast link extraction for crawled pages.
+    - streams href values with html.parser instead of building a soup tree
+    - resolves links against <base href> when the page declares one
+    - parses the domain root once and memoizes href resolution, so the
+      navigation links repeated on every listing page cost one dictionary
+      lookup after the first time they are seen. Absolute hrefs are
+      memoized on the href alone and root-relative ones ("/view/") on the
+      base's scheme and host, since the page path does not change them;
+      only path-relative hrefs are keyed on the full base URL.
+    """
+
+    def __init__(self, domain_root: str, cache_size: int = 50000):
+        self.domain_root = domain_root
+        self.netloc = urlparse(domain_root).netloc
+        self._resolve = lru_cache(maxsize=cache_size)(self._resolve_uncached)
+
+    def _resolve_uncached(self, base_url: str, href: str) -> str | None:
+        """
+        Normalize href against base_url; None if invalid or off-domain.
+        """
+        normalized = normalize_url(base_url, href)
+        if not normalized:
+            return None
+        if urlparse(normalized).netloc != self.netloc:
+            return None
+        return normalized
+
+    def extract(self, page_url: str, html: str) -> list[str]:
+        """
+        Return all in-domain links on the page, normalized, in document order.
+        """
+        parser = _HrefParser()
+        parser.feed(html)
+        parser.close()
+
+        base_url = page_url
+        if parser.base_href:
+            base_url = normalize_url(page_url, parser.base_href) or page_url
+
+        parsed = urlparse(base_url)
+        origin = f"{parsed.scheme}://{parsed.netloc}/"
+
+        collected = []
+        resolve = self._resolve
+        for href in parser.hrefs:
+            if not href:
+                continue
+            if _ABSOLUTE.match(href):
+                normalized = resolve("", href)
+            elif href[0] == "/" and href[1:2] != "/":
+                normalized = resolve(origin, href)
+            else:
+                normalized = resolve(base_url, href)
+            if normalized:
+                collected.append(normalized)
+
+        return collected
+
+    def cache_info(self):
+        return self._resolve.cache_info()
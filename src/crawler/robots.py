@@ -1,6 +1,87 @@
-import requests
+import re
+import threading
 from urllib.parse import urlparse
 
+from .client import USER_AGENT, get_client
+
+
+# Product token we look for in "User-agent:" lines, e.g. "SpectrumCrawler"
+ROBOTS_AGENT = USER_AGENT.split("/", 1)[0]
+
+# Trie node keys for rules ending at a node (characters are str, so ints never collide)
+_PREFIX = 0     # rule matches any path starting here
+_EXACT = 1      # rule ends with "$": path must end here
+
+
+class RuleMatcher:
+    """
+    Compiled allow/disallow rules for one robots.txt group.
+
+    Plain rules are stored in a character trie, so finding the longest
+    matching rule costs one walk over the path (O(len(path))) no matter how
+    many rules there are. Rules containing "*" wildcards are compiled into
+    regular expressions; they are rare in practice and checked separately.
+
+    Precedence follows RFC 9309: the most specific (longest) matching rule
+    wins, and Allow wins a tie.
+    """
+
+    def __init__(self, allowed: list[str], disallowed: list[str]):
+        self.root = {}
+        self.wildcards = []     # (length, allow, compiled regex)
+
+        for pattern in disallowed:
+            self._add(pattern, False)
+        for pattern in allowed:
+            self._add(pattern, True)
+
+    def _add(self, pattern: str, allow: bool):
+        if not pattern:
+            return
+
+        rank = (len(pattern), allow)
+        body = pattern[:-1] if pattern.endswith("$") else pattern
+
+        if "*" in body:
+            regex = ".*".join(re.escape(part) for part in body.split("*"))
+            if pattern.endswith("$"):
+                regex += "$"
+            self.wildcards.append((rank, re.compile(regex)))
+            return
+
+        node = self.root
+        for ch in body:
+            node = node.setdefault(ch, {})
+
+        key = _EXACT if pattern.endswith("$") else _PREFIX
+        if rank > node.get(key, (-1, False)):
+            node[key] = rank
+
+    def is_allowed(self, path: str) -> bool:
+        best = None
+        node = self.root
+
+        if _PREFIX in node:
+            best = node[_PREFIX]
+
+        for ch in path:
+            node = node.get(ch)
+            if node is None:
+                break
+            rank = node.get(_PREFIX)
+            if rank is not None and (best is None or rank > best):
+                best = rank
+        else:
+            rank = node.get(_EXACT)
+            if rank is not None and (best is None or rank > best):
+                best = rank
+
+        for rank, regex in self.wildcards:
+            if (best is None or rank > best) and regex.match(path):
+                best = rank
+
+        return True if best is None else best[1]
+
 
 class RobotsTxt:
     """
@@ -8,13 +89,19 @@ class RobotsTxt:
     Provides is_allowed(url) to verify whether a URL is crawlable.
     """
 
-    def __init__(self, seed_url: str):
+    def __init__(self, seed_url: str, user_agent: str = ROBOTS_AGENT):
         self.seed_url = seed_url
+        self.user_agent = user_agent
         self.domain_root = self._get_domain_root(seed_url)
-        self.disallowed_paths = []       # list of path prefixes to block
-        self.allowed_paths = []          # optional (not strictly required)
+        self.disallowed_paths = []       # disallow patterns of the selected group
+        self.allowed_paths = []          # allow patterns of the selected group
+        self.crawl_delay = None          # seconds, from Crawl-delay if present
         self.fetched = False
 
+        # Compiled matcher, rebuilt when the rule lists change
+        self._matcher = None
+        self._compiled_for = None
+
         self._fetch_and_parse()
 
     def _get_domain_root(self, url: str) -> str:
@@ -35,8 +122,11 @@ class RobotsTxt:
         robots_url = f"{self.domain_root}/robots.txt"
 
         try:
-            resp = requests.get(robots_url, timeout=5)
+            resp = get_client().get(robots_url, timeout=5)
         except Exception:
+            resp = None
+
+        if resp is None:
             # Treat as fully allowed if unreachable
             self.fetched = True
             return
@@ -51,49 +141,109 @@ class RobotsTxt:
 
     def _parse_robots_text(self, text: str):
         """
-        Minimal robots.txt parser:
-        - Reads Disallow: and Allow: lines
-        - Does not handle user-agent selection; assumes global rules
+        robots.txt parser (RFC 9309):
+        - groups start with one or more User-agent: lines
+        - the group naming our user agent is used, otherwise the "*" group
+          (several groups for the same agent are merged)
+        - reads Allow:, Disallow: and the non-standard Crawl-delay:
+        - rules before any User-agent: line are treated as global rules
         """
-        for line in text.splitlines():
-            line = line.strip()
+        groups = []             # [agents, allow, disallow, crawl_delay]
+        current = None
+        in_rules = False
 
-            # Skip comments and empty lines
-            if not line or line.startswith("#"):
+        for line in text.splitlines():
+            # Strip comments and whitespace
+            line = line.split("#", 1)[0].strip()
+            if not line or ":" not in line:
                 continue
 
-            # Normalize line e.g. "Disallow: /path"
-            if line.lower().startswith("disallow:"):
-                path = line.split(":", 1)[1].strip()
-                if path:
-                    self.disallowed_paths.append(path)
+            field, value = line.split(":", 1)
+            field = field.strip().lower()
+            value = value.strip()
+
+            if field == "user-agent":
+                if current is None or in_rules:
+                    current = [[], [], [], None]
+                    groups.append(current)
+                    in_rules = False
+                current[0].append(value.lower())
+                continue
 
-            elif line.lower().startswith("allow:"):
-                path = line.split(":", 1)[1].strip()
-                if path:
-                    self.allowed_paths.append(path)
+            if current is None:
+                current = [["*"], [], [], None]
+                groups.append(current)
+            in_rules = True
+
+            if field == "allow" and value:
+                current[1].append(value)
+            elif field == "disallow" and value:
+                current[2].append(value)
+            elif field == "crawl-delay":
+                try:
+                    current[3] = float(value)
+                except ValueError:
+                    pass
+
+        agent = self.user_agent.lower()
+        selected = [g for g in groups if agent in g[0]]
+        if not selected:
+            selected = [g for g in groups if "*" in g[0]]
+
+        for _, allow, disallow, delay in selected:
+            self.allowed_paths.extend(allow)
+            self.disallowed_paths.extend(disallow)
+            if delay is not None:
+                self.crawl_delay = max(self.crawl_delay or 0.0, delay)
+
+    def _compiled(self) -> RuleMatcher:
+        """
+        Return the compiled matcher, recompiling if rules were added.
+        """
+        key = (len(self.allowed_paths), len(self.disallowed_paths))
+        if self._matcher is None or self._compiled_for != key:
+            self._matcher = RuleMatcher(self.allowed_paths, self.disallowed_paths)
+            self._compiled_for = key
+        return self._matcher
 
     def is_allowed(self, url: str) -> bool:
         """
         Check whether a given URL is permitted under robots.txt rules.
-        We match paths based on prefix rules:
-          disallow path:   block
-          allow path:      allow (overrides disallow)
+        The longest matching Allow/Disallow rule decides ("*" and "$"
+        wildcards supported); Allow wins ties.
 
         Returns: True if allowed, False if disallowed.
         """
         parsed = urlparse(url)
-        path = parsed.path
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+
+        return self._compiled().is_allowed(path)
+
+
+class RobotsCache:
+    """
+    Per-host cache of parsed robots.txt files.
+    Each host's robots.txt is fetched and compiled once, on first use.
+    """
 
-        # Allow rules override disallow rules, so check them first
-        for allowed in self.allowed_paths:
-            if path.startswith(allowed):
-                return True
+    def __init__(self, user_agent: str = ROBOTS_AGENT):
+        self.user_agent = user_agent
+        self._hosts = {}
+        self._lock = threading.Lock()
 
-        # Check disallowed rules
-        for disallowed in self.disallowed_paths:
-            if path.startswith(disallowed):
-                return False
+    def get(self, url: str) -> RobotsTxt:
+        parsed = urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
 
-        # Default: allowed
-        return True
+        robots = self._hosts.get(host)
+        if robots is None:
+            with self._lock:
+                robots = self._hosts.get(host)
+                if robots is None:
+                    robots = self._hosts[host] = RobotsTxt(host + "/", self.user_agent)
+        return robots
+
+    def is_allowed(self, url: str) -> bool:
+        return self.get(url).is_allowed(url)
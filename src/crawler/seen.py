@@ -0,0 +1,295 @@
+import base64
+import hashlib
+import math
+from array import array
+
+
+def url_fingerprint(url: str) -> int:
+    """
+    64-bit fingerprint of a URL (never 0, which marks an empty slot).
+    """
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class FingerprintSet:
+    """
+    Exact URL-seen set storing 64-bit fingerprints in an open-addressing
+    hash table backed by array('Q').
+
+    Costs 8 bytes per slot (16-32 bytes per URL at the load factors used)
+    instead of a full Python string plus set entry. Two different URLs only
+    collide if their 64-bit fingerprints are equal, which is negligible for
+    crawls of millions of URLs.
+    """
+
+    MAX_LOAD = 0.5
+
+    def __init__(self, capacity: int = 1024):
+        size = 16
+        while size * self.MAX_LOAD < capacity:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, url: str) -> bool:
+        return self.contains_fingerprint(url_fingerprint(url))
+
+    def add(self, url: str) -> bool:
+        """
+        Insert url. Returns True if it was not already present.
+        """
+        return self.add_fingerprint(url_fingerprint(url))
+
+    def _probe(self, fp: int) -> int:
+        """
+        Index of fp's slot, or of the empty slot where it would go.
+        """
+        slots = self._slots
+        mask = self._mask
+        i = (fp ^ (fp >> 29)) & mask
+        while True:
+            current = slots[i]
+            if current == 0 or current == fp:
+                return i
+            i = (i + 1) & mask
+
+    def contains_fingerprint(self, fp: int) -> bool:
+        return self._slots[self._probe(fp)] == fp
+
+    def add_fingerprint(self, fp: int) -> bool:
+        i = self._probe(fp)
+        if self._slots[i] == fp:
+            return False
+
+        self._slots[i] = fp
+        self._count += 1
+        if self._count > len(self._slots) * self.MAX_LOAD:
+            self._grow()
+        return True
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for fp in old:
+            if fp:
+                self._slots[self._probe(fp)] = fp
+
+    def memory_bytes(self) -> int:
+        return self._slots.itemsize * len(self._slots)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the stored fingerprints (packed, without empty slots).
+        """
+        return array("Q", (fp for fp in self._slots if fp)).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        fingerprints = array("Q")
+        fingerprints.frombytes(data)
+        seen = cls(capacity=len(fingerprints))
+        for fp in fingerprints:
+            seen.add_fingerprint(fp)
+        return seen
+
+
+class BloomFilter:
+    """
+    Probabilistic URL-seen set for very large crawls.
+
+    Uses a fixed bit array sized for `capacity` URLs at `error_rate` false
+    positives (about 19 bits per URL at 1e-4). A false positive means a new
+    URL is wrongly treated as seen and skipped; nothing is ever crawled twice.
+
+    Past `capacity` URLs the false-positive rate climbs quickly; a warning
+    is printed once when that happens. ScalableBloomFilter grows instead.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-4):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._warned = False
+
+    def __len__(self):
+        """
+        Number of URLs added (approximate: false positives are not counted).
+        """
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        """
+        True once more URLs were added than the filter was sized for.
+        """
+        return self._count >= self.capacity
+
+    def _positions(self, fp: int):
+        # Kirsch-Mitzenmacher double hashing from the two 32-bit halves
+        h1 = fp & 0xFFFFFFFF
+        h2 = (fp >> 32) | 1
+        n = self.num_bits
+        return [(h1 + i * h2) % n for i in range(self.num_hashes)]
+
+    def __contains__(self, url: str) -> bool:
+        return self.contains_fingerprint(url_fingerprint(url))
+
+    def add(self, url: str) -> bool:
+        return self.add_fingerprint(url_fingerprint(url))
+
+    def contains_fingerprint(self, fp: int) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fp))
+
+    def add_fingerprint(self, fp: int) -> bool:
+        """
+        Set fp's bits. Returns True if at least one bit was unset (i.e. new).
+        """
+        bits = self._bits
+        new = False
+        for pos in self._positions(fp):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self._count += 1
+            if self._count > self.capacity and not self._warned:
+                self._warned = True
+                print(
+                    f"[Warning] Bloom filter sized for {self.capacity} URLs now holds {self._count}; "
+                    f"false positives will exceed {self.error_rate:g}"
+                )
+        return new
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, capacity: int, error_rate: float, count: int = 0):
+        bloom = cls(capacity, error_rate)
+        if len(data) != len(bloom._bits):
+            raise ValueError("Bloom filter size does not match its parameters")
+        bloom._bits[:] = data
+        bloom._count = count
+        bloom._warned = count > capacity
+        return bloom
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows with the crawl (Almeida et al., "Scalable
+    Bloom Filters"): a chain of BloomFilters, each twice the capacity of
+    the previous one with half its false-positive rate. A URL is seen if
+    any filter has it; new URLs go into the last filter, and a new one is
+    added when it is full. The overall false-positive rate stays below
+    error_rate however many URLs are added, so `capacity` is only the
+    initial size.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 1e-4):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        # The per-filter rates form a geometric series summing to error_rate
+        self.filters = [BloomFilter(self.capacity, error_rate * (1 - self.TIGHTENING))]
+
+    def __len__(self):
+        return sum(len(bloom) for bloom in self.filters)
+
+    def __contains__(self, url: str) -> bool:
+        return self.contains_fingerprint(url_fingerprint(url))
+
+    def add(self, url: str) -> bool:
+        return self.add_fingerprint(url_fingerprint(url))
+
+    def contains_fingerprint(self, fp: int) -> bool:
+        return any(bloom.contains_fingerprint(fp) for bloom in self.filters)
+
+    def add_fingerprint(self, fp: int) -> bool:
+        if self.contains_fingerprint(fp):
+            return False
+        last = self.filters[-1]
+        if last.full:
+            last = BloomFilter(last.capacity * self.GROWTH, last.error_rate * self.TIGHTENING)
+            self.filters.append(last)
+        return last.add_fingerprint(fp)
+
+    def memory_bytes(self) -> int:
+        return sum(bloom.memory_bytes() for bloom in self.filters)
+
+
+def make_seen_set(mode: str = "exact", capacity: int = 1024, error_rate: float = 1e-4):
+    """
+    Build a URL-seen set: "exact" (FingerprintSet) or "bloom"
+    (ScalableBloomFilter). capacity is the expected number of URLs; both
+    grow past it.
+    """
+    if mode == "exact":
+        return FingerprintSet(capacity)
+    if mode == "bloom":
+        return ScalableBloomFilter(capacity, error_rate)
+    raise ValueError(f"Unknown seen-set mode: {mode!r}")
+
+
+def _bloom_state(bloom: BloomFilter) -> dict:
+    return {
+        "data": base64.b64encode(bloom.to_bytes()).decode("ascii"),
+        "capacity": bloom.capacity,
+        "error_rate": bloom.error_rate,
+        "count": len(bloom),
+    }
+
+
+def _bloom_from_state(state: dict) -> BloomFilter:
+    data = base64.b64decode(state["data"])
+    return BloomFilter.from_bytes(data, state["capacity"], state["error_rate"], state.get("count", 0))
+
+
+def seen_to_state(seen) -> dict:
+    """
+    JSON-friendly snapshot of a seen set (used by crawl checkpoints).
+    """
+    if isinstance(seen, ScalableBloomFilter):
+        return {
+            "mode": "scalable_bloom",
+            "capacity": seen.capacity,
+            "error_rate": seen.error_rate,
+            "filters": [_bloom_state(bloom) for bloom in seen.filters],
+        }
+    if isinstance(seen, BloomFilter):
+        return {"mode": "bloom", **_bloom_state(seen)}
+    return {"mode": "exact", "data": base64.b64encode(seen.to_bytes()).decode("ascii")}
+
+
+def seen_from_state(state: dict):
+    """
+    Rebuild a seen set from seen_to_state() output.
+    """
+    if state["mode"] == "scalable_bloom":
+        seen = ScalableBloomFilter(state["capacity"], state["error_rate"])
+        seen.filters = [_bloom_from_state(bloom) for bloom in state["filters"]]
+        return seen
+    if state["mode"] == "bloom":
+        return _bloom_from_state(state)
+    return FingerprintSet.from_bytes(base64.b64decode(state["data"]))
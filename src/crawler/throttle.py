@@ -0,0 +1,80 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+
+class HostThrottle:
+    """
+    Per-host politeness for the crawler.
+    Limits how many requests may be in flight against one host and
+    enforces a minimum delay between the start of consecutive requests
+    to the same host.
+    """
+
+    def __init__(self, per_host_concurrency: int = 1, per_host_delay: float = 0.0):
+        if per_host_concurrency < 1:
+            raise ValueError("per_host_concurrency must be at least 1")
+
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = max(0.0, per_host_delay)
+
+        # host -> asyncio.Semaphore (created lazily inside the running loop)
+        self._slots = {}
+
+        # host -> earliest monotonic time the next request may start
+        self._next_start = {}
+
+        # host -> delay override (e.g. from robots.txt Crawl-delay)
+        self._host_delay = {}
+
+    def reset(self):
+        """
+        Drop per-host slots so the throttle can be reused by a new event loop.
+        """
+        self._slots.clear()
+
+    def set_delay(self, host: str, delay: float):
+        """
+        Override the minimum delay for a single host.
+        """
+        self._host_delay[host] = max(0.0, delay)
+
+    def delay_for(self, host: str) -> float:
+        return self._host_delay.get(host, self.per_host_delay)
+
+    def _reserve(self, host: str) -> float:
+        """
+        Reserve the next start slot for host.
+        Returns how long the caller must wait before sending its request.
+        """
+        now = time.monotonic()
+        start = max(now, self._next_start.get(host, now))
+        self._next_start[host] = start + self.delay_for(host)
+        return start - now
+
+    def wait(self, url: str):
+        """
+        Blocking variant used by the sequential crawl loop.
+        """
+        pause = self._reserve(urlparse(url).netloc)
+        if pause > 0:
+            time.sleep(pause)
+
+    async def acquire(self, url: str):
+        """
+        Wait for a free per-host slot and for the host's delay to elapse.
+        Must be paired with release(url).
+        """
+        host = urlparse(url).netloc
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = asyncio.Semaphore(self.per_host_concurrency)
+
+        await slot.acquire()
+
+        pause = self._reserve(host)
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    def release(self, url: str):
+        self._slots[urlparse(url).netloc].release()
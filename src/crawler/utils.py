@@ -1,6 +1,8 @@
 import requests #https://pypi.org/project/requests/2.32.5/
 from urllib.parse import urljoin, urlparse, urlunparse
 
+from .client import get_client
+
 
 def normalize_url(base_url: str, link: str) -> str | None:
     """
@@ -65,13 +67,12 @@ def is_pdf(url: str) -> bool:
 
 def safe_request(url: str, timeout: float = 5.0) -> requests.Response | None:
     """
-    Safe wrapper around requests.get().
+    Safe wrapper around the shared pooled HTTP client (retries + keep-alive).
     Returns:
         Response object or None on error.
     """
 
     try:
-        resp = requests.get(url, timeout=timeout)
-        return resp
+        return get_client().get(url, timeout=timeout)
     except Exception:
         return None
@@ -0,0 +1,344 @@
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+
+from .compression import count_postings, decode_postings, encode_postings, iter_postings
+from .indexer import CompressedPostingsView, DocRecord
+from .storage import load_index_json
+
+# Binary index layout (one directory, all integers little-endian):
+#
+#   terms.bin     TERMS_MAGIC, term count, then one fixed-size entry per
+#                 term in sorted (UTF-8 byte) order, then the term strings:
+#                     string offset, string length, doc freq,
+#                     postings offset, postings length
+#   postings.bin  vbyte postings lists ((doc-ID gap, tf) pairs, see
+#                 index.compression), back to back
+#   docs.bin      DOCS_MAGIC, doc count, one entry per document sorted by
+#                 doc ID, then the URLs:
+#                     doc_id, length, URL offset, URL length
+#
+# Files are opened with mmap: looking up a term is a binary search over
+# the entry table and only the postings a query touches are decoded, so
+# opening an index costs almost nothing and the pages are shared by every
+# process that maps the same files.
+
+TERMS_MAGIC = b"TRM1"
+DOCS_MAGIC = b"DOC1"
+
+_COUNT = struct.Struct("<I")
+_TERM_ENTRY = struct.Struct("<IIIQI")
+_DOC_ENTRY = struct.Struct("<IIQI")
+
+
+def _write_atomic(path: str, chunks):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class BinaryIndexWriter:
+    """
+    Writes a binary index directory from postings lists added in sorted
+    term order (add(), e.g. straight from a SPIMI merge), then the
+    documents (finish()). Postings are streamed to postings.bin; only the
+    term table is kept in memory.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.terms = 0
+        self._table = bytearray()
+        self._strings = bytearray()
+        self._offset = 0
+        self._last_key = None
+        self._postings_path = os.path.join(directory, "postings.bin")
+        self._postings = open(self._postings_path + ".tmp", "wb")
+
+    def add(self, term: str, data: bytes, df: int | None = None):
+        """
+        Append one term's encoded postings (see index.compression); df is
+        counted from the data if not given.
+        """
+        key = term.encode("utf-8")
+        if self._last_key is not None and key <= self._last_key:
+            raise ValueError(f"terms must be added in sorted order, got {term!r} after {self._last_key.decode('utf-8')!r}")
+        if df is None:
+            df = count_postings(data)
+        self._table += _TERM_ENTRY.pack(len(self._strings), len(key), df, self._offset, len(data))
+        self._strings += key
+        self._postings.write(data)
+        self._offset += len(data)
+        self._last_key = key
+        self.terms += 1
+
+    def finish(self, docs):
+        """
+        Write the term table and docs (iterable of (doc_id, url, length))
+        and move the files into place.
+        """
+        f = self._postings
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(self._postings_path + ".tmp", self._postings_path)
+
+        _write_atomic(
+            os.path.join(self.directory, "terms.bin"),
+            [TERMS_MAGIC, _COUNT.pack(self.terms), self._table, self._strings]
+        )
+
+        doc_table = bytearray()
+        urls = bytearray()
+        docs = sorted(docs)
+        for doc_id, url, length in docs:
+            encoded = url.encode("utf-8")
+            doc_table += _DOC_ENTRY.pack(doc_id, length, len(urls), len(encoded))
+            urls += encoded
+        _write_atomic(
+            os.path.join(self.directory, "docs.bin"),
+            [DOCS_MAGIC, _COUNT.pack(len(docs)), doc_table, urls]
+        )
+
+
+def _write_binary(directory: str, postings_lists, docs):
+    """
+    postings_lists: iterable of (term, encoded postings, doc freq) in any order
+    docs:           iterable of (doc_id, url, length)
+    """
+    writer = BinaryIndexWriter(directory)
+    for term, data, df in sorted(postings_lists, key=lambda entry: entry[0].encode("utf-8")):
+        writer.add(term, data, df)
+    writer.finish(docs)
+
+
+def save_index_binary(indexer, directory: str):
+    """
+    Write an Indexer in the binary format (positions are not stored).
+    """
+    postings_lists = (
+        (term, indexer.encoded_postings(term_id), indexer.doc_freq(term))
+        for term_id, term in enumerate(indexer.terms)
+    )
+    docs = ((doc_id, meta["url"], meta["length"]) for doc_id, meta in indexer.docs.items())
+    _write_binary(directory, postings_lists, docs)
+
+
+def convert_json_to_binary(json_path: str, directory: str):
+    """
+    Convert an index written by save_index_json() (plain or compressed)
+    to the binary format.
+    """
+    index, docs = load_index_json(json_path, decode=False)
+
+    def postings_lists():
+        for term, postings in index.items():
+            if isinstance(postings, bytes):
+                # Already vbyte-encoded (compressed JSON)
+                yield term, postings, count_postings(postings)
+                continue
+            pairs = sorted((int(doc_id), tf) for doc_id, tf in postings.items())
+            yield term, encode_postings([d for d, _ in pairs], [tf for _, tf in pairs]), len(pairs)
+
+    _write_binary(
+        directory,
+        postings_lists(),
+        ((int(doc_id), meta["url"], meta["length"]) for doc_id, meta in docs.items())
+    )
+
+
+def _map(path: str):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""   # empty files cannot be mapped
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _DocsView(Mapping):
+    """
+    Read-only doc_id -> DocRecord view over docs.bin.
+    """
+
+    def __init__(self, buf):
+        if buf[:4] != DOCS_MAGIC:
+            raise ValueError("not a binary docs file")
+        self._buf = buf
+        (self._count,) = _COUNT.unpack_from(buf, 4)
+        self._table = 4 + _COUNT.size
+        self._urls = self._table + self._count * _DOC_ENTRY.size
+
+    def _entry(self, i: int):
+        return _DOC_ENTRY.unpack_from(self._buf, self._table + i * _DOC_ENTRY.size)
+
+    def _doc_id(self, i: int) -> int:
+        return _COUNT.unpack_from(self._buf, self._table + i * _DOC_ENTRY.size)[0]
+
+    def __getitem__(self, doc_id):
+        doc_id = int(doc_id)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._doc_id(mid) < doc_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count:
+            raise KeyError(doc_id)
+        found, length, url_offset, url_size = self._entry(lo)
+        if found != doc_id:
+            raise KeyError(doc_id)
+        start = self._urls + url_offset
+        return DocRecord(bytes(self._buf[start:start + url_size]).decode("utf-8"), length)
+
+    def __iter__(self):
+        return (self._doc_id(i) for i in range(self._count))
+
+    def __len__(self):
+        return self._count
+
+
+class BinaryIndex(Mapping):
+    """
+    Memory-mapped, read-only index in the binary format.
+
+    Behaves like the token -> {doc_id: tf} index of an Indexer (terms
+    iterate in sorted order), with the same query helpers: postings(),
+    doc_ids(), iter_postings(), doc_freq(), docs, total_docs().
+    Nothing is decoded until a term is looked up.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._terms = _map(os.path.join(directory, "terms.bin"))
+        self._postings = _map(os.path.join(directory, "postings.bin"))
+        self._docs_buf = _map(os.path.join(directory, "docs.bin"))
+
+        if self._terms[:4] != TERMS_MAGIC:
+            raise ValueError(f"not a binary index: {directory}")
+        (self._count,) = _COUNT.unpack_from(self._terms, 4)
+        self._table = 4 + _COUNT.size
+        self._strings = self._table + self._count * _TERM_ENTRY.size
+
+        self.docs = _DocsView(self._docs_buf)
+
+        # The mapped files never change; a rewritten index is a new version
+        self.version = os.stat(os.path.join(directory, "terms.bin")).st_mtime_ns
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for buf in (self._terms, self._postings, self._docs_buf):
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+    # ---------- term dictionary ----------
+
+    def _entry(self, i: int):
+        return _TERM_ENTRY.unpack_from(self._terms, self._table + i * _TERM_ENTRY.size)
+
+    def _key(self, i: int) -> bytes:
+        str_offset, str_len = struct.unpack_from("<II", self._terms, self._table + i * _TERM_ENTRY.size)
+        start = self._strings + str_offset
+        return self._terms[start:start + str_len]
+
+    def term_at(self, i: int) -> str:
+        """
+        The i-th term in sorted order.
+        """
+        return bytes(self._key(i)).decode("utf-8")
+
+    def _find(self, key: bytes) -> int:
+        """
+        Index of the first entry whose term is >= key (binary search).
+        """
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _lookup(self, term: str):
+        key = term.encode("utf-8")
+        i = self._find(key)
+        if i < self._count and self._key(i) == key:
+            return self._entry(i)
+        return None
+
+    def term_range(self, low: str, high: str | None = None) -> range:
+        """
+        Positions (for term_at) of the terms t with low <= t < high, in
+        sorted order; high=None means "to the end".
+        """
+        start = self._find(low.encode("utf-8"))
+        end = self._count if high is None else self._find(high.encode("utf-8"))
+        return range(start, max(start, end))
+
+    def _data(self, entry) -> bytes:
+        _, _, _, offset, size = entry
+        return self._postings[offset:offset + size]
+
+    # ---------- Mapping interface ----------
+
+    def __getitem__(self, term):
+        entry = self._lookup(term)
+        if entry is None:
+            raise KeyError(term)
+        return CompressedPostingsView(self._data(entry), entry[2])
+
+    def __contains__(self, term):
+        return isinstance(term, str) and self._lookup(term) is not None
+
+    def __iter__(self):
+        return (self.term_at(i) for i in range(self._count))
+
+    def __len__(self):
+        return self._count
+
+    # ---------- query helpers (same as Indexer) ----------
+
+    def postings(self, term: str):
+        entry = self._lookup(term)
+        if entry is None:
+            return None
+        return decode_postings(self._data(entry))
+
+    def doc_ids(self, term: str):
+        found = self.postings(term)
+        return found[0] if found else array("I")
+
+    def iter_postings(self, term: str):
+        entry = self._lookup(term)
+        if entry is None:
+            return iter(())
+        return iter_postings(self._data(entry))
+
+    def doc_freq(self, term: str) -> int:
+        entry = self._lookup(term)
+        return entry[2] if entry else 0
+
+    def get_docs(self):
+        return self.docs
+
+    def total_docs(self) -> int:
+        return len(self.docs)
+
+
+def load_index_binary(directory: str) -> BinaryIndex:
+    """
+    Open a binary index (memory-mapped, decoded lazily).
+    """
+    return BinaryIndex(directory)
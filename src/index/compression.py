@@ -0,0 +1,204 @@
+from array import array
+
+import numpy as np
+
+# Below this many bytes a plain Python loop decodes faster than NumPy
+NUMPY_MIN_BYTES = 256
+
+# Postings compression: doc-ID gaps + variable-byte (vbyte) encoding.
+#
+# Each integer is split into 7-bit groups, most significant first; the
+# high bit is set on the last byte of a number (stop bit). Small numbers
+# take one byte, so storing the gaps between sorted doc IDs instead of the
+# IDs themselves keeps most postings at 2 bytes (gap + tf).
+#
+# A postings list is encoded as interleaved (gap, tf) pairs, so
+# iter_postings() can walk it lazily without expanding the whole list.
+
+
+def vbyte_encode_number(n: int, out: bytearray):
+    """
+    Append the vbyte encoding of a non-negative integer to out.
+    """
+    if n < 0:
+        raise ValueError(f"vbyte cannot encode negative numbers: {n}")
+    if n < 128:
+        out.append(n | 0x80)
+        return
+
+    groups = []
+    while True:
+        groups.append(n & 0x7F)
+        if n < 128:
+            break
+        n >>= 7
+    groups.reverse()
+    groups[-1] |= 0x80
+    out.extend(groups)
+
+
+def read_vbyte(data, pos: int = 0) -> tuple[int, int]:
+    """
+    Decode the number starting at data[pos].
+    Returns (value, position just after it).
+    """
+    n = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        if byte & 0x80:
+            return (n << 7) | (byte & 0x7F), pos
+        n = (n << 7) | byte
+    raise ValueError("truncated vbyte data")
+
+
+def vbyte_encode(numbers) -> bytes:
+    """
+    Encode a sequence of non-negative integers.
+    """
+    out = bytearray()
+    for n in numbers:
+        vbyte_encode_number(n, out)
+    return bytes(out)
+
+
+def iter_vbyte(data):
+    """
+    Lazily decode the integers in a vbyte byte string.
+    """
+    n = 0
+    for byte in data:
+        if byte & 0x80:
+            yield (n << 7) | (byte & 0x7F)
+            n = 0
+        else:
+            n = (n << 7) | byte
+    if n:
+        raise ValueError("truncated vbyte data")
+
+
+def _vbyte_decode_array(data) -> np.ndarray:
+    """
+    Vectorized vbyte decoder: returns all integers as a uint64 array.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.zeros(0, dtype=np.uint64)
+
+    ends = np.flatnonzero(raw & 0x80)
+    if not len(ends) or ends[-1] != len(raw) - 1:
+        raise ValueError("truncated vbyte data")
+
+    values = (raw & 0x7F).astype(np.uint64)
+    if len(ends) == len(raw):
+        return values   # every number fits in one byte
+
+    # Shift each byte by 7 bits per byte that follows it in its number,
+    # then add up the bytes of each number
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    owner = np.repeat(ends, ends - starts + 1)
+    shifts = ((owner - np.arange(len(raw))) * 7).astype(np.uint64)
+    return np.add.reduceat(values << shifts, starts)
+
+
+def vbyte_decode(data) -> list[int]:
+    """
+    Decode a whole vbyte byte string into a list.
+    """
+    if len(data) < NUMPY_MIN_BYTES:
+        return list(iter_vbyte(data))
+    return _vbyte_decode_array(data).tolist()
+
+
+def encode_postings(doc_ids, tfs) -> bytes:
+    """
+    Encode a postings list (ascending doc IDs with their term frequencies).
+    """
+    out = bytearray()
+    prev = 0
+    for doc_id, tf in zip(doc_ids, tfs):
+        if doc_id < prev:
+            raise ValueError("doc IDs must be ascending")
+        vbyte_encode_number(doc_id - prev, out)
+        vbyte_encode_number(tf, out)
+        prev = doc_id
+    return bytes(out)
+
+
+def append_posting(out: bytearray, last_doc_id: int, doc_id: int, tf: int):
+    """
+    Append one posting to an encoded list whose last doc ID is last_doc_id
+    (0 for an empty list).
+    """
+    vbyte_encode_number(doc_id - last_doc_id, out)
+    vbyte_encode_number(tf, out)
+
+
+def iter_postings(data):
+    """
+    Yield (doc_id, tf) pairs from an encoded postings list, decoding as it goes.
+    """
+    numbers = iter_vbyte(data)
+    doc_id = 0
+    for gap in numbers:
+        doc_id += gap
+        yield doc_id, next(numbers)
+
+
+# Bytes that end a vbyte number (high bit set), deleted by count_postings()
+_STOP_BYTES = bytes(range(0x80, 0x100))
+
+
+def count_postings(data) -> int:
+    """
+    Number of postings in an encoded list, without decoding it: every
+    posting is two vbyte numbers, each ending in one stop byte.
+    """
+    data = bytes(data)
+    return (len(data) - len(data.translate(None, _STOP_BYTES))) // 2
+
+
+def decode_postings(data) -> tuple[array, array]:
+    """
+    Fully decode an encoded postings list into (doc_ids, tfs) arrays.
+    """
+    if len(data) < NUMPY_MIN_BYTES:
+        doc_ids = array("I")
+        tfs = array("I")
+        for doc_id, tf in iter_postings(data):
+            doc_ids.append(doc_id)
+            tfs.append(tf)
+        return doc_ids, tfs
+
+    numbers = _vbyte_decode_array(data)
+
+    # Turn gaps back into doc IDs (prefix sum)
+    doc_ids = np.cumsum(numbers[0::2]).astype(np.uint32)
+    tfs = numbers[1::2].astype(np.uint32)
+    return array("I", doc_ids.tobytes()), array("I", tfs.tobytes())
+
+
+def encode_positions(positions) -> bytes:
+    """
+    Encode the ascending token positions of one posting as vbyte gaps.
+    """
+    out = bytearray()
+    prev = 0
+    for pos in positions:
+        vbyte_encode_number(pos - prev, out)
+        prev = pos
+    return bytes(out)
+
+
+def decode_positions(data) -> list[int]:
+    """
+    Decode a posting's position gaps back into absolute positions.
+    """
+    positions = []
+    pos = 0
+    for gap in iter_vbyte(data):
+        pos += gap
+        positions.append(pos)
+    return positions
@@ -0,0 +1,273 @@
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+from .pdf_extractor import extract_pdf_text_strict
+
+
+# forkserver where the platform has it (spawn on Windows); extract_fn must
+# be a module-level function so the worker can import it
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _worker_main(conn, max_tasks: int, extract_fn):
+    """
+    Worker process loop: receive (key, source), send back
+    (key, text, error, elapsed). Exits after max_tasks documents so the
+    parent can replace it with a fresh process.
+    """
+    done = 0
+    while done < max_tasks:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+
+        key, source = task
+        start = time.perf_counter()
+        try:
+            text = extract_fn(source)
+            error = None
+        except Exception as e:
+            text = ""
+            error = f"{type(e).__name__}: {e}"
+        conn.send((key, text, error, time.perf_counter() - start))
+        done += 1
+
+    conn.close()
+
+
+class _Worker:
+    """
+    Parent-side handle on one worker process.
+    """
+
+    def __init__(self, ctx, max_tasks: int, extract_fn):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, max_tasks, extract_fn),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.max_tasks = max_tasks
+        self.done = 0
+        self.task_key = None
+        self.deadline = None
+
+    @property
+    def busy(self) -> bool:
+        return self.deadline is not None
+
+    def submit(self, key, source, timeout: float):
+        self.task_key = key
+        self.deadline = time.monotonic() + timeout
+        self.conn.send((key, source))
+
+    def finish(self):
+        self.done += 1
+        self.task_key = None
+        self.deadline = None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.done >= self.max_tasks
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def _result(key, text: str = "", error: str | None = None, elapsed: float = 0.0) -> dict:
+    return {
+        "key": key,
+        "ok": error is None,
+        "text": text,
+        "error": error,
+        "elapsed": elapsed,
+    }
+
+
+class ExtractionPool:
+    """
+    Parallel PDF text extraction in a pool of worker processes.
+
+    - workers:              number of processes (default: CPU count)
+    - timeout:              per-document wall-clock limit in seconds; a worker
+                            that exceeds it is killed and replaced
+    - max_tasks_per_worker: workers are recycled after this many documents to
+                            contain pdfminer's memory growth
+
+    Sources are raw PDF bytes or paths to PDF files. Every document yields
+    one result dict:
+        {"key", "ok", "text", "error", "elapsed"}
+    where error is None on success, "timeout", "worker crashed", or the
+    exception raised by pdfminer.
+    """
+
+    # How often to re-poll an input generator that had nothing ready
+    POLL_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        timeout: float = 120.0,
+        max_tasks_per_worker: int = 50,
+        extract_fn=extract_pdf_text_strict
+    ):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_tasks_per_worker = max(1, max_tasks_per_worker)
+        self.extract_fn = extract_fn
+
+        # Not fork: the pool starts (and restarts) workers while the
+        # pipeline's crawler and download threads hold locks, which a
+        # forked child would inherit in the locked state
+        self._ctx = multiprocessing.get_context(START_METHOD)
+        self._pool = []
+
+        # Counters for reporting
+        self.processed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.max_tasks_per_worker, self.extract_fn)
+
+    def _replace(self, worker: _Worker, kill: bool = False) -> _Worker:
+        worker.stop(kill=kill)
+        self.restarts += 1
+        fresh = self._spawn()
+        self._pool[self._pool.index(worker)] = fresh
+        return fresh
+
+    def _record(self, result: dict) -> dict:
+        self.processed += 1
+        if not result["ok"]:
+            self.failed += 1
+            if result["error"] == "timeout":
+                self.timeouts += 1
+        return result
+
+    def imap(self, tasks):
+        """
+        Extract text for an iterable of (key, source) pairs.
+        Yields result dicts in completion order. The input is consumed
+        lazily, at most one document ahead per worker, so it can be a
+        generator fed by a download stage. Such a generator may yield None
+        to say "nothing ready yet": the pool then keeps collecting results
+        and checking timeouts, and polls the input again shortly after.
+        """
+        tasks = iter(tasks)
+        exhausted = False
+        starved = False
+
+        try:
+            while True:
+                # Hand work to idle workers, starting processes on first use
+                while not exhausted:
+                    idle = next((w for w in self._pool if not w.busy), None)
+                    if idle is None and len(self._pool) >= self.workers:
+                        break
+                    try:
+                        task = next(tasks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    starved = task is None
+                    if starved:
+                        break
+                    key, source = task
+                    if idle is None:
+                        idle = self._spawn()
+                        self._pool.append(idle)
+                    idle.submit(key, source, self.timeout)
+
+                busy = [w for w in self._pool if w.busy]
+                if not busy:
+                    if exhausted:
+                        return
+                    continue
+
+                now = time.monotonic()
+                wait_for = max(0.0, min(w.deadline for w in busy) - now)
+                if starved:
+                    wait_for = min(wait_for, self.POLL_INTERVAL)
+                ready = wait([w.conn for w in busy], timeout=wait_for)
+
+                for worker in busy:
+                    if worker.conn not in ready:
+                        continue
+                    key = worker.task_key
+                    try:
+                        key, text, error, elapsed = worker.conn.recv()
+                    except (EOFError, OSError):
+                        # Process died mid-document (segfault, OOM kill, ...)
+                        worker.finish()
+                        self._replace(worker, kill=True)
+                        yield self._record(_result(key, error="worker crashed"))
+                        continue
+
+                    worker.finish()
+                    if worker.exhausted:
+                        self._replace(worker)
+                    yield self._record(_result(key, text, error, elapsed))
+
+                # Kill workers stuck past their deadline
+                now = time.monotonic()
+                for worker in list(self._pool):
+                    if worker.busy and now >= worker.deadline:
+                        key = worker.task_key
+                        worker.finish()
+                        self._replace(worker, kill=True)
+                        yield self._record(_result(key, error="timeout", elapsed=self.timeout))
+        finally:
+            # Consumer stopped early: do not leave stale work in the pool
+            for worker in list(self._pool):
+                if worker.busy:
+                    worker.finish()
+                    self._replace(worker, kill=True)
+
+    def map(self, tasks) -> list[dict]:
+        """
+        Extract all documents and return their results (completion order).
+        """
+        return list(self.imap(tasks))
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "worker_restarts": self.restarts,
+        }
+
+    def close(self):
+        """
+        Stop all worker processes.
+        """
+        for worker in self._pool:
+            worker.stop(kill=worker.busy)
+        self._pool = []
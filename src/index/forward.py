@@ -0,0 +1,118 @@
+import os
+import struct
+from array import array
+
+from .compression import decode_postings, encode_postings
+
+
+MAGIC = b"FWD1"
+
+# File header: term count, document count, vocabulary size in bytes
+_HEADER = struct.Struct("<III")
+
+# Document record header: doc_id, length (tokens), URL size, vector size
+_RECORD = struct.Struct("<IIII")
+
+
+def forward_path_for(index_path: str) -> str:
+    """
+    Where the pipeline keeps the forward index of the index saved at
+    index_path: next to it ("data/index.json" -> "data/index.forward.bin").
+    """
+    return os.path.splitext(index_path)[0] + ".forward.bin"
+
+
+def _invert(indexer) -> dict:
+    """
+    doc_id -> (term_ids, tfs) arrays, term IDs ascending.
+    """
+    vectors = {doc_id: (array("I"), array("I")) for doc_id in indexer.docs}
+    for term_id, term in enumerate(indexer.terms):
+        for doc_id, tf in indexer.iter_postings(term):
+            term_ids, tfs = vectors[doc_id]
+            term_ids.append(term_id)
+            tfs.append(tf)
+    return vectors
+
+
+def save_forward_index(indexer, path: str):
+    """
+    Write the forward index (one term vector per document) of an Indexer.
+
+    Layout:
+        MAGIC, header (terms, docs, vocabulary bytes)
+        vocabulary: terms in term-ID order, newline-separated (UTF-8)
+        one record per document, by doc ID:
+            header (doc_id, length, URL bytes, vector bytes), URL,
+            vector: (term-ID gap, tf) pairs, vbyte-encoded
+
+    Vectors are built by inverting the postings, which costs two array
+    items per posting while writing.
+    """
+    vectors = _invert(indexer)
+    vocabulary = "\n".join(indexer.terms).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(indexer.terms), len(vectors), len(vocabulary)))
+        f.write(vocabulary)
+
+        for doc_id in sorted(vectors):
+            term_ids, tfs = vectors.pop(doc_id)
+            meta = indexer.docs[doc_id]
+            url = meta.url.encode("utf-8")
+            data = encode_postings(term_ids, tfs)
+            f.write(_RECORD.pack(doc_id, meta.length, len(url), len(data)))
+            f.write(url)
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ForwardIndex:
+    """
+    Reader for a forward index file written by save_forward_index().
+
+    - terms:        vocabulary (term ID -> term)
+    - iteration:    streams (doc_id, term_ids, tfs) by doc ID; only one
+                    document vector is in memory at a time
+    - documents():  streams (doc_id, url, length)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"not a forward index file: {path}")
+            n_terms, self.doc_count, vocab_size = _HEADER.unpack(f.read(_HEADER.size))
+            vocabulary = f.read(vocab_size).decode("utf-8")
+            self._records_start = f.tell()
+
+        self.terms = vocabulary.split("\n") if n_terms else []
+
+    def __len__(self):
+        return self.doc_count
+
+    def _records(self):
+        with open(self.path, "rb") as f:
+            f.seek(self._records_start)
+            while True:
+                header = f.read(_RECORD.size)
+                if not header:
+                    return
+                doc_id, length, url_size, data_size = _RECORD.unpack(header)
+                url = f.read(url_size).decode("utf-8")
+                yield doc_id, length, url, f.read(data_size)
+
+    def __iter__(self):
+        for doc_id, _, _, data in self._records():
+            term_ids, tfs = decode_postings(data)
+            yield doc_id, term_ids, tfs
+
+    def documents(self):
+        for doc_id, length, url, _ in self._records():
+            yield doc_id, url, length
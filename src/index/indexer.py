@@ -1,14 +1,193 @@
-from collections import defaultdict, Counter
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+
+from .compression import (
+    append_posting,
+    decode_positions,
+    decode_postings,
+    encode_positions,
+    encode_postings,
+    iter_postings,
+    read_vbyte,
+    vbyte_encode_number,
+)
+
+
+class DocRecord(Mapping):
+    """
+    Metadata for one indexed document.
+    Uses __slots__ (no per-record __dict__) but still reads like the
+    {"url": ..., "length": ...} dict it replaces.
+    """
+
+    __slots__ = ("url", "length")
+    _fields = ("url", "length")
+
+    def __init__(self, url: str, length: int):
+        self.url = url
+        self.length = length
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f"DocRecord(url={self.url!r}, length={self.length})"
+
+    def to_dict(self) -> dict:
+        return {"url": self.url, "length": self.length}
+
+
+class PostingsView(Mapping):
+    """
+    Read-only doc_id -> tf mapping over one term's postings arrays.
+    """
+
+    __slots__ = ("_docs", "_tfs")
+
+    def __init__(self, docs: array, tfs: array):
+        self._docs = docs
+        self._tfs = tfs
+
+    def __getitem__(self, doc_id):
+        doc_id = int(doc_id)
+        i = bisect_left(self._docs, doc_id)
+        if i < len(self._docs) and self._docs[i] == doc_id:
+            return self._tfs[i]
+        raise KeyError(doc_id)
+
+    def __contains__(self, doc_id):
+        try:
+            self[doc_id]
+        except (KeyError, ValueError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self._docs)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def keys(self):
+        return list(self._docs)
+
+    def items(self):
+        return zip(self._docs, self._tfs)
+
+
+class CompressedPostingsView(Mapping):
+    """
+    Read-only doc_id -> tf mapping over one vbyte-encoded postings list.
+    Iteration decodes lazily; lookups scan the list.
+    """
+
+    __slots__ = ("_data", "_df")
+
+    def __init__(self, data, df: int):
+        self._data = data
+        self._df = df
+
+    def __getitem__(self, doc_id):
+        doc_id = int(doc_id)
+        for d, tf in iter_postings(self._data):
+            if d == doc_id:
+                return tf
+            if d > doc_id:
+                break
+        raise KeyError(doc_id)
+
+    def __iter__(self):
+        return (d for d, _ in iter_postings(self._data))
+
+    def __len__(self):
+        return self._df
+
+    def items(self):
+        return iter_postings(self._data)
+
+
+class IndexView(Mapping):
+    """
+    Read-only token -> {doc_id: tf} view of an Indexer, so code written
+    against the old dict-of-dicts index keeps working.
+    """
+
+    __slots__ = ("_indexer",)
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, term):
+        return self._indexer._view(self._indexer.term_ids[term])
+
+    def __contains__(self, term):
+        return term in self._indexer.term_ids
+
+    def __iter__(self):
+        return iter(self._indexer.terms)
+
+    def __len__(self):
+        return len(self._indexer.terms)
 
 
 class Indexer:
     """
     Builds and maintains an inverted index for the Spectrum documents.
+
+    Memory layout:
+        term_ids        token -> integer term ID
+        terms           term ID -> token
+        postings_docs   term ID -> array('I') of doc IDs (ascending)
+        postings_tfs    term ID -> array('I') of term frequencies
+        docs            doc_id -> DocRecord(url, length)
+
+    Each posting costs 8 bytes instead of a dict entry with two boxed ints.
+    self.index exposes the familiar token -> {doc_id: tf} mapping on top.
+
+    With compress=True the two arrays are replaced by one vbyte-encoded
+    bytearray per term (doc-ID gaps + tfs, see index.compression), which
+    usually brings a posting down to 2-3 bytes:
+        postings_data   term ID -> bytearray of encoded postings
+        last_doc        term ID -> last doc ID appended (for the next gap)
+        doc_freqs       term ID -> number of postings
+
+    With positional=True every posting also records where the term occurs
+    in the document (token positions, vbyte-encoded as gaps), which is what
+    phrase and proximity queries need (see queries.phrase):
+        postings_positions  term ID -> bytearray, position runs of all postings
+        positions_offsets   term ID -> array('I'), start of each posting's run
     """
 
-    def __init__(self):
-        # token -> { doc_id: tf }
-        self.index = defaultdict(dict)
+    def __init__(self, compress: bool = False, positional: bool = False):
+        self.compress = compress
+        self.positional = positional
+
+        # token <-> term ID
+        self.term_ids = {}
+        self.terms = []
+
+        # term ID -> postings (parallel typed arrays)
+        self.postings_docs = []
+        self.postings_tfs = []
+
+        # term ID -> postings (compressed mode)
+        self.postings_data = []
+        self.last_doc = array("I")
+        self.doc_freqs = array("I")
+
+        # term ID -> positions (positional mode)
+        self.postings_positions = []
+        self.positions_offsets = []
 
         # doc_id -> metadata
         self.docs = {}
@@ -16,13 +195,110 @@ class Indexer:
         # internal document counter
         self.next_doc_id = 0
 
+        # token -> { doc_id: tf } (read-only view)
+        self.index = IndexView(self)
+
+    # Per-term buffers, flattened into one buffer + lengths when pickled
+    _PER_TERM = ("postings_docs", "postings_tfs", "postings_data", "postings_positions", "positions_offsets")
+
+    def __getstate__(self):
+        """
+        Compact pickled form (e.g. for shards sent between processes):
+        per-term buffers are joined into one blob each instead of being
+        pickled as thousands of small objects.
+        """
+        state = {
+            "compress": self.compress,
+            "positional": self.positional,
+            "terms": self.terms,
+            "next_doc_id": self.next_doc_id,
+            "last_doc": self.last_doc,
+            "doc_freqs": self.doc_freqs,
+            "docs": [(doc_id, meta.url, meta.length) for doc_id, meta in self.docs.items()],
+        }
+        for name in self._PER_TERM:
+            parts = getattr(self, name)
+            lengths = array("I", map(len, parts))
+            blob = b"".join(p.tobytes() if isinstance(p, array) else bytes(p) for p in parts)
+            state[name] = (lengths, blob)
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(compress=state["compress"], positional=state["positional"])
+        self.terms = state["terms"]
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.next_doc_id = state["next_doc_id"]
+        self.last_doc = state["last_doc"]
+        self.doc_freqs = state["doc_freqs"]
+        self.docs = {doc_id: DocRecord(url, length) for doc_id, url, length in state["docs"]}
+
+        for name in self._PER_TERM:
+            lengths, blob = state[name]
+            parts = []
+            pos = 0
+            if name in ("postings_data", "postings_positions"):
+                view = memoryview(blob)
+                for n in lengths:
+                    parts.append(bytearray(view[pos:pos + n]))
+                    pos += n
+            else:
+                flat = array("I")
+                flat.frombytes(blob)
+                for n in lengths:
+                    parts.append(flat[pos:pos + n])
+                    pos += n
+            setattr(self, name, parts)
+
+    def _term_id(self, token: str) -> int:
+        """
+        Return token's term ID, assigning a new one if needed.
+        """
+        term_id = self.term_ids.get(token)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.term_ids[token] = term_id
+            self.terms.append(token)
+            if self.compress:
+                self.postings_data.append(bytearray())
+                self.last_doc.append(0)
+                self.doc_freqs.append(0)
+            else:
+                self.postings_docs.append(array("I"))
+                self.postings_tfs.append(array("I"))
+            if self.positional:
+                self.postings_positions.append(bytearray())
+                self.positions_offsets.append(array("I"))
+        return term_id
+
+    def _append_posting(self, term_id: int, doc_id: int, tf: int, positions=None):
+        """
+        Append a posting; doc_id must be larger than the term's last one.
+        """
+        if self.compress:
+            append_posting(self.postings_data[term_id], self.last_doc[term_id], doc_id, tf)
+            self.last_doc[term_id] = doc_id
+            self.doc_freqs[term_id] += 1
+        else:
+            self.postings_docs[term_id].append(doc_id)
+            self.postings_tfs[term_id].append(tf)
+
+        if self.positional:
+            data = self.postings_positions[term_id]
+            self.positions_offsets[term_id].append(len(data))
+            data.extend(encode_positions(positions))
+
+    def _view(self, term_id: int):
+        if self.compress:
+            return CompressedPostingsView(self.postings_data[term_id], self.doc_freqs[term_id])
+        return PostingsView(self.postings_docs[term_id], self.postings_tfs[term_id])
+
     def add_document(self, tokens: list[str], url: str):
         """
         Add a new document to the inverted index.
 
         Steps:
             - assign doc_id
-            - compute term frequencies
+            - compute term frequencies (and positions in positional mode)
             - update index
             - store metadata
         """
@@ -30,21 +306,145 @@ class Indexer:
         doc_id = self.next_doc_id
         self.next_doc_id += 1
 
-        # Count TF using Counter
-        tf_counts = Counter(tokens)
-
-        # Update index
-        for token, freq in tf_counts.items():
-            self.index[token][doc_id] = freq
+        # Update index (doc IDs only grow, so postings stay sorted)
+        if self.positional:
+            positions = defaultdict(list)
+            for pos, token in enumerate(tokens):
+                positions[token].append(pos)
+            for token, token_positions in positions.items():
+                self._append_posting(self._term_id(token), doc_id, len(token_positions), token_positions)
+        else:
+            # Count TF using Counter
+            for token, freq in Counter(tokens).items():
+                self._append_posting(self._term_id(token), doc_id, freq)
 
         # Store metadata
-        self.docs[doc_id] = {
-            "url": url,
-            "length": len(tokens)
-        }
+        self.docs[doc_id] = DocRecord(url, len(tokens))
 
         return doc_id
 
+    def extend(self, other: "Indexer"):
+        """
+        Append another index whose doc IDs all come after this one's, e.g. a
+        shard built over the next doc-ID range.
+        New terms get IDs in the other index's first-occurrence order, so
+        extending shards in doc-ID order gives exactly the index a single
+        sequential build would have produced.
+        """
+        if (other.compress, other.positional) != (self.compress, self.positional):
+            raise ValueError("cannot merge indexes built with different options")
+        if other.docs and min(other.docs) < self.next_doc_id:
+            raise ValueError("the other index's doc IDs must follow this index's")
+
+        for term_id, term in enumerate(other.terms):
+            target = self._term_id(term)
+            if self.compress:
+                # Re-base the first doc-ID gap on our last doc ID
+                data = other.postings_data[term_id]
+                first_doc, pos = read_vbyte(data)
+                out = self.postings_data[target]
+                vbyte_encode_number(first_doc - self.last_doc[target], out)
+                out.extend(data[pos:])
+                self.last_doc[target] = other.last_doc[term_id]
+                self.doc_freqs[target] += other.doc_freqs[term_id]
+            else:
+                self.postings_docs[target].extend(other.postings_docs[term_id])
+                self.postings_tfs[target].extend(other.postings_tfs[term_id])
+
+            if self.positional:
+                base = len(self.postings_positions[target])
+                self.positions_offsets[target].extend(o + base for o in other.positions_offsets[term_id])
+                self.postings_positions[target].extend(other.postings_positions[term_id])
+
+        self.docs.update(other.docs)
+        self.next_doc_id = max(self.next_doc_id, other.next_doc_id)
+
+    def postings(self, term: str):
+        """
+        Return (doc_ids, tfs) arrays for term, or None if it is not indexed.
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return None
+        if self.compress:
+            return decode_postings(self.postings_data[term_id])
+        return self.postings_docs[term_id], self.postings_tfs[term_id]
+
+    def doc_ids(self, term: str):
+        """
+        Sorted doc IDs containing term (empty if the term is not indexed).
+        """
+        found = self.postings(term)
+        return found[0] if found else array("I")
+
+    def iter_postings(self, term: str):
+        """
+        Yield (doc_id, tf) pairs for term without expanding a compressed list.
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return iter(())
+        if self.compress:
+            return iter_postings(self.postings_data[term_id])
+        return zip(self.postings_docs[term_id], self.postings_tfs[term_id])
+
+    def positions_at(self, term_id: int, i: int) -> list[int]:
+        """
+        Token positions of the i-th posting of a term ID (positional mode).
+        """
+        if not self.positional:
+            raise ValueError("index was built without positions")
+        offsets = self.positions_offsets[term_id]
+        data = self.postings_positions[term_id]
+        end = offsets[i + 1] if i + 1 < len(offsets) else len(data)
+        return decode_positions(data[offsets[i]:end])
+
+    def positions(self, term: str, doc_id: int) -> list[int]:
+        """
+        Token positions of term in one document ([] if it does not occur).
+        """
+        doc_ids = self.doc_ids(term)
+        i = bisect_left(doc_ids, doc_id)
+        if i == len(doc_ids) or doc_ids[i] != doc_id:
+            return []
+        return self.positions_at(self.term_ids[term], i)
+
+    def iter_positions(self, term: str):
+        """
+        Yield (doc_id, positions) for every document containing term.
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return
+        for i, doc_id in enumerate(self.doc_ids(term)):
+            yield doc_id, self.positions_at(term_id, i)
+
+    def encoded_positions(self, term_id: int) -> bytes:
+        """
+        Position runs of all postings of a term ID, back to back
+        (each run is as long as the posting's tf).
+        """
+        return bytes(self.postings_positions[term_id])
+
+    def encoded_postings(self, term_id: int) -> bytes:
+        """
+        vbyte-encoded postings of a term ID (see index.compression).
+        """
+        if self.compress:
+            return bytes(self.postings_data[term_id])
+        return encode_postings(self.postings_docs[term_id], self.postings_tfs[term_id])
+
+    def doc_freq(self, term: str) -> int:
+        """
+        Number of documents containing term.
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return 0
+        if self.compress:
+            return self.doc_freqs[term_id]
+        return len(self.postings_docs[term_id])
+
     def get_index(self):
         """
         Returns the full inverted index.
@@ -62,3 +462,10 @@ class Indexer:
         Number of indexed documents.
         """
         return len(self.docs)
+
+    @property
+    def version(self) -> int:
+        """
+        Changes whenever documents are added (query caches compare it).
+        """
+        return self.next_doc_id
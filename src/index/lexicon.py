@@ -0,0 +1,270 @@
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+
+from .compression import vbyte_decode, vbyte_encode
+
+
+MAGIC = b"LEX1"
+
+# File header: k, term count, gram count
+_HEADER = struct.Struct("<III")
+
+# Gram record header: gram size, encoded term-list size (bytes)
+_GRAM = struct.Struct("<II")
+
+# Marks the start and end of a term in its k-grams ("$waste$")
+BOUNDARY = "$"
+
+
+def vocabulary(index):
+    """
+    The terms of any index: Indexer.terms, SegmentedIndex.terms(), or
+    iteration for BinaryIndex and plain dicts.
+    """
+    terms = getattr(index, "terms", None)
+    if callable(terms):
+        return terms()
+    return terms if terms is not None else iter(index)
+
+
+def _kgrams(text: str, k: int) -> set[str]:
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def edit_distance(a: str, b: str, limit: int | None = None) -> int:
+    """
+    Levenshtein distance between a and b. With a limit, stops as soon as
+    the distance is known to exceed it and returns limit + 1.
+    """
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _contains(sorted_ids, value: int) -> bool:
+    i = bisect_left(sorted_ids, value)
+    return i < len(sorted_ids) and sorted_ids[i] == value
+
+
+class Lexicon:
+    """
+    Term dictionary for query-term expansion.
+
+    - terms:       the vocabulary, sorted; a prefix is a contiguous range
+                   found by binary search
+    - k-gram index: k-gram of "$term$" -> sorted positions (in terms) of
+                   the terms containing it, for infix wildcards and
+                   spelling candidates
+
+    Lookups never scan the vocabulary: prefix() is two binary searches,
+    wildcard() intersects the k-gram lists of the pattern's literal parts
+    (shortest list first, bisecting into the others), and fuzzy() counts
+    shared k-grams over the word's own k-gram lists before checking edit
+    distance. Candidates are always verified, so results are exact.
+    """
+
+    def __init__(self, terms, k: int = 3):
+        if k < 2:
+            raise ValueError("k must be at least 2")
+        self.k = k
+        self.terms = sorted(set(terms))
+        self._grams = {}    # gram -> array('I') of term positions, or vbyte gaps when loaded
+        for i, term in enumerate(self.terms):
+            for gram in _kgrams(BOUNDARY + term + BOUNDARY, k):
+                ids = self._grams.get(gram)
+                if ids is None:
+                    ids = self._grams[gram] = array("I")
+                ids.append(i)
+
+    @classmethod
+    def from_index(cls, index, k: int = 3) -> "Lexicon":
+        return cls(vocabulary(index), k)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return _contains(self.terms, term) if isinstance(term, str) else False
+
+    def _gram_ids(self, gram: str):
+        ids = self._grams.get(gram)
+        if ids is None:
+            return ()
+        if isinstance(ids, bytes):
+            ids = self._grams[gram] = array("I", accumulate(vbyte_decode(ids)))
+        return ids
+
+    # ---------- prefix ----------
+
+    def prefix_range(self, prefix: str) -> range:
+        """
+        Positions in terms of the terms starting with prefix.
+        """
+        start = bisect_left(self.terms, prefix)
+        if not prefix:
+            return range(start, len(self.terms))
+        successor = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return range(start, bisect_left(self.terms, successor, start))
+
+    def prefix(self, prefix: str, limit: int | None = None) -> list[str]:
+        found = self.prefix_range(prefix)
+        if limit is not None:
+            found = found[:limit]
+        return [self.terms[i] for i in found]
+
+    # ---------- wildcards ----------
+
+    def wildcard(self, pattern: str, limit: int | None = None) -> list[str]:
+        """
+        Terms matching pattern, where * stands for any run of characters
+        (e.g. "sustainab*", "*ability", "re*cling"), in sorted order.
+        """
+        if "*" not in pattern:
+            return [pattern] if pattern in self else []
+        pieces = pattern.split("*")
+        if not any(pieces):
+            raise ValueError("a wildcard pattern needs at least one character")
+
+        head = pieces[0]
+        if len(pieces) == 2 and not pieces[1]:
+            return self.prefix(head, limit)     # plain prefix: "sustainab*"
+
+        # k-gram lists of every literal part, anchored with $ at the ends
+        anchored = (BOUNDARY + pattern + BOUNDARY).split("*")
+        lists = [self._gram_ids(gram) for piece in anchored if len(piece) >= self.k for gram in _kgrams(piece, self.k)]
+
+        within = self.prefix_range(head) if head else None
+        if lists:
+            lists.sort(key=len)
+            driver = lists[0] if within is None or len(lists[0]) <= len(within) else within
+            candidates = (
+                i for i in driver
+                if (within is None or i in within) and all(_contains(ids, i) for ids in lists)
+            )
+        elif within is not None:
+            candidates = within
+        else:
+            # Only pieces shorter than k (e.g. "*ab*"): union the lists of
+            # the grams that contain the longest piece. This scans the gram
+            # table, whose size does not grow with the vocabulary.
+            piece = max((p for p in anchored if p.strip(BOUNDARY)), key=len)
+            ids = set()
+            for gram in list(self._grams):
+                if piece in gram:
+                    ids.update(self._gram_ids(gram))
+            candidates = sorted(ids)
+
+        regex = re.compile(".*".join(map(re.escape, pieces)), re.DOTALL)
+        found = []
+        for i in candidates:
+            if regex.fullmatch(self.terms[i]):
+                found.append(self.terms[i])
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    # ---------- spelling ----------
+
+    def fuzzy(self, word: str, max_distance: int = 2, limit: int | None = None) -> list[tuple[str, int]]:
+        """
+        (term, edit distance) for the terms within max_distance of word,
+        closest first (ties in term order).
+
+        Candidates come from the k-gram lists of word: one edit changes
+        at most k of its k-grams, so a term within distance d shares at
+        least (number of k-grams - k * d) of them (and at least one, so
+        very short words only reach terms that share a k-gram).
+        """
+        grams = _kgrams(BOUNDARY + word + BOUNDARY, self.k)
+        needed = max(1, len(grams) - self.k * max_distance)
+
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._gram_ids(gram))
+
+        found = []
+        for i, count in shared.items():
+            if count < needed:
+                continue
+            term = self.terms[i]
+            distance = edit_distance(word, term, max_distance)
+            if distance <= max_distance:
+                found.append((distance, term))
+        found.sort()
+        if limit is not None:
+            found = found[:limit]
+        return [(term, distance) for distance, term in found]
+
+
+def lexicon_path_for(index_path: str) -> str:
+    """
+    Where the lexicon of the index at index_path is kept: inside a binary
+    index directory ("data/index_bin/lexicon.bin"), next to a JSON index
+    file otherwise ("data/index.json" -> "data/index.lexicon.bin").
+    """
+    if os.path.isdir(index_path):
+        return os.path.join(index_path, "lexicon.bin")
+    return os.path.splitext(index_path)[0] + ".lexicon.bin"
+
+
+def save_lexicon(lexicon: Lexicon, path: str):
+    """
+    Write a lexicon:
+        MAGIC, header (k, terms, grams)
+        vocabulary: sorted terms, newline-separated (UTF-8), size-prefixed
+        one record per gram: header (gram bytes, list bytes), gram,
+            term positions as vbyte gaps
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    vocabulary_bytes = "\n".join(lexicon.terms).encode("utf-8")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(lexicon.k, len(lexicon.terms), len(lexicon._grams)))
+        f.write(struct.pack("<Q", len(vocabulary_bytes)))
+        f.write(vocabulary_bytes)
+        for gram in sorted(lexicon._grams):
+            ids = lexicon._gram_ids(gram)
+            data = vbyte_encode(b - a for a, b in zip([0] + list(ids[:-1]), ids))
+            key = gram.encode("utf-8")
+            f.write(_GRAM.pack(len(key), len(data)))
+            f.write(key)
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_lexicon(path: str) -> Lexicon:
+    """
+    Read a lexicon written by save_lexicon(). K-gram lists stay encoded
+    until a query first needs them.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"not a lexicon file: {path}")
+        k, n_terms, n_grams = _HEADER.unpack(f.read(_HEADER.size))
+        (vocabulary_size,) = struct.unpack("<Q", f.read(8))
+        text = f.read(vocabulary_size).decode("utf-8")
+
+        lexicon = Lexicon((), k)
+        lexicon.terms = text.split("\n") if n_terms else []
+        for _ in range(n_grams):
+            key_size, data_size = _GRAM.unpack(f.read(_GRAM.size))
+            gram = f.read(key_size).decode("utf-8")
+            lexicon._grams[gram] = f.read(data_size)
+    return lexicon
@@ -0,0 +1,71 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .indexer import Indexer
+from .tokenizer import Tokenizer
+
+
+# One tokenizer per worker process (keeps its stem cache between shards)
+_tokenizers = {}
+
+
+def _index_shard(start_doc_id: int, batch: list, use_stemming: bool, compress: bool, positional: bool) -> Indexer:
+    """
+    Worker: tokenize and index one batch of (url, text) documents,
+    numbering them from start_doc_id.
+    """
+    tokenizer = _tokenizers.get(use_stemming)
+    if tokenizer is None:
+        tokenizer = _tokenizers[use_stemming] = Tokenizer(use_stemming=use_stemming)
+
+    shard = Indexer(compress=compress, positional=positional)
+    shard.next_doc_id = start_doc_id
+    for url, text in batch:
+        shard.add_document(tokenizer.tokenize(text), url)
+    return shard
+
+
+def build_index_parallel(
+    documents,
+    workers: int | None = None,
+    shard_size: int = 256,
+    use_stemming: bool = False,
+    compress: bool = False,
+    positional: bool = False
+) -> Indexer:
+    """
+    Tokenize and index (url, text) documents in worker processes.
+
+    Documents are cut into shards of shard_size consecutive documents; each
+    worker builds a partial Indexer over its shard's doc-ID range, and the
+    shards are merged with Indexer.extend() in doc-ID order as they come
+    back. The result (doc IDs, term IDs, postings) is identical to indexing
+    the same documents one by one in a single process.
+
+    documents may be a generator: at most two shards per worker are in
+    flight, so memory does not grow with the corpus beyond the index itself.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    merged = Indexer(compress=compress, positional=positional)
+    documents = iter(documents)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        next_doc_id = 0
+        while True:
+            # Keep the pool busy without reading the whole corpus up front
+            while len(pending) < 2 * workers:
+                batch = list(itertools.islice(documents, shard_size))
+                if not batch:
+                    break
+                pending.append(pool.submit(_index_shard, next_doc_id, batch, use_stemming, compress, positional))
+                next_doc_id += len(batch)
+
+            if not pending:
+                break
+
+            # Merge strictly in submission (= doc-ID) order
+            merged.extend(pending.pop(0).result())
+
+    return merged
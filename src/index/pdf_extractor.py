@@ -1,36 +1,140 @@
 import io
-import requests
+import os
+import tempfile
 from pdfminer.high_level import extract_text_to_fp #https://pypi.org/project/pdfminer.six/20251107/
 
+from crawler.client import get_client
 
-def download_pdf(url: str) -> bytes | None:
+
+# Largest PDF we are willing to download (bytes)
+MAX_PDF_BYTES = 200 * 1024 ** 2
+
+# Downloads larger than this are spooled from memory to a temporary file
+SPOOL_THRESHOLD = 8 * 1024 ** 2
+
+CHUNK_SIZE = 64 * 1024
+
+# Content-Type values accepted for a PDF download (servers often use octet-stream)
+PDF_CONTENT_TYPES = {
+    "application/pdf",
+    "application/x-pdf",
+    "application/octet-stream",
+    "binary/octet-stream",
+}
+
+
+def download_pdf_to_file(
+    url: str,
+    max_bytes: int = MAX_PDF_BYTES,
+    spool_threshold: int = SPOOL_THRESHOLD,
+    dest: str | None = None
+):
     """
-    Downloads a PDF and returns the raw bytes.
-    Returns None if the download fails.
+    Stream a PDF into a SpooledTemporaryFile, chunk by chunk.
+    Small files stay in memory; large ones roll over to disk.
+    If dest is given the PDF is written to that path instead (so another
+    process can open it); the file is removed again if the download fails.
+
+    The download is aborted early (returns None) if:
+        - the request fails or the status is not 200
+        - Content-Type is not a PDF type
+        - Content-Length, or the bytes actually received, exceed max_bytes
+        - the body does not start with a PDF header
+
+    Returns the file positioned at 0 (caller closes it), or None.
     """
+    client = get_client()
+    resp = client.get(url, timeout=10, stream=True)
+    if resp is None:
+        return None
+
+    spool = None
     try:
-        resp = requests.get(url, timeout=10)
         if resp.status_code != 200:
             return None
-        return resp.content
+
+        content_type = resp.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if content_type and content_type not in PDF_CONTENT_TYPES:
+            return None
+
+        length = resp.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > max_bytes:
+            return None
+
+        if dest:
+            spool = open(dest, "w+b")
+        else:
+            spool = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+        size = 0
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            if size == 0 and b"%PDF-" not in chunk[:1024]:
+                return None
+            size += len(chunk)
+            if size > max_bytes:
+                return None
+            spool.write(chunk)
+
+        if size == 0:
+            return None
+
+        if not getattr(resp, "from_cache", False):
+            client.stats.add_bytes(size)
+            client.remember(url, resp, spool)
+
+        spool.seek(0)
+        result, spool = spool, None
+        return result
     except Exception:
         return None
+    finally:
+        if spool is not None:
+            spool.close()
+            if dest:
+                os.remove(dest)
+        resp.close()
 
 
-def extract_pdf_text(pdf_bytes: bytes) -> str:
+def download_pdf(url: str, max_bytes: int = MAX_PDF_BYTES) -> bytes | None:
     """
-    Extract text from PDF bytes using pdfminer.
-    Returns raw text (UTF-8).
+    Downloads a PDF and returns the raw bytes.
+    Returns None if the download fails.
+    Prefer download_pdf_to_file() for large documents.
     """
-    if not pdf_bytes:
+    spool = download_pdf_to_file(url, max_bytes=max_bytes)
+    if spool is None:
+        return None
+    with spool:
+        return spool.read()
+
+
+def extract_pdf_text_strict(pdf) -> str:
+    """
+    Like extract_pdf_text(), but lets pdfminer errors propagate so callers
+    can report why a document failed.
+    Also accepts a filesystem path to the PDF.
+    """
+    if not pdf:
         return ""
 
-    input_buffer = io.BytesIO(pdf_bytes)
+    if isinstance(pdf, str):
+        with open(pdf, "rb") as f:
+            return extract_pdf_text_strict(f)
+
+    input_buffer = io.BytesIO(pdf) if isinstance(pdf, (bytes, bytearray)) else pdf
     output_buffer = io.StringIO()
 
+    extract_text_to_fp(input_buffer, output_buffer, laparams=None)
+    return output_buffer.getvalue()
+
+
+def extract_pdf_text(pdf) -> str:
+    """
+    Extract text from a PDF using pdfminer.
+    Accepts raw bytes or a seekable binary file object (e.g. the spooled
+    file returned by download_pdf_to_file), which is read in place.
+    Returns raw text (UTF-8).
+    """
     try:
-        extract_text_to_fp(input_buffer, output_buffer, laparams=None)
-        text = output_buffer.getvalue()
-        return text
+        return extract_pdf_text_strict(pdf)
     except Exception:
         return ""
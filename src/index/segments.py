@@ -0,0 +1,351 @@
+import json
+import os
+import threading
+from array import array
+
+from .indexer import DocRecord, Indexer
+from .storage import load_indexer_json, save_index_json
+
+
+class SegmentedIndex:
+    """
+    Incrementally updated index made of immutable segments.
+
+    - New documents go into an in-memory buffer segment; commit() writes
+      it to directory as a small segment file (compressed JSON index).
+    - Doc IDs are never reused: the next ID is stored in the manifest.
+    - Deleting or updating a URL records a tombstone for its current doc
+      ID; queries skip tombstoned documents until a merge purges them.
+    - Queries read across all segments plus the uncommitted buffer.
+    - Merge policy (log-structured): when merge_factor adjacent segments
+      fall in the same size tier they are merged into one. Only adjacent
+      segments are merged, so segments keep ascending, disjoint doc ID
+      ranges and postings concatenate in order. Merges run on a
+      background thread unless background_merge is False.
+
+    The manifest (segment list, tombstones, next doc ID) is replaced
+    atomically on every commit and merge, so a crash leaves the last
+    committed state behind.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        merge_factor: int = 10,
+        max_buffered_docs: int = 1000,
+        background_merge: bool = True
+    ):
+        self.directory = directory
+        self.merge_factor = max(2, merge_factor)
+        self.max_buffered_docs = max_buffered_docs
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, "manifest.json")
+
+        # Protects segments, deleted, url_to_doc and the manifest
+        self._lock = threading.RLock()
+
+        self.segments = []          # [(name, Indexer)], ascending doc IDs
+        self.deleted = set()        # tombstoned doc IDs
+        self.url_to_doc = {}        # live URL -> doc ID
+        self.next_doc_id = 0
+        self.generation = 0
+        self.merges = 0
+        self.version = 0            # bumped on every add/delete (for query caches)
+        self._load()
+        self._new_buffer()
+
+        self._merge_wanted = threading.Event()
+        self._merging = threading.Lock()
+        self._stop = False
+        self._merge_thread = None
+        if background_merge:
+            self._merge_thread = threading.Thread(target=self._merge_loop, daemon=True)
+            self._merge_thread.start()
+
+    # ---------- persistence ----------
+
+    def _segment_path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        self.next_doc_id = manifest["next_doc_id"]
+        self.generation = manifest["generation"]
+        self.deleted = set(manifest["deleted"])
+        for name in manifest["segments"]:
+            segment = load_indexer_json(self._segment_path(name), compress=True)
+            self.segments.append((name, segment))
+            for doc_id, meta in segment.docs.items():
+                if doc_id not in self.deleted:
+                    self.url_to_doc[meta.url] = doc_id
+
+    def _save_manifest(self):
+        data = {
+            "next_doc_id": self.next_doc_id,
+            "generation": self.generation,
+            "segments": [name for name, _ in self.segments],
+            "deleted": sorted(self.deleted),
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _write_segment(self, indexer: Indexer) -> str:
+        self.generation += 1
+        name = f"seg_{self.generation:06d}.json"
+        save_index_json(indexer, self._segment_path(name), compress=True)
+        return name
+
+    def _new_buffer(self):
+        self._buffer = Indexer(compress=True)
+        self._buffer.next_doc_id = self.next_doc_id
+
+    # ---------- updates ----------
+
+    def add_document(self, tokens: list[str], url: str) -> int:
+        """
+        Index a document. If the URL is already indexed, the old version
+        is tombstoned (i.e. this is an update). Returns the new doc ID.
+        """
+        with self._lock:
+            self._tombstone(url)
+            doc_id = self._buffer.add_document(tokens, url)
+            self.next_doc_id = self._buffer.next_doc_id
+            self.version += 1
+            self.url_to_doc[url] = doc_id
+
+            if len(self._buffer.docs) >= self.max_buffered_docs:
+                self.commit()
+        return doc_id
+
+    def update_document(self, tokens: list[str], url: str) -> int:
+        """
+        Replace the indexed version of url (same as add_document).
+        """
+        return self.add_document(tokens, url)
+
+    def delete_document(self, url: str) -> bool:
+        """
+        Remove url from the index. Returns False if it was not indexed.
+        """
+        with self._lock:
+            return self._tombstone(url)
+
+    def _tombstone(self, url: str) -> bool:
+        doc_id = self.url_to_doc.pop(url, None)
+        if doc_id is None:
+            return False
+        self.deleted.add(doc_id)
+        self.version += 1
+        return True
+
+    def commit(self):
+        """
+        Write buffered documents as a new segment and persist tombstones.
+        """
+        with self._lock:
+            if self._buffer.docs:
+                name = self._write_segment(self._buffer)
+                self.segments.append((name, self._buffer))
+                self._new_buffer()
+            self._save_manifest()
+
+        if self._merge_thread is not None:
+            self._merge_wanted.set()
+
+    # ---------- merging ----------
+
+    def _tier(self, segment: Indexer) -> int:
+        """
+        Size tier: floor(log_merge_factor(doc count)).
+        """
+        tier = 0
+        size = len(segment.docs)
+        while size >= self.merge_factor:
+            size //= self.merge_factor
+            tier += 1
+        return tier
+
+    def _find_merge(self, segments) -> tuple[int, int] | None:
+        """
+        Return (start, end) of merge_factor adjacent segments in the same
+        tier, or None if nothing needs merging.
+        """
+        run_start = 0
+        for i in range(1, len(segments) + 1):
+            if i == len(segments) or self._tier(segments[i][1]) != self._tier(segments[run_start][1]):
+                if i - run_start >= self.merge_factor:
+                    return run_start, run_start + self.merge_factor
+                run_start = i
+        return None
+
+    def maybe_merge(self) -> bool:
+        """
+        Run one merge if the policy asks for it. Returns True if it merged.
+        """
+        with self._merging:
+            with self._lock:
+                found = self._find_merge(self.segments)
+                if found is None:
+                    return False
+                start, end = found
+                victims = self.segments[start:end]
+                deleted = set(self.deleted)
+
+            # Build the merged segment outside the lock; segments are immutable
+            merged = Indexer(compress=True)
+            purged = set()
+            for _, segment in victims:
+                for term in segment.terms:
+                    target = None
+                    for doc_id, tf in segment.iter_postings(term):
+                        if doc_id in deleted:
+                            continue
+                        if target is None:
+                            target = merged._term_id(term)
+                        merged._append_posting(target, doc_id, tf)
+                for doc_id, meta in segment.docs.items():
+                    if doc_id in deleted:
+                        purged.add(doc_id)
+                    else:
+                        merged.docs[doc_id] = meta
+            merged.next_doc_id = max(merged.docs, default=-1) + 1
+
+            with self._lock:
+                name = self._write_segment(merged)
+                names = {n for n, _ in victims}
+                first = next(i for i, (n, _) in enumerate(self.segments) if n in names)
+                self.segments = (
+                    self.segments[:first]
+                    + [(name, merged)]
+                    + [s for s in self.segments[first:] if s[0] not in names]
+                )
+                self.deleted -= purged
+                self._save_manifest()
+                self.merges += 1
+
+            for old in names:
+                os.remove(self._segment_path(old))
+            return True
+
+    def merge_all(self):
+        """
+        Run merges until the policy is satisfied.
+        """
+        while self.maybe_merge():
+            pass
+
+    def _merge_loop(self):
+        while True:
+            self._merge_wanted.wait()
+            self._merge_wanted.clear()
+            if self._stop:
+                return
+            self.merge_all()
+
+    def wait_for_merges(self):
+        """
+        Block until pending merges are done (mainly for tests and shutdown).
+        """
+        self.merge_all()
+
+    def close(self):
+        """
+        Commit buffered documents and stop the merge thread.
+        """
+        self.commit()
+        if self._merge_thread is not None:
+            self._stop = True
+            self._merge_wanted.set()
+            self._merge_thread.join()
+            self._merge_thread = None
+
+    # ---------- queries ----------
+
+    def _snapshot(self, read_buffer):
+        """
+        Committed segments, tombstones and read_buffer(buffer), all taken
+        under the lock. Segments are immutable once committed, but the
+        buffer changes with every add, so it is only read here.
+        """
+        with self._lock:
+            segments = [s for _, s in self.segments]
+            return segments, frozenset(self.deleted), read_buffer(self._buffer)
+
+    def postings(self, term: str):
+        """
+        (doc_ids, tfs) arrays for term across all segments, without
+        tombstoned documents. None if no live document contains the term.
+        """
+        segments, deleted, buffered = self._snapshot(lambda buffer: list(buffer.iter_postings(term)))
+        doc_ids = array("I")
+        tfs = array("I")
+        for postings in [s.iter_postings(term) for s in segments] + [buffered]:
+            for doc_id, tf in postings:
+                if doc_id not in deleted:
+                    doc_ids.append(doc_id)
+                    tfs.append(tf)
+        if not doc_ids:
+            return None
+        return doc_ids, tfs
+
+    def doc_ids(self, term: str):
+        found = self.postings(term)
+        return found[0] if found else array("I")
+
+    def iter_postings(self, term: str):
+        found = self.postings(term)
+        return zip(*found) if found else iter(())
+
+    def doc_freq(self, term: str) -> int:
+        return len(self.doc_ids(term))
+
+    def terms(self) -> set[str]:
+        segments, _, vocabulary = self._snapshot(lambda buffer: set(buffer.terms))
+        for segment in segments:
+            vocabulary.update(segment.terms)
+        return vocabulary
+
+    def get_docs(self) -> dict:
+        """
+        Live documents: doc_id -> DocRecord.
+        """
+        segments, deleted, buffered = self._snapshot(lambda buffer: dict(buffer.docs))
+        return {
+            doc_id: meta
+            for docs in [s.docs for s in segments] + [buffered]
+            for doc_id, meta in docs.items()
+            if doc_id not in deleted
+        }
+
+    def document(self, url: str) -> DocRecord | None:
+        with self._lock:
+            doc_id = self.url_to_doc.get(url)
+            if doc_id is None:
+                return None
+            for _, segment in self.segments + [(None, self._buffer)]:
+                if doc_id in segment.docs:
+                    return segment.docs[doc_id]
+        return None
+
+    def total_docs(self) -> int:
+        with self._lock:
+            return len(self.url_to_doc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "segments": len(self.segments),
+                "buffered_docs": len(self._buffer.docs),
+                "live_docs": len(self.url_to_doc),
+                "tombstones": len(self.deleted),
+                "next_doc_id": self.next_doc_id,
+                "merges": self.merges,
+            }
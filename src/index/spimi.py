@@ -0,0 +1,314 @@
+import base64
+import heapq
+import json
+import os
+import struct
+import sys
+import time
+from collections import Counter
+
+from .binary_storage import BinaryIndexWriter
+from .compression import encode_postings, iter_postings, read_vbyte, vbyte_encode_number
+from .indexer import Indexer
+from .storage import COMPRESSED_FORMAT
+
+try:
+    import resource
+except ImportError:   # not available on Windows
+    resource = None
+
+
+# Block record header: term length, encoded postings length, last doc ID
+_RECORD = struct.Struct("<III")
+
+# Rough in-memory cost of a block entry, used to enforce the memory budget:
+# a new term costs its dict slot, string object, list slots and two arrays;
+# each posting costs two 4-byte array items
+TERM_OVERHEAD = 240
+POSTING_BYTES = 8
+
+
+def _peak_rss() -> int | None:
+    """
+    Peak resident set size of this process in bytes (None if unknown).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class SpimiIndexer:
+    """
+    Single-pass in-memory indexing (SPIMI) with a bounded memory budget.
+
+    Documents are added to an in-memory block (a plain Indexer). When the
+    block's estimated size reaches memory_budget it is written to block_dir
+    as a sorted run of (term, vbyte postings) records and a new block is
+    started. finish() then merges all blocks with a streaming k-way merge
+    straight into the final JSON index, so memory use is bounded by the
+    budget (plus one term's postings during the merge), not by corpus size.
+
+    Document metadata is appended to a log in block_dir instead of being
+    kept in memory. After every flush a manifest records the blocks and
+    doc count: if the build crashes, a new SpimiIndexer on the same
+    block_dir resumes from the last flushed block (resumed=True, and
+    next_doc_id is the first document that has to be added again).
+    """
+
+    def __init__(self, block_dir: str, memory_budget: int = 256 * 1024 ** 2, resume: bool = True):
+        self.block_dir = block_dir
+        self.memory_budget = memory_budget
+        os.makedirs(block_dir, exist_ok=True)
+
+        self.manifest_path = os.path.join(block_dir, "manifest.json")
+        self.docs_path = os.path.join(block_dir, "docs.jsonl")
+
+        self.blocks = []
+        self.next_doc_id = 0
+        self.resumed = False
+
+        # Counters for reporting
+        self.postings = 0
+        self.terms = 0
+        self.peak_memory = 0
+        self.merge_seconds = 0.0
+
+        if resume:
+            self._resume()
+        if not self.resumed:
+            self._clear()
+
+        self._docs_log = open(self.docs_path, "a", encoding="utf-8")
+        self._new_block()
+
+    def _new_block(self):
+        self._block = Indexer()
+        self._block_bytes = 0
+
+    def _block_path(self, name: str) -> str:
+        return os.path.join(self.block_dir, name)
+
+    def _clear(self):
+        """
+        Remove the files of a previous build.
+        """
+        for name in os.listdir(self.block_dir):
+            if name.startswith("block_") or name in ("manifest.json", "docs.jsonl"):
+                os.remove(self._block_path(name))
+
+    def _resume(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not all(os.path.exists(self._block_path(name)) for name in manifest["blocks"]):
+            return
+
+        self.blocks = manifest["blocks"]
+        self.next_doc_id = manifest["next_doc_id"]
+        self.postings = manifest["postings"]
+        self.peak_memory = manifest["peak_memory"]
+
+        # Drop metadata of documents added after the last flush
+        with open(self.docs_path, "r+b") as f:
+            f.truncate(manifest["docs_log_size"])
+        self.resumed = True
+
+    def _save_manifest(self):
+        data = {
+            "blocks": self.blocks,
+            "next_doc_id": self.next_doc_id,
+            "docs_log_size": self._docs_log.tell(),
+            "postings": self.postings,
+            "peak_memory": self.peak_memory,
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def add_document(self, tokens: list[str], url: str) -> int:
+        """
+        Add a document to the current block; flushes the block once it
+        reaches the memory budget. Returns the document's ID.
+        """
+        doc_id = self.next_doc_id
+        self.next_doc_id += 1
+
+        block = self._block
+        tf_counts = Counter(tokens)
+        for token, freq in tf_counts.items():
+            if token not in block.term_ids:
+                self._block_bytes += TERM_OVERHEAD + len(token)
+            block._append_posting(block._term_id(token), doc_id, freq)
+        self._block_bytes += POSTING_BYTES * len(tf_counts)
+        self.postings += len(tf_counts)
+
+        self._docs_log.write(json.dumps({"id": doc_id, "url": url, "length": len(tokens)}, ensure_ascii=False) + "\n")
+
+        if self._block_bytes >= self.memory_budget:
+            self.flush()
+        return doc_id
+
+    def flush(self):
+        """
+        Write the current block to disk as a sorted run and start a new one.
+        """
+        block = self._block
+        if not block.terms:
+            return
+        self.peak_memory = max(self.peak_memory, self._block_bytes)
+
+        name = f"block_{len(self.blocks):05d}.bin"
+        path = self._block_path(name)
+        with open(path + ".tmp", "wb") as f:
+            for term in sorted(block.term_ids):
+                term_id = block.term_ids[term]
+                doc_ids = block.postings_docs[term_id]
+                data = encode_postings(doc_ids, block.postings_tfs[term_id])
+                key = term.encode("utf-8")
+                f.write(_RECORD.pack(len(key), len(data), doc_ids[-1]))
+                f.write(key)
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+        self._docs_log.flush()
+        os.fsync(self._docs_log.fileno())
+        self.blocks.append(name)
+        self._save_manifest()
+        self._new_block()
+
+    def _read_block(self, name: str, block_no: int):
+        """
+        Yield (term, block_no, last_doc_id, encoded postings) records of one block.
+        """
+        with open(self._block_path(name), "rb") as f:
+            while True:
+                header = f.read(_RECORD.size)
+                if not header:
+                    return
+                term_len, data_len, last_doc = _RECORD.unpack(header)
+                term = f.read(term_len).decode("utf-8")
+                yield term, block_no, last_doc, f.read(data_len)
+
+    def merge(self):
+        """
+        k-way merge of all blocks.
+        Yields (term, encoded postings) in term order; see index.compression.
+
+        Blocks hold consecutive doc ID ranges, so a term's postings from
+        later blocks are appended after re-basing their first doc-ID gap
+        on the previous block's last doc ID; nothing else is re-encoded.
+        """
+        self.flush()
+        start = time.perf_counter()
+        streams = [self._read_block(name, i) for i, name in enumerate(self.blocks)]
+
+        current = None
+        parts = []
+        last = 0
+        for term, _, last_doc, data in heapq.merge(*streams):
+            if term != current:
+                if current is not None:
+                    yield current, b"".join(parts)
+                current, parts, last = term, [data], last_doc
+                continue
+
+            first_doc, pos = read_vbyte(data)
+            head = bytearray()
+            vbyte_encode_number(first_doc - last, head)
+            parts.append(bytes(head))
+            parts.append(data[pos:])
+            last = last_doc
+
+        if current is not None:
+            yield current, b"".join(parts)
+        self.merge_seconds += time.perf_counter() - start
+
+    def _iter_docs(self):
+        self._docs_log.flush()
+        with open(self.docs_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def finish(
+        self,
+        output_path: str,
+        compress: bool = False,
+        keep_blocks: bool = False,
+        binary_dir: str | None = None
+    ) -> dict:
+        """
+        Merge all blocks into output_path, in the same JSON layout as
+        storage.save_index_json() (readable by load_index_json()).
+        The index is streamed to disk term by term. Returns stats().
+
+        With binary_dir, the same merge pass also writes the binary index
+        (index.binary_storage): the merge is already in term order, so
+        nothing is reloaded or sorted.
+        """
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        binary = BinaryIndexWriter(binary_dir) if binary_dir else None
+
+        self.terms = 0
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("{")
+            if compress:
+                f.write(f'"format": "{COMPRESSED_FORMAT}", ')
+
+            f.write('"index": {')
+            for term, data in self.merge():
+                if binary is not None:
+                    binary.add(term, data)
+                if compress:
+                    value = base64.b64encode(data).decode("ascii")
+                else:
+                    value = dict(iter_postings(data))
+                if self.terms:
+                    f.write(", ")
+                f.write(json.dumps(term, ensure_ascii=False) + ": " + json.dumps(value))
+                self.terms += 1
+
+            f.write('}, "docs": {')
+            for i, doc in enumerate(self._iter_docs()):
+                if i:
+                    f.write(", ")
+                meta = {"url": doc["url"], "length": doc["length"]}
+                f.write(f'"{doc["id"]}": ' + json.dumps(meta, ensure_ascii=False))
+            f.write("}}")
+        os.replace(tmp_path, output_path)
+
+        if binary is not None:
+            binary.finish((doc["id"], doc["url"], doc["length"]) for doc in self._iter_docs())
+
+        stats = self.stats()
+        self.close()
+        if not keep_blocks:
+            self._clear()
+        return stats
+
+    def total_docs(self) -> int:
+        return self.next_doc_id
+
+    def stats(self) -> dict:
+        return {
+            "documents": self.next_doc_id,
+            "blocks": len(self.blocks),
+            "terms": self.terms,
+            "postings": self.postings,
+            "peak_memory_bytes": max(self.peak_memory, self._block_bytes),
+            "peak_rss_bytes": _peak_rss(),
+            "merge_seconds": self.merge_seconds,
+        }
+
+    def close(self):
+        self._docs_log.close()
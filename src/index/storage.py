@@ -1,42 +1,141 @@
+import base64
 import json
 import pickle
+from itertools import accumulate
 
+from .compression import iter_postings, vbyte_decode
+from .indexer import DocRecord, Indexer
 
-def save_index_json(indexer, path: str):
+
+# Value of the "format" field in JSON files with vbyte-compressed postings
+COMPRESSED_FORMAT = "vbyte"
+
+
+def save_index_json(indexer, path: str, compress: bool = False):
     """
     Save the index and metadata in JSON format.
-    Converts defaultdict to normal dict for compatibility.
+    Converts the array-backed postings and doc records to plain dicts.
+
+    With compress=True each postings list is stored as a base64 string of
+    its vbyte encoding (doc-ID gaps + tfs) instead of a {doc_id: tf} object.
+    load_index_json() reads both layouts.
+
+    A positional index also gets a "positions" object: token ->
+    {doc_id: [positions]}, or with compress=True token -> base64 of the
+    vbyte position gaps of all its postings back to back.
+    Use load_indexer_json() to get a queryable Indexer back.
     """
 
-    data = {
-        "index": {token: dict(postings) for token, postings in indexer.index.items()},
-        "docs": indexer.docs
-    }
+    docs = {doc_id: dict(meta) for doc_id, meta in indexer.docs.items()}
+
+    if compress:
+        data = {
+            "format": COMPRESSED_FORMAT,
+            "index": {
+                token: base64.b64encode(indexer.encoded_postings(term_id)).decode("ascii")
+                for term_id, token in enumerate(indexer.terms)
+            },
+            "docs": docs
+        }
+    else:
+        data = {
+            "index": {token: dict(postings.items()) for token, postings in indexer.index.items()},
+            "docs": docs
+        }
+
+    if indexer.positional:
+        if compress:
+            data["positions"] = {
+                token: base64.b64encode(indexer.encoded_positions(term_id)).decode("ascii")
+                for term_id, token in enumerate(indexer.terms)
+            }
+        else:
+            data["positions"] = {
+                token: dict(indexer.iter_positions(token)) for token in indexer.terms
+            }
 
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 
-def load_index_json(path: str):
+def load_index_json(path: str, decode: bool = True):
     """
     Load index + metadata from a JSON file.
     Returns (index, docs) as Python dicts.
+
+    Compressed postings are decoded to the same {doc_id: tf} dicts
+    (with string doc IDs, as JSON object keys are strings); pass
+    decode=False to get the raw encoded bytes per term instead, for use
+    with index.compression.iter_postings().
     """
 
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    return data["index"], data["docs"]
+    index = data["index"]
+    if data.get("format") == COMPRESSED_FORMAT:
+        raw = {token: base64.b64decode(encoded) for token, encoded in index.items()}
+        if not decode:
+            return raw, data["docs"]
+        index = {
+            token: {str(doc_id): tf for doc_id, tf in iter_postings(encoded)}
+            for token, encoded in raw.items()
+        }
+
+    return index, data["docs"]
+
+
+def load_indexer_json(path: str, compress: bool = False) -> Indexer:
+    """
+    Rebuild an Indexer (positional if the file has positions) from a file
+    written by save_index_json(), in either layout. compress selects the
+    in-memory representation of the returned Indexer.
+    """
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    compressed = data.get("format") == COMPRESSED_FORMAT
+    positions = data.get("positions")
+    indexer = Indexer(compress=compress, positional=positions is not None)
+
+    for token, postings in data["index"].items():
+        if compressed:
+            pairs = list(iter_postings(base64.b64decode(postings)))
+        else:
+            pairs = sorted((int(doc_id), tf) for doc_id, tf in postings.items())
+
+        runs = [None] * len(pairs)
+        if positions is not None and compressed:
+            # Split the position gaps into one run per posting (tf each)
+            gaps = vbyte_decode(base64.b64decode(positions[token]))
+            start = 0
+            for i, (_, tf) in enumerate(pairs):
+                runs[i] = list(accumulate(gaps[start:start + tf]))
+                start += tf
+        elif positions is not None:
+            runs = [positions[token][str(doc_id)] for doc_id, _ in pairs]
+
+        term_id = indexer._term_id(token)
+        for (doc_id, tf), run in zip(pairs, runs):
+            indexer._append_posting(term_id, doc_id, tf, run)
+
+    for doc_id, meta in data["docs"].items():
+        indexer.docs[int(doc_id)] = DocRecord(meta["url"], meta["length"])
+    indexer.next_doc_id = max(indexer.docs, default=-1) + 1
+
+    return indexer
 
 
 def save_index_pickle(indexer, path: str):
     """
     Save the index using pickle (fastest).
+    Stored as plain dicts, like the JSON format.
     """
 
     data = {
-        "index": indexer.index,
-        "docs": indexer.docs
+        "index": {token: dict(postings.items()) for token, postings in indexer.index.items()},
+        "docs": {doc_id: dict(meta) for doc_id, meta in indexer.docs.items()}
     }
 
     with open(path, "wb") as f:
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 # Basic English stopword list (can be expanded)
 STOPWORDS = {
@@ -6,18 +7,23 @@ STOPWORDS = {
     "an", "be", "this", "that", "are", "from", "it", "at", "or", "which"
 }
 
+# A token is a maximal run of ASCII letters/digits (after lowercasing)
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_TOKEN_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+
 
 class Tokenizer:
     """
     Lightweight, fast tokenizer for document text.
     Steps:
         - lowercase
-        - remove punctuation/non-alphanumerics
-        - split on whitespace
+        - extract runs of letters/numbers (single regex pass)
         - remove stopwords
+        - optional stemming, memoized in a bounded LRU cache
     """
 
-    def __init__(self, use_stemming: bool = False):
+    def __init__(self, use_stemming: bool = False, stem_cache_size: int = 200_000):
         self.use_stemming = use_stemming
 
         # Lazy import for stemmer (only if needed)
@@ -25,6 +31,10 @@ class Tokenizer:
             from nltk.stem import SnowballStemmer
             self.stemmer = SnowballStemmer("english")
 
+            # Word frequencies are heavily skewed, so most stem() calls are
+            # repeats of a small working set of words
+            self._stem = lru_cache(maxsize=stem_cache_size)(self.stemmer.stem)
+
     def tokenize(self, text: str) -> list[str]:
         """
         Convert raw text to normalized tokens.
@@ -32,21 +42,53 @@ class Tokenizer:
         if not text:
             return []
 
-        # Lowercase
-        text = text.lower()
+        words = TOKEN_RE.findall(text.lower())
 
-        # Replace non-alphanumeric characters with spaces
-        # Keeps only letters and numbers
-        text = re.sub(r"[^a-z0-9]+", " ", text)
+        if self.use_stemming:
+            stem = self._stem
+            return [stem(w) for w in words if w not in STOPWORDS]
 
-        # Split into tokens
-        tokens = text.split()
+        return [w for w in words if w not in STOPWORDS]
 
-        # Remove stopwords
-        tokens = [tok for tok in tokens if tok not in STOPWORDS]
+    def tokenize_many(self, texts):
+        """
+        Tokenize a batch of documents lazily.
+        Yields one token list per input text, in order.
+        """
+        for text in texts:
+            yield self.tokenize(text)
 
-        # Optional stemming
-        if self.use_stemming:
-            tokens = [self.stemmer.stem(tok) for tok in tokens]
+    def tokenize_stream(self, chunks):
+        """
+        Tokenize text that arrives in chunks (e.g. read from a file)
+        without joining it into one string.
+        Yields tokens one at a time; a word split across two chunks is
+        reassembled, so the result equals tokenize("".join(chunks)).
+        """
+        stem = self._stem if self.use_stemming else None
+        carry = ""
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            buf = carry + chunk.lower()
+
+            # Hold back a trailing partial word until the next chunk
+            cut = len(buf)
+            while cut and buf[cut - 1] in _TOKEN_CHARS:
+                cut -= 1
+            carry = buf[cut:]
 
-        return tokens
+            for w in TOKEN_RE.findall(buf, 0, cut):
+                if w not in STOPWORDS:
+                    yield stem(w) if stem else w
+
+        if carry and carry not in STOPWORDS:
+            yield stem(carry) if stem else carry
+
+    def stem_cache_info(self):
+        """
+        Hit/miss statistics of the stem cache (None without stemming).
+        """
+        return self._stem.cache_info() if self.use_stemming else None
@@ -1,14 +1,163 @@
+import itertools
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from crawler.cache import ResponseCache
+from crawler.client import HttpClient, get_client, set_client
 from crawler.crawler import SpectrumCrawler
-from index.pdf_extractor import download_pdf, extract_pdf_text
+from index.extract_pool import ExtractionPool
+from index.pdf_extractor import MAX_PDF_BYTES, download_pdf_to_file, extract_pdf_text
+from index.segments import SegmentedIndex
 from index.tokenizer import Tokenizer
+from index.binary_storage import BinaryIndex, save_index_binary
+from index.forward import forward_path_for, save_forward_index
 from index.indexer import Indexer
+from index.lexicon import Lexicon, lexicon_path_for, save_lexicon
+from index.spimi import SpimiIndexer
 from index.storage import save_index_json
 
 
+# End-of-stream marker passed between pipeline stages
+_DONE = object()
+
+
+class _StageTimer:
+    """
+    Records when a pipeline stage started and finished and how many items it handled.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.start = None
+        self.end = None
+        self._lock = threading.Lock()
+
+    def tick(self):
+        with self._lock:
+            if self.start is None:
+                self.start = time.perf_counter()
+            self.items += 1
+
+    def done(self):
+        self.end = time.perf_counter()
+
+    def report(self, t0: float) -> str:
+        if self.start is None:
+            return f"{self.name:<9} {self.items:5d} items"
+        end = self.end or time.perf_counter()
+        return (
+            f"{self.name:<9} {self.items:5d} items, "
+            f"active {self.start - t0:7.1f}s -> {end - t0:7.1f}s"
+        )
+
+
+def _crawl_stage(crawler, url_queue, download_workers, timer, errors):
+    """
+    Run the crawler; every PDF URL goes to the download stage as soon as it is found.
+    """
+    seqs = itertools.count()
+
+    def on_pdf(url):
+        timer.tick()
+        url_queue.put((next(seqs), url))   # blocks when downloads fall behind
+
+    crawler.on_pdf = on_pdf
+    try:
+        crawler.crawl()
+    except Exception as e:
+        errors.append(e)
+    finally:
+        timer.done()
+        for _ in range(download_workers):
+            url_queue.put(_DONE)
+
+
+def _download_stage(url_queue, pdf_queue, tmp_dir, max_pdf_bytes, skipped, timer):
+    """
+    Download worker: stream PDFs to temp files for the extraction stage.
+    Failed downloads are recorded in `skipped` so indexing order can move past them.
+    """
+    try:
+        while True:
+            item = url_queue.get()
+            if item is _DONE:
+                return
+
+            seq, url = item
+            print(f"Processing: {url}")
+            path = os.path.join(tmp_dir, f"{seq}.pdf")
+            try:
+                pdf_file = download_pdf_to_file(url, max_bytes=max_pdf_bytes, dest=path)
+            except Exception as e:
+                print(f"  [Error] Download failed ({type(e).__name__}: {e}): {url}")
+                pdf_file = None
+            if pdf_file is None:
+                print(f"  [Error] Failed to download PDF (unreachable, too large or not a PDF): {url}")
+                skipped.put(seq)
+                continue
+
+            pdf_file.close()
+            timer.tick()
+            pdf_queue.put(((seq, url, path), path))   # blocks when extraction falls behind
+    finally:
+        # Always end this worker's stream, or the extraction stage waits forever
+        pdf_queue.put(_DONE)
+
+
+def _extraction_input(pdf_queue, download_workers, extracted):
+    """
+    Feed downloaded PDFs to the extraction pool.
+
+    While documents are being extracted the pool has to keep collecting
+    their results and killing timed-out workers, and it cannot wait on this
+    queue and on its worker pipes at the same time. So the queue is polled
+    (ExtractionPool.POLL_INTERVAL) and None is yielded while nothing is
+    ready. With nothing in flight (fed == extracted(), the number of
+    results handed back so far) the pool has nothing else to do, and the
+    wait blocks until the next PDF or the end of the stream.
+    """
+    remaining = download_workers
+    fed = 0
+    while remaining:
+        timeout = ExtractionPool.POLL_INTERVAL if fed > extracted() else None
+        try:
+            item = pdf_queue.get(timeout=timeout)
+        except queue.Empty:
+            yield None
+            continue
+        if item is _DONE:
+            remaining -= 1
+            continue
+        fed += 1
+        yield item
+
+
 def run_pipeline(
     seed_url: str = "https://spectrum.library.concordia.ca/",
     max_files: int = 50,
-    output_path: str = "data/index.json"
+    output_path: str = "data/index.json",
+    max_in_flight: int = 8,
+    per_host_concurrency: int = 1,
+    per_host_delay: float = 0.0,
+    crawl_checkpoint: str | None = "data/crawl_checkpoint.json",
+    cache_dir: str | None = "data/http_cache",
+    cache_max_bytes: int = 2 * 1024 ** 3,
+    max_pdf_bytes: int = MAX_PDF_BYTES,
+    extract_workers: int | None = None,
+    extract_timeout: float = 120.0,
+    download_workers: int = 4,
+    queue_size: int = 16,
+    compress_index: bool = False,
+    positional_index: bool = False,
+    index_memory_budget: int | None = None,
+    index_block_dir: str = "data/index_blocks",
+    forward_index: bool = True,
+    binary_index_dir: str | None = None,
+    lexicon: bool = True
 ):
     """
     Full pipeline:
@@ -18,45 +167,237 @@ def run_pipeline(
         - tokenize
         - index tokens
         - save index to disk
+
+    The stages overlap: they are connected by bounded queues (queue_size),
+    so downloads start as soon as the crawler finds a PDF link, extraction
+    runs while other PDFs download, and indexing consumes each document as
+    soon as its text is ready. A full queue blocks the stage feeding it
+    (backpressure). Documents are still indexed in crawl order, so doc IDs
+    are the same as in a sequential run.
+
+    With index_memory_budget set, the index is built out of core
+    (SpimiIndexer): sorted blocks are flushed to index_block_dir whenever
+    the budget is reached and merged into output_path at the end.
+
+    With forward_index, the per-document term vectors used by clustering
+    are saved next to output_path (see index.forward.forward_path_for).
+    With lexicon, the term dictionary for wildcard and fuzzy queries is
+    saved next to output_path and into binary_index_dir (see
+    index.lexicon.lexicon_path_for).
     """
+    if index_memory_budget and positional_index:
+        raise ValueError("the SPIMI build does not support positional indexes")
+
+    # Conditional-GET cache: unchanged pages and PDFs are answered with a 304
+    cache = ResponseCache(cache_dir, cache_max_bytes) if cache_dir else None
+    set_client(HttpClient(cache=cache))
 
     print("=== Starting Spectrum Crawler ===")
     print(f"Max files set to : {max_files}")
-    crawler = SpectrumCrawler(seed_url, max_files)
-    crawl_results = crawler.crawl()
-
-    pdf_urls = crawl_results["pdf_urls"]
-    print(f"Found {len(pdf_urls)} PDF links")
+    crawler = SpectrumCrawler(
+        seed_url,
+        max_files,
+        max_in_flight=max_in_flight,
+        per_host_concurrency=per_host_concurrency,
+        per_host_delay=per_host_delay,
+        checkpoint_path=crawl_checkpoint
+    )
+    if crawler.resumed:
+        print(f"Resuming crawl from checkpoint ({len(crawler.pdf_links)} PDFs already found)")
 
     tokenizer = Tokenizer(use_stemming=False)
-    indexer = Indexer()
+    if index_memory_budget:
+        indexer = SpimiIndexer(index_block_dir, index_memory_budget, resume=False)
+    else:
+        indexer = Indexer(compress=compress_index, positional=positional_index)
 
     print("\n=== Processing PDFs ===")
 
-    for url in pdf_urls:
-        print(f"Processing: {url}")
+    download_workers = max(1, download_workers)
+    url_queue = queue.Queue(maxsize=queue_size)
+    pdf_queue = queue.Queue(maxsize=queue_size)
+    skipped = queue.Queue()
+    crawl_errors = []
+    failures = []
 
-        pdf_bytes = download_pdf(url)
-        if not pdf_bytes:
-            print("  [Error] Failed to download PDF")
-            continue
+    t0 = time.perf_counter()
+    timers = {name: _StageTimer(name) for name in ("crawl", "download", "extract", "index")}
 
-        text = extract_pdf_text(pdf_bytes)
-        if not text.strip():
-            print("  [Warning] Empty or unreadable PDF")
-            continue
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            ExtractionPool(workers=extract_workers, timeout=extract_timeout) as pool:
+
+        threads = [threading.Thread(
+            target=_crawl_stage,
+            args=(crawler, url_queue, download_workers, timers["crawl"], crawl_errors),
+            daemon=True
+        )]
+        for _ in range(download_workers):
+            threads.append(threading.Thread(
+                target=_download_stage,
+                args=(url_queue, pdf_queue, tmp_dir, max_pdf_bytes, skipped, timers["download"]),
+                daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+
+        # Extraction finishes out of order; results are indexed in crawl
+        # order (skipping failed downloads) so doc IDs stay deterministic.
+        finished = {}
+        skipped_seqs = set()
+        next_seq = 0
+
+        def index_ready():
+            nonlocal next_seq
+            while True:
+                while not skipped.empty():
+                    skipped_seqs.add(skipped.get())
+
+                if next_seq in skipped_seqs:
+                    skipped_seqs.discard(next_seq)
+                    next_seq += 1
+                    continue
+                if next_seq not in finished:
+                    return
+
+                url, result = finished.pop(next_seq)
+                next_seq += 1
+
+                if not result["ok"]:
+                    failures.append({"url": url, "error": result["error"]})
+                    continue
+
+                text = result["text"]
+                if not text.strip():
+                    print(f"  [Warning] Empty or unreadable PDF: {url}")
+                    continue
+
+                timers["index"].tick()
+                tokens = tokenizer.tokenize(text)
+                indexer.add_document(tokens, url)
+                print(f"  Indexed {len(tokens)} tokens ({url}, {result['elapsed']:.1f}s)")
+
+        pdf_input = _extraction_input(pdf_queue, download_workers, lambda: timers["extract"].items)
+        for result in pool.imap(pdf_input):
+            seq, url, path = result["key"]
+            os.remove(path)
+            timers["extract"].tick()
+            finished[seq] = (url, result)
+            index_ready()
+
+        for thread in threads:
+            thread.join()
+        index_ready()
+
+        timers["download"].done()
+        timers["extract"].done()
+        timers["index"].done()
+
+        print(f"Extraction: {pool.stats()}")
+        for failure in failures:
+            print(f"  [Failed] {failure['url']}: {failure['error']}")
 
-        tokens = tokenizer.tokenize(text)
-        indexer.add_document(tokens, url)
-        print(f"  Indexed {len(tokens)} tokens")
+    if cache is not None:
+        cache.flush()   # the cache index is only saved every few stores
+    if crawl_errors:
+        raise crawl_errors[0]
+
+    print(f"Found {len(crawler.pdf_links)} PDF links")
+    print("Stage timeline:")
+    for timer in timers.values():
+        print("  " + timer.report(t0))
 
     print("\n=== Saving Index ===")
-    save_index_json(indexer, output_path)
+    if isinstance(indexer, SpimiIndexer):
+        # The binary index is written by the same merge pass
+        build = indexer.finish(output_path, compress=compress_index, binary_dir=binary_index_dir)
+        print(
+            f"SPIMI build: {build['blocks']} blocks, {build['terms']} terms, "
+            f"peak block {build['peak_memory_bytes'] / 1024 ** 2:.1f} MiB, "
+            f"merge {build['merge_seconds']:.1f}s"
+        )
+        if build["peak_rss_bytes"]:
+            print(f"Peak process memory: {build['peak_rss_bytes'] / 1024 ** 2:.1f} MiB")
+    else:
+        save_index_json(indexer, output_path, compress=compress_index)
+        if forward_index:
+            forward_path = forward_path_for(output_path)
+            save_forward_index(indexer, forward_path)
+            print(f"Forward index saved to {forward_path}")
+
+    if binary_index_dir:
+        if not isinstance(indexer, SpimiIndexer):
+            save_index_binary(indexer, binary_index_dir)
+        print(f"Binary index saved to {binary_index_dir}")
+
+    if lexicon:
+        # Term dictionary + k-gram index for wildcard and fuzzy query terms
+        if not isinstance(indexer, SpimiIndexer):
+            terms = Lexicon(indexer.terms)
+        elif binary_index_dir:
+            with BinaryIndex(binary_index_dir) as binary:
+                terms = Lexicon.from_index(binary)
+        else:
+            terms = None
+            print("Lexicon skipped: a SPIMI build needs binary_index_dir to stream its vocabulary")
+        if terms is not None:
+            for index_path in (output_path, binary_index_dir):
+                if index_path:
+                    save_lexicon(terms, lexicon_path_for(index_path))
+                    print(f"Lexicon saved to {lexicon_path_for(index_path)}")
     print(f"Index saved to {output_path}")
 
     print("\n=== Pipeline Complete ===")
     print(f"Total documents indexed: {indexer.total_docs()}")
 
+    stats = get_client().stats.summary()
+    print(
+        f"HTTP: {stats['requests']} requests, {stats['retries']} retries, "
+        f"{stats['bytes']} bytes, mean latency {stats['mean_latency'] * 1000:.1f} ms, "
+        f"p95 {stats['p95_latency'] * 1000:.1f} ms"
+    )
+    print(f"Cache: {stats['cache_hits']} hits, {stats['bytes_saved']} bytes not re-downloaded")
+
+
+def update_index(
+    urls=(),
+    delete_urls=(),
+    index_dir: str = "data/segments",
+    max_pdf_bytes: int = MAX_PDF_BYTES
+):
+    """
+    Incremental update of a segmented index (index.segments):
+        - download, extract and (re)index each PDF in urls; a URL that is
+          already indexed is replaced
+        - delete every URL in delete_urls
+        - commit a new segment and merge segments if the policy asks for it
+    Only the changed documents are processed; doc IDs persist across runs.
+    """
+    index = SegmentedIndex(index_dir, background_merge=False)
+    tokenizer = Tokenizer(use_stemming=False)
+
+    for url in urls:
+        print(f"Processing: {url}")
+        pdf_file = download_pdf_to_file(url, max_bytes=max_pdf_bytes)
+        if pdf_file is None:
+            print(f"  [Error] Failed to download PDF: {url}")
+            continue
+        with pdf_file:
+            text = extract_pdf_text(pdf_file)
+        if not text.strip():
+            print(f"  [Warning] Empty or unreadable PDF: {url}")
+            continue
+        doc_id = index.add_document(tokenizer.tokenize(text), url)
+        print(f"  Indexed as doc {doc_id}")
+
+    for url in delete_urls:
+        if index.delete_document(url):
+            print(f"Deleted: {url}")
+
+    index.commit()
+    index.merge_all()
+    print(f"Segmented index: {index.stats()}")
+    return index
+
 
 if __name__ == "__main__":
     run_pipeline()
@@ -0,0 +1,272 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from index.binary_storage import convert_json_to_binary
+from index.lexicon import lexicon_path_for
+from .boolean import QuerySyntaxError
+from .cache import QueryCache
+from .server import open_index, open_lexicon, percentiles
+
+
+MODES = ("term", "boolean", "ranked")
+FORMATS = ("jsonl", "tsv")
+
+# Upper edges (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Query engine of this worker process (set by _init_worker)
+_worker = {}
+
+
+def _init_worker(index_path: str, scoring: str, lexicon_path: str | None):
+    index, docs = open_index(index_path)
+    lexicon = open_lexicon(index_path, index, lexicon_path)
+    _worker["queries"] = QueryCache(index, docs, scoring=scoring, lexicon=lexicon)
+
+
+def _evaluate(queries: QueryCache, mode: str, query: str, k: int, limit: int | None) -> dict:
+    docs = queries.index.get_docs()
+    if mode == "ranked":
+        hits = queries.ranked_search(query, k)
+        return {
+            "count": len(hits),
+            "results": [{"doc_id": d, "url": docs[d]["url"], "score": score} for d, score in hits],
+        }
+
+    if mode == "term":
+        terms = queries.tokenizer.tokenize(query)
+        if len(terms) > 1:
+            raise QuerySyntaxError("term queries take a single term")
+        doc_ids = list(queries.index.doc_ids(terms[0])) if terms else []
+    else:
+        doc_ids = queries.boolean_search(query)
+    shown = doc_ids if limit is None else doc_ids[:limit]
+    return {"count": len(doc_ids), "results": [{"doc_id": d, "url": docs[d]["url"]} for d in shown]}
+
+
+def _run_chunk(chunk: list, mode: str, k: int, limit: int | None) -> list:
+    """
+    Worker: evaluate a chunk of (query_id, query) pairs. Returns
+    (query_id, query, result dict, seconds) in the same order; a query
+    that fails gets an "error" result instead.
+    """
+    queries = _worker["queries"]
+    done = []
+    for query_id, query in chunk:
+        start = time.perf_counter()
+        try:
+            result = _evaluate(queries, mode, query, k, limit)
+        except QuerySyntaxError as e:
+            result = {"error": str(e)}
+        except Exception as e:
+            # One failing query must not take the chunk (and the run) with it
+            print(f"[Warning] query {query_id} failed: {e!r}", file=sys.stderr)
+            result = {"error": f"internal error: {type(e).__name__}"}
+        done.append((query_id, query, result, time.perf_counter() - start))
+    return done
+
+
+def _shared_index(index_path: str, lexicon_path: str | None, tmp_dir: str):
+    """
+    For a worker pool: convert a JSON index to a binary index in tmp_dir
+    once, so the workers share one memory-mapped copy instead of each
+    parsing and holding the whole JSON. Returns (index_path, lexicon_path);
+    the lexicon saved with the JSON index is passed on explicitly.
+    """
+    if os.path.isdir(index_path):
+        return index_path, lexicon_path
+    if lexicon_path is None and os.path.exists(lexicon_path_for(index_path)):
+        lexicon_path = lexicon_path_for(index_path)
+    print(f"Converting {index_path} to a binary index shared by the workers", file=sys.stderr)
+    binary_dir = os.path.join(tmp_dir, "index")
+    convert_json_to_binary(index_path, binary_dir)
+    return binary_dir, lexicon_path
+
+
+def read_queries(lines):
+    """
+    Yield (query_id, query) from lines of "query" or "query_id<TAB>query";
+    the ID defaults to the line number. Blank lines and lines starting
+    with # are skipped.
+    """
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        query_id, tab, query = line.partition("\t")
+        if tab:
+            yield query_id, query
+        else:
+            yield str(line_no), line
+
+
+def _write_result(out, fmt: str, query_id: str, query: str, result: dict):
+    if fmt == "jsonl":
+        out.write(json.dumps({"id": query_id, "query": query, **result}) + "\n")
+        return
+    # TSV: one "id  doc_id  url [score]" row per result, like my_collection.txt
+    for hit in result.get("results", ()):
+        row = [query_id, str(hit["doc_id"]), hit["url"]]
+        if "score" in hit:
+            row.append(f"{hit['score']:.6f}")
+        out.write("\t".join(row) + "\n")
+
+
+def latency_histogram(latencies) -> list[tuple[str, int]]:
+    """
+    (bucket label, count) pairs over HISTOGRAM_EDGES_MS.
+    """
+    counts = [0] * (len(HISTOGRAM_EDGES_MS) + 1)
+    for seconds in latencies:
+        counts[bisect_left(HISTOGRAM_EDGES_MS, seconds * 1000)] += 1
+    labels = [f"<= {edge:g} ms" for edge in HISTOGRAM_EDGES_MS] + [f"> {HISTOGRAM_EDGES_MS[-1]:g} ms"]
+    return list(zip(labels, counts))
+
+
+def run_batch(
+    index_path: str,
+    queries,
+    out,
+    mode: str = "boolean",
+    fmt: str = "jsonl",
+    k: int = 10,
+    limit: int | None = None,
+    workers: int | None = None,
+    chunk_size: int = 64,
+    scoring: str = "bm25",
+    lexicon_path: str | None = None
+) -> dict:
+    """
+    Evaluate (query_id, query) pairs and stream the results to out (a text
+    file) as JSONL or TSV, in input order.
+
+    Queries are cut into chunks of chunk_size and evaluated by a pool of
+    worker processes. Every worker opens the index once. A binary index
+    directory (see index.binary_storage) is memory-mapped, so all workers
+    share the same page-cache copy; a JSON index is converted to a
+    temporary binary index first. With workers=1 everything runs in this
+    process. Boolean queries may use
+    wildcard and fuzzy terms: the lexicon saved with the index (or
+    lexicon_path) is used if it matches the index, otherwise each worker
+    builds one from the vocabulary.
+
+    Returns stats: queries, errors, seconds, qps, latency percentiles and
+    the latency histogram.
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}, expected one of {MODES}")
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {FORMATS}")
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+
+    def write(done):
+        nonlocal errors
+        for query_id, query, result, seconds in done:
+            latencies.append(seconds)
+            if "error" in result:
+                errors += 1
+            _write_result(out, fmt, query_id, query, result)
+
+    queries = iter(queries)
+
+    def next_chunk():
+        chunk = []
+        for item in queries:
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                break
+        return chunk
+
+    if workers == 1:
+        _init_worker(index_path, scoring, lexicon_path)
+        while True:
+            chunk = next_chunk()
+            if not chunk:
+                break
+            write(_run_chunk(chunk, mode, k, limit))
+    else:
+        tmp_dir = tempfile.TemporaryDirectory()
+        index_path, lexicon_path = _shared_index(index_path, lexicon_path, tmp_dir.name)
+        with tmp_dir, ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(index_path, scoring, lexicon_path)) as pool:
+            pending = []
+            while True:
+                # At most two chunks per worker in flight, so reading from a
+                # pipe never loads the whole query file
+                while len(pending) < 2 * workers:
+                    chunk = next_chunk()
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_run_chunk, chunk, mode, k, limit))
+                if not pending:
+                    break
+                write(pending.pop(0).result())
+    out.flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "queries": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "qps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": percentiles(latencies),
+        "histogram": latency_histogram(latencies),
+    }
+
+
+def print_stats(stats: dict, stream=sys.stderr):
+    print(f"Queries: {stats['queries']} ({stats['errors']} errors) in {stats['seconds']:.2f}s "
+          f"-> {stats['qps']:.1f} queries/sec", file=stream)
+    latency = stats["latency"]
+    if latency["count"]:
+        print(f"Latency: p50 {latency['p50_ms']:.2f} ms, p90 {latency['p90_ms']:.2f} ms, "
+              f"p99 {latency['p99_ms']:.2f} ms, max {latency['max_ms']:.2f} ms", file=stream)
+    largest = max((count for _, count in stats["histogram"]), default=0)
+    for label, count in stats["histogram"]:
+        if count:
+            bar = "#" * max(1, round(40 * count / largest))
+            print(f"  {label:>12} {count:8d} {bar}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a file of queries against an index.")
+    parser.add_argument("queries", nargs="?", default="-", help="query file ('-' or omitted: stdin)")
+    parser.add_argument("--index", default="data/index.json", help="binary index directory (shared by the workers) or JSON index file (converted once)")
+    parser.add_argument("--mode", choices=MODES, default="boolean")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--output", default="-", help="output file ('-': stdout)")
+    parser.add_argument("-k", type=int, default=10, help="results per ranked query")
+    parser.add_argument("--limit", type=int, default=None, help="max results per term/Boolean query")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--scoring", choices=("bm25", "tfidf"), default="bm25")
+    parser.add_argument("--lexicon", default=None, help="lexicon file for wildcard/fuzzy terms (default: the one saved with the index)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.queries == "-" else open(args.queries, "r", encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        stats = run_batch(
+            args.index, read_queries(source), out,
+            mode=args.mode, fmt=args.format, k=args.k, limit=args.limit,
+            workers=args.workers, scoring=args.scoring, lexicon_path=args.lexicon
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print_stats(stats)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
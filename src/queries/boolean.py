@@ -0,0 +1,413 @@
+import re
+from bisect import bisect_left
+
+from index.lexicon import Lexicon
+from index.tokenizer import Tokenizer
+
+
+# Doc ID of an exhausted cursor (larger than any real doc ID)
+END = 1 << 63
+
+_LEXER = re.compile(r"\(|\)|[^\s()]+")
+_KEYWORDS = {"AND", "OR", "NOT"}
+_FUZZY = re.compile(r"(.+)~(\d*)$")
+
+# Edit distance of a fuzzy term written without one ("sustainibility~")
+DEFAULT_FUZZY_DISTANCE = 2
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+# ---------- index adapters ----------
+
+class DictIndex:
+    """
+    Adapter for a plain {term: {doc_id: tf}} index as returned by
+    load_index_json() (doc IDs may be strings), giving it the query
+    helpers of Indexer: doc_ids(), postings(), doc_freq(), docs, terms.
+    Postings are converted on every call and not kept; wrap the adapter
+    in queries.cache.CachedIndex for a bounded postings cache.
+    """
+
+    def __init__(self, index: dict, docs: dict):
+        self.index = index
+        self.docs = {int(doc_id): meta for doc_id, meta in docs.items()}
+        self.terms = index.keys()
+
+    def postings(self, term: str):
+        pairs = sorted((int(doc_id), tf) for doc_id, tf in self.index.get(term, {}).items())
+        if not pairs:
+            return None
+        return [d for d, _ in pairs], [tf for _, tf in pairs]
+
+    def doc_ids(self, term: str):
+        found = self.postings(term)
+        return found[0] if found else []
+
+    def doc_freq(self, term: str) -> int:
+        return len(self.index.get(term, ()))
+
+
+def _all_doc_ids(index) -> list[int]:
+    docs = index.get_docs() if hasattr(index, "get_docs") else index.docs
+    return sorted(int(doc_id) for doc_id in docs)
+
+
+# ---------- cursors over sorted doc IDs ----------
+
+class TermCursor:
+    """
+    Cursor over one sorted postings list. advance() gallops (exponential
+    probe, then bisect), so skipping over a long list costs O(log gap).
+    """
+
+    def __init__(self, doc_ids):
+        self.docs = doc_ids
+        self.cost = len(doc_ids)
+        self.i = 0
+        self.doc = doc_ids[0] if doc_ids else END
+
+    def next(self):
+        self.i += 1
+        self.doc = self.docs[self.i] if self.i < self.cost else END
+
+    def advance(self, target: int):
+        """
+        Move to the first doc ID >= target.
+        """
+        if self.doc >= target:
+            return
+        docs, n = self.docs, self.cost
+        lo = self.i
+        step = 1
+        hi = lo + 1
+        while hi < n and docs[hi] < target:
+            lo = hi
+            step *= 2
+            hi = lo + step
+        self.i = bisect_left(docs, target, lo + 1, min(hi + 1, n))
+        self.doc = docs[self.i] if self.i < n else END
+
+
+class AndCursor:
+    """
+    Intersection of `required` cursors minus the `excluded` ones.
+    Required cursors are ordered by cost, and candidates are found by
+    leapfrogging: the cheapest list proposes a doc ID and every other
+    list is advanced (galloping) to it, so the work is proportional to
+    the rarest list, not the longest.
+    """
+
+    def __init__(self, required: list, excluded: list = ()):
+        self.required = sorted(required, key=lambda c: c.cost)
+        self.excluded = list(excluded)
+        self.cost = self.required[0].cost if self.required else 0
+        self.doc = -1
+        self._align(0)
+
+    def _align(self, target: int):
+        while True:
+            for cursor in self.required:
+                cursor.advance(target)
+                if cursor.doc == END:
+                    self.doc = END
+                    return
+                if cursor.doc > target:
+                    target = cursor.doc
+                    break
+            else:
+                # Every required list is on target: check the exclusions
+                excluded = False
+                for cursor in self.excluded:
+                    cursor.advance(target)
+                    if cursor.doc == target:
+                        excluded = True
+                        break
+                if not excluded:
+                    self.doc = target
+                    return
+                target += 1
+
+    def next(self):
+        self._align(self.doc + 1)
+
+    def advance(self, target: int):
+        if self.doc < target:
+            self._align(target)
+
+
+class OrCursor:
+    """
+    Union of cursors, in doc-ID order without duplicates.
+    """
+
+    def __init__(self, children: list):
+        self.children = children
+        self.cost = sum(c.cost for c in children)
+        self.doc = min(c.doc for c in children)
+
+    def advance(self, target: int):
+        if self.doc >= target:
+            return
+        for cursor in self.children:
+            cursor.advance(target)
+        self.doc = min(c.doc for c in self.children)
+
+    def next(self):
+        self.advance(self.doc + 1)
+
+
+class _Empty:
+    cost = 0
+    doc = END
+
+    def next(self):
+        pass
+
+    def advance(self, target: int):
+        pass
+
+
+# ---------- engine ----------
+
+class BooleanQueryEngine:
+    """
+    Boolean retrieval over sorted postings.
+
+    Syntax: terms, AND, OR, NOT (case-insensitive) and parentheses.
+    Adjacent terms are implicitly ANDed; NOT binds tighter than AND,
+    which binds tighter than OR:
+        sustainability AND (waste OR recycling) NOT plastic
+
+    Query words are normalized with the same Tokenizer as the documents;
+    stopwords drop out of the query.
+
+    Terms are expanded through a Lexicon (index.lexicon) into the OR of
+    the matching terms:
+        sustainab*  *ability  re*cling     wildcards (lowercased, not stemmed)
+        sustainibility~  waste~1           terms within edit distance 2 / 1
+    A lexicon saved at index time can be passed in; otherwise one is built
+    from the index vocabulary the first time a query needs it.
+
+    `index` can be an Indexer, a BinaryIndex, a SegmentedIndex (anything
+    with doc_ids(term) and docs/get_docs()), or the plain dict pair
+    returned by load_index_json() (pass the docs as the second argument).
+    Results are streamed in ascending doc-ID order; no sets are built.
+    """
+
+    def __init__(
+        self,
+        index,
+        docs: dict | None = None,
+        tokenizer: Tokenizer | None = None,
+        lexicon: Lexicon | None = None
+    ):
+        if isinstance(index, dict):
+            index = DictIndex(index, docs or {})
+        self.index = index
+        self.tokenizer = tokenizer or Tokenizer()
+        self.lexicon = lexicon
+        self._own_lexicon = lexicon is None
+        self._universe = None
+
+    def refresh(self):
+        """
+        Forget the cached set of all doc IDs (used by NOT) and a lexicon
+        built from the index, after the index changes.
+        """
+        self._universe = None
+        if self._own_lexicon:
+            self.lexicon = None
+
+    def _lexicon(self) -> Lexicon:
+        if self.lexicon is None:
+            self.lexicon = Lexicon.from_index(self.index)
+        return self.lexicon
+
+    # ----- parsing -----
+
+    def parse(self, query: str):
+        """
+        Parse a query into a tree of tuples:
+            ("term", t) | ("and", [nodes]) | ("or", [nodes]) | ("not", node)
+            | ("none",)  (a wildcard/fuzzy term that matched nothing)
+        Returns None if nothing searchable is left (e.g. only stopwords).
+        Each call uses its own _Parser, so queries can be parsed from
+        several threads at once.
+        """
+        return _Parser(self, query).parse()
+
+    # ----- evaluation -----
+
+    def _all_docs(self) -> list[int]:
+        if self._universe is None:
+            self._universe = _all_doc_ids(self.index)
+        return self._universe
+
+    def _cursor(self, node):
+        kind = node[0]
+        if kind == "none":
+            return _Empty()
+
+        if kind == "term":
+            doc_ids = self.index.doc_ids(node[1])
+            return TermCursor(doc_ids) if len(doc_ids) else _Empty()
+
+        if kind == "or":
+            children = [c for c in map(self._cursor, node[1]) if c.doc != END]
+            return OrCursor(children) if children else _Empty()
+
+        if kind == "not":
+            return AndCursor([TermCursor(self._all_docs())], [self._cursor(node[1])])
+
+        required = [self._cursor(c) for c in node[1] if c[0] != "not"]
+        excluded = [self._cursor(c[1]) for c in node[1] if c[0] == "not"]
+        if any(c.doc == END for c in required):
+            return _Empty()
+        if not required:
+            required = [TermCursor(self._all_docs())]
+        return AndCursor(required, excluded)
+
+    def search(self, query: str):
+        """
+        Yield matching doc IDs in ascending order.
+        """
+        return self.evaluate(self.parse(query))
+
+    def evaluate(self, tree):
+        """
+        Yield the doc IDs matching an already parsed query, ascending.
+        """
+        if tree is None:
+            return
+        cursor = self._cursor(tree)
+        while cursor.doc != END:
+            yield cursor.doc
+            cursor.next()
+
+    def count(self, query: str) -> int:
+        return sum(1 for _ in self.search(query))
+
+
+class _Parser:
+    """
+    Recursive-descent parser for one query (see BooleanQueryEngine.parse);
+    holds the token position. Term words are normalized and expanded
+    through the engine's tokenizer and lexicon.
+    """
+
+    def __init__(self, engine: BooleanQueryEngine, query: str):
+        self.engine = engine
+        self.tokens = _LEXER.findall(query)
+        self.pos = 0
+
+    def parse(self):
+        tree = self._parse_or()
+        if self.pos < len(self.tokens):
+            raise QuerySyntaxError(f"unexpected {self.tokens[self.pos]!r} in query")
+        return tree
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _keyword(self):
+        token = self._peek()
+        return token.upper() if token and token.upper() in _KEYWORDS else None
+
+    def _parse_or(self):
+        children = [self._parse_and()]
+        while self._keyword() == "OR":
+            self.pos += 1
+            children.append(self._parse_and())
+        return _combine("or", children)
+
+    def _parse_and(self):
+        children = [self._parse_not()]
+        while True:
+            token = self._peek()
+            keyword = self._keyword()
+            if keyword == "AND":
+                self.pos += 1
+            elif token is None or token == ")" or keyword == "OR":
+                break
+            children.append(self._parse_not())   # implicit AND
+        return _combine("and", children)
+
+    def _parse_not(self):
+        if self._keyword() == "NOT":
+            self.pos += 1
+            child = self._parse_not()
+            return ("not", child) if child is not None else None
+        return self._parse_atom()
+
+    def _parse_atom(self):
+        token = self._peek()
+        if token is None:
+            raise QuerySyntaxError("query ends where a term was expected")
+        if token == ")" or self._keyword():
+            raise QuerySyntaxError(f"expected a term, got {token!r}")
+        self.pos += 1
+
+        if token == "(":
+            tree = self._parse_or()
+            if self._peek() != ")":
+                raise QuerySyntaxError("missing closing parenthesis")
+            self.pos += 1
+            return tree
+
+        engine = self.engine
+        if "*" in token:
+            try:
+                return _expansion(engine._lexicon().wildcard(token.lower()))
+            except ValueError as e:
+                raise QuerySyntaxError(f"{e}: {token!r}") from None
+        fuzzy = _FUZZY.match(token)
+        if fuzzy:
+            word, distance = fuzzy.groups()
+            distance = int(distance) if distance else DEFAULT_FUZZY_DISTANCE
+            terms = engine.tokenizer.tokenize(word)
+            if len(terms) != 1:
+                raise QuerySyntaxError(f"fuzzy matching needs a single term, got {word!r}")
+            return _expansion([t for t, _ in engine._lexicon().fuzzy(terms[0], distance)])
+
+        terms = engine.tokenizer.tokenize(token)
+        return _combine("and", [("term", t) for t in terms])
+
+
+# Node of an expansion that matched no term: matches no document. Unlike
+# None (a query part with nothing searchable, e.g. a stopword), it is
+# never dropped from the query.
+NONE = ("none",)
+
+
+def _expansion(terms: list[str]):
+    """
+    OR node over expanded terms, or NONE if there are none.
+    """
+    if not terms:
+        return NONE
+    if len(terms) == 1:
+        return ("term", terms[0])
+    return ("or", [("term", t) for t in terms])
+
+
+def _combine(kind: str, children: list):
+    """
+    Build an AND/OR node, dropping empty (None) operands and flattening
+    nested nodes of the same kind. NONE operands are kept.
+    """
+    flat = []
+    for child in children:
+        if child is None:
+            continue
+        if child[0] == kind:
+            flat.extend(child[1])
+        else:
+            flat.append(child)
+    if not flat:
+        return None
+    if len(flat) == 1:
+        return flat[0]
+    return (kind, flat)
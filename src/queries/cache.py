@@ -0,0 +1,256 @@
+import threading
+from collections import OrderedDict
+
+from index.lexicon import Lexicon, vocabulary
+from index.tokenizer import Tokenizer
+from .boolean import BooleanQueryEngine, DictIndex
+from .ranking import RankedSearcher
+
+
+def index_version(index):
+    """
+    The index's version token (Indexer, SegmentedIndex and BinaryIndex
+    have one); None for indexes that never change, like DictIndex.
+    """
+    return getattr(index, "version", None)
+
+
+def _postings_bytes(found) -> int:
+    if not found:
+        return 64
+    # array('I') items are 4 bytes; list items are pointers to ints
+    return 64 + sum(len(values) * getattr(values, "itemsize", 36) for values in found)
+
+
+def _result_bytes(result) -> int:
+    return 64 + 48 * len(result)
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by the total estimated size of its
+    values (sizeof(value) bytes each, max_bytes in total). Thread-safe.
+
+    stats() reports hits, misses, evictions, entries and bytes.
+    """
+
+    def __init__(self, max_bytes: int, sizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()   # key -> (value, size), oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return   # would evict everything else and still not fit
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+class CachedIndex:
+    """
+    Wraps an index so that decoded postings lists are kept in an LRU
+    cache (bounded by max_bytes). Offers the query helpers the Boolean
+    and ranking engines use: postings(), doc_ids(), iter_postings(),
+    doc_freq(), docs/get_docs(), terms, version.
+
+    The cache is cleared whenever the wrapped index's version changes,
+    and on_invalidate (if given) is called, so that an owner caching
+    anything derived from the postings learns about the change whichever
+    of them notices it first.
+    """
+
+    def __init__(self, index, max_bytes: int = 64 * 1024 ** 2, on_invalidate=None):
+        self.index = index
+        self.cache = LRUCache(max_bytes, _postings_bytes)
+        self.on_invalidate = on_invalidate
+        self.invalidations = 0
+        self._version = index_version(index)
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return index_version(self.index)
+
+    def check_version(self) -> bool:
+        """
+        Clear the cache if the index changed. Returns True if it did.
+        """
+        version = index_version(self.index)
+        if version == self._version:
+            return False
+        with self._lock:
+            if version == self._version:
+                return False
+            self.cache.clear()
+            self._version = version
+            self.invalidations += 1
+            if self.on_invalidate is not None:
+                self.on_invalidate()
+        return True
+
+    def postings(self, term: str):
+        self.check_version()
+        found = self.cache.get(term, False)
+        if found is False:
+            found = self.index.postings(term)
+            self.cache.put(term, found)
+        return found
+
+    def doc_ids(self, term: str):
+        found = self.postings(term)
+        return found[0] if found else []
+
+    def iter_postings(self, term: str):
+        found = self.postings(term)
+        return zip(*found) if found else iter(())
+
+    def doc_freq(self, term: str) -> int:
+        return self.index.doc_freq(term)
+
+    @property
+    def docs(self):
+        return self.get_docs()
+
+    def get_docs(self):
+        if hasattr(self.index, "get_docs"):
+            return self.index.get_docs()
+        return self.index.docs
+
+    @property
+    def terms(self):
+        return vocabulary(self.index)
+
+
+class QueryCache:
+    """
+    Query layer with two caches in front of an index:
+
+    - decoded postings (CachedIndex, LRU bounded by postings_bytes),
+      shared by the Boolean and ranked engines
+    - complete results (LRU bounded by results_bytes), keyed by the index
+      version and the normalized query: the parsed Boolean tree, or the
+      tokenized terms plus k for ranked queries, so "Waste  AND energy"
+      and "waste and energy" share an entry
+
+    Both caches are invalidated when the index version changes (e.g.
+    documents added to an Indexer or SegmentedIndex). stats() reports
+    hits, misses and evictions of each cache.
+
+    `index` is anything the engines accept, including the dict pair
+    returned by load_index_json().
+    """
+
+    def __init__(
+        self,
+        index,
+        docs: dict | None = None,
+        postings_bytes: int = 64 * 1024 ** 2,
+        results_bytes: int = 16 * 1024 ** 2,
+        scoring: str = "bm25",
+        tokenizer: Tokenizer | None = None,
+        lexicon: Lexicon | None = None
+    ):
+        if isinstance(index, dict):
+            index = DictIndex(index, docs or {})
+        self.tokenizer = tokenizer or Tokenizer()
+        self.results = LRUCache(results_bytes, _result_bytes)
+        self.index = CachedIndex(index, postings_bytes, on_invalidate=self._invalidate)
+        self.boolean = BooleanQueryEngine(self.index, tokenizer=self.tokenizer, lexicon=lexicon)
+        self.ranked = RankedSearcher(self.index, scoring=scoring, tokenizer=self.tokenizer)
+
+    def _invalidate(self):
+        # Called by self.index whenever it sees a new index version
+        self.results.clear()
+        self.boolean.refresh()
+        self.ranked.refresh()
+
+    def _check_version(self):
+        """
+        Invalidate the caches if the index changed; returns the version
+        that results are keyed on. A result computed while another thread
+        moves the index on is then stored under the old version and never
+        served for the new one.
+        """
+        self.index.check_version()
+        return self.index.version
+
+    def boolean_search(self, query: str) -> list[int]:
+        """
+        Matching doc IDs of a Boolean query, ascending.
+        """
+        version = self._check_version()
+        tree = self.boolean.parse(query)
+        key = (version, "boolean", repr(tree))
+        result = self.results.get(key)
+        if result is None:
+            result = tuple(self.boolean.evaluate(tree))
+            self.results.put(key, result)
+        return list(result)
+
+    def ranked_search(self, query: str, k: int = 10) -> list[tuple[int, float]]:
+        """
+        Top-k (doc_id, score) pairs, best first.
+        """
+        version = self._check_version()
+        key = (version, "ranked", tuple(self.tokenizer.tokenize(query)), k)
+        result = self.results.get(key)
+        if result is None:
+            result = tuple(self.ranked.search(query, k))
+            self.results.put(key, result)
+        return list(result)
+
+    def clear(self):
+        self.index.cache.clear()
+        self.results.clear()
+
+    def stats(self) -> dict:
+        return {
+            "version": self.index.version,
+            "invalidations": self.index.invalidations,
+            "postings": self.index.cache.stats(),
+            "results": self.results.stats(),
+        }
@@ -0,0 +1,156 @@
+import heapq
+from bisect import bisect_left
+
+from index.tokenizer import Tokenizer
+
+
+def _query_terms(query, tokenizer=None) -> list[str]:
+    """
+    A query is either a string (tokenized like the documents) or a token list.
+    """
+    if isinstance(query, str):
+        return (tokenizer or Tokenizer()).tokenize(query)
+    return list(query)
+
+
+def _intersect(indexer, terms: list[str]):
+    """
+    Yield (doc_id, [i_0, ..., i_n]) for every document containing all terms,
+    where i_k is the document's index in the postings of terms[k].
+
+    Walks the shortest postings list and gallops (exponential search +
+    bisect) through the longer ones, so the cost follows the rarest term.
+    """
+    lists = [indexer.doc_ids(term) for term in terms]
+    if not lists or any(len(docs) == 0 for docs in lists):
+        return
+
+    order = sorted(range(len(terms)), key=lambda k: len(lists[k]))
+    lead, rest = order[0], order[1:]
+    cursors = [0] * len(terms)
+
+    for i, doc_id in enumerate(lists[lead]):
+        cursors[lead] = i
+        for k in rest:
+            docs = lists[k]
+            lo = cursors[k]
+
+            # Gallop to a range that must contain doc_id, then bisect it
+            step = 1
+            hi = lo
+            while hi < len(docs) and docs[hi] < doc_id:
+                lo = hi
+                hi += step
+                step *= 2
+            j = bisect_left(docs, doc_id, lo, min(hi + 1, len(docs)))
+            if j == len(docs):
+                return  # this list is exhausted: no further matches
+            cursors[k] = j
+            if docs[j] != doc_id:
+                break
+        else:
+            yield doc_id, list(cursors)
+
+
+def _shift_intersect(starts: list[int], positions: list[int], offset: int) -> list[int]:
+    """
+    Keep the start positions s for which s + offset is in positions
+    (both lists ascending) - a linear merge.
+    """
+    out = []
+    i = j = 0
+    while i < len(starts) and j < len(positions):
+        want = starts[i] + offset
+        if positions[j] < want:
+            j += 1
+        elif positions[j] > want:
+            i += 1
+        else:
+            out.append(starts[i])
+            i += 1
+            j += 1
+    return out
+
+
+def phrase_matches(indexer, query, tokenizer=None) -> list[tuple[int, list[int]]]:
+    """
+    Find an exact phrase in a positional index.
+    Returns (doc_id, start positions) for every matching document, by doc ID.
+
+    Positions count tokens after stopword removal, so the query is
+    tokenized the same way ("waste of management" matches
+    "waste management").
+    """
+    if not indexer.positional:
+        raise ValueError("phrase queries need an index built with positional=True")
+
+    terms = _query_terms(query, tokenizer)
+    if not terms:
+        return []
+
+    term_ids = [indexer.term_ids.get(term) for term in terms]
+    matches = []
+    for doc_id, cursors in _intersect(indexer, terms):
+        positions = [indexer.positions_at(term_ids[k], cursors[k]) for k in range(len(terms))]
+
+        # Start from the term with the fewest occurrences, shifted back to
+        # phrase starts, and check the other terms at their offsets
+        by_length = sorted(range(len(terms)), key=lambda k: len(positions[k]))
+        first = by_length[0]
+        starts = [p - first for p in positions[first] if p >= first]
+        for k in by_length[1:]:
+            if not starts:
+                break
+            starts = _shift_intersect(starts, positions[k], k)
+        if starts:
+            matches.append((doc_id, starts))
+    return matches
+
+
+def phrase_query(indexer, query, tokenizer=None) -> list[int]:
+    """
+    Doc IDs of the documents containing the exact phrase.
+    """
+    return [doc_id for doc_id, _ in phrase_matches(indexer, query, tokenizer)]
+
+
+def _min_span(position_lists: list[list[int]]) -> int:
+    """
+    Smallest max(p) - min(p) over all ways of picking one position from
+    each list (classic k-way merge with a heap).
+    """
+    heap = [(plist[0], k, 0) for k, plist in enumerate(position_lists)]
+    heapq.heapify(heap)
+    high = max(p for p, _, _ in heap)
+    best = high - heap[0][0]
+
+    while True:
+        low, k, i = heapq.heappop(heap)
+        best = min(best, high - low)
+        if best == 0 or i + 1 == len(position_lists[k]):
+            return best
+        nxt = position_lists[k][i + 1]
+        high = max(high, nxt)
+        heapq.heappush(heap, (nxt, k, i + 1))
+
+
+def proximity_query(indexer, query, window: int, tokenizer=None) -> list[tuple[int, int]]:
+    """
+    Documents where all query terms occur, in any order, within `window`
+    tokens of each other (last position - first position <= window).
+    Returns (doc_id, smallest span) pairs, by doc ID.
+    """
+    if not indexer.positional:
+        raise ValueError("proximity queries need an index built with positional=True")
+
+    terms = list(dict.fromkeys(_query_terms(query, tokenizer)))
+    if not terms:
+        return []
+
+    term_ids = [indexer.term_ids.get(term) for term in terms]
+    matches = []
+    for doc_id, cursors in _intersect(indexer, terms):
+        span = _min_span([indexer.positions_at(term_ids[k], cursors[k]) for k in range(len(terms))])
+        if span <= window:
+            matches.append((doc_id, span))
+    return matches
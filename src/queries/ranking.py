@@ -0,0 +1,335 @@
+import heapq
+import math
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from index.forward import ForwardIndex
+from index.lexicon import vocabulary
+from index.tokenizer import Tokenizer
+from .boolean import END, DictIndex, TermCursor
+
+
+SCORINGS = ("bm25", "tfidf")
+
+# Upper bounds are padded by this factor so that float rounding in a
+# document's summed score can never push it above the bound it was
+# pruned with.
+_BOUND_SLACK = 1 + 1e-9
+
+# Postings per block for block-max bounds
+BLOCK_SIZE = 64
+
+
+class _ScoredCursor(TermCursor):
+    """
+    TermCursor over one query term's postings that also carries the term
+    frequencies, the term's query weight and its score bounds: one for
+    the whole list and one per block of BLOCK_SIZE postings.
+    """
+
+    def __init__(self, doc_ids, tfs, weight: float, bounds):
+        super().__init__(doc_ids)
+        self.tfs = tfs
+        self.weight = weight
+        self.block_last, self.block_max = bounds
+        self.upper_bound = weight * max(self.block_max) * _BOUND_SLACK
+
+    def block_bound(self, doc_id: int):
+        """
+        (score bound, last doc ID) of the block that would hold doc_id.
+        """
+        j = bisect_left(self.block_last, doc_id)
+        if j == len(self.block_last):
+            return 0.0, END
+        return self.weight * self.block_max[j], self.block_last[j]
+
+    def tf(self) -> int:
+        return self.tfs[self.i]
+
+
+class RankedSearcher:
+    """
+    Top-k ranked retrieval with BM25 or TF-IDF cosine scoring.
+
+    A document's score is the sum over query terms of
+        weight(term) * impact(tf, doc)
+    where for
+        bm25:   weight = idf * query tf
+                impact = tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg length))
+        tfidf:  weight = idf * idf * (1 + log query tf) / |query|,   idf = log(N / df)
+                impact = (1 + log tf) / |doc|
+    (|doc| is the Euclidean norm of the document's tf-idf vector, so the
+    tfidf score is the cosine between query and document.)
+
+    Queries are evaluated with block-max WAND. Every term has an upper
+    bound (its weight times the largest impact in its postings) and a
+    bound per block of BLOCK_SIZE postings, computed once per term and
+    cached. A document is only scored if the bounds of the terms it can
+    contain add up to more than the current k-th best score, first for
+    whole lists, then for the blocks the document falls in; cursors
+    gallop past everything else. The block bounds are what let queries
+    made only of common terms (whose list bounds are all about equal)
+    skip most of their postings. Results are identical
+    to exhaustive scoring (search(..., prune=False)), ties broken by
+    ascending doc ID.
+
+    `index` is anything the BooleanQueryEngine accepts. Collection
+    statistics (lengths, average length, tfidf document norms) are read
+    on first use; call refresh() after the index changes. For tfidf the
+    document norms need one pass over every postings list, or over the
+    forward index if forward_path is given.
+    """
+
+    def __init__(
+        self,
+        index,
+        docs: dict | None = None,
+        scoring: str = "bm25",
+        k1: float = 1.2,
+        b: float = 0.75,
+        tokenizer: Tokenizer | None = None,
+        forward_path: str | None = None
+    ):
+        if scoring not in SCORINGS:
+            raise ValueError(f"unknown scoring {scoring!r}, expected one of {SCORINGS}")
+        if isinstance(index, dict):
+            index = DictIndex(index, docs or {})
+        self.index = index
+        self.scoring = scoring
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or Tokenizer()
+        self.forward_path = forward_path
+        self.last_stats = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Drop collection statistics and cached upper bounds.
+        """
+        self._doc_factor = None   # doc_id -> bm25 length normalization or 1 / |doc|
+        self._n_docs = 0
+        self._bounds = {}         # term -> (last doc ID, largest impact) per block
+
+    # ---------- collection statistics ----------
+
+    def _docs(self):
+        return self.index.get_docs() if hasattr(self.index, "get_docs") else self.index.docs
+
+    def _load_stats(self):
+        if self._doc_factor is not None:
+            return
+        lengths = {int(doc_id): meta["length"] for doc_id, meta in self._docs().items()}
+        self._n_docs = len(lengths)
+
+        if self.scoring == "bm25":
+            avg_length = (sum(lengths.values()) / len(lengths)) if lengths else 1.0
+            avg_length = avg_length or 1.0
+            k1, b = self.k1, self.b
+            self._doc_factor = {
+                doc_id: k1 * (1 - b + b * length / avg_length)
+                for doc_id, length in lengths.items()
+            }
+        else:
+            norms = self._tfidf_norms()
+            self._doc_factor = {
+                doc_id: (1.0 / norms[doc_id]) if norms.get(doc_id) else 0.0
+                for doc_id in lengths
+            }
+
+    def _tfidf_norms(self) -> dict:
+        """
+        doc_id -> Euclidean norm of the document's tf-idf vector.
+        """
+        squares = defaultdict(float)
+        n = self._n_docs
+
+        if self.forward_path:
+            forward = ForwardIndex(self.forward_path)
+            idfs = [self._idf(self.index.doc_freq(term)) for term in forward.terms]
+            for doc_id, term_ids, tfs in forward:
+                total = 0.0
+                for term_id, tf in zip(term_ids, tfs):
+                    total += ((1 + math.log(tf)) * idfs[term_id]) ** 2
+                squares[doc_id] = total
+        else:
+            for term in vocabulary(self.index):
+                found = self.index.postings(term)
+                if not found:
+                    continue
+                idf = math.log(n / len(found[0]))
+                for doc_id, tf in zip(*found):
+                    squares[doc_id] += ((1 + math.log(tf)) * idf) ** 2
+
+        return {doc_id: math.sqrt(total) for doc_id, total in squares.items()}
+
+    def _idf(self, df: int) -> float:
+        n = self._n_docs
+        if df <= 0:
+            return 0.0
+        if self.scoring == "bm25":
+            return math.log(1 + (n - df + 0.5) / (df + 0.5))
+        return math.log(n / df)
+
+    def _impact(self, tf: int, doc_id: int) -> float:
+        factor = self._doc_factor[doc_id]
+        if self.scoring == "bm25":
+            return tf * (self.k1 + 1) / (tf + factor)
+        return (1 + math.log(tf)) * factor
+
+    def _term_bounds(self, term: str, found):
+        bounds = self._bounds.get(term)
+        if bounds is None:
+            doc_ids, tfs = found
+            impacts = list(map(self._impact, tfs, doc_ids))
+            block_last = []
+            block_max = []
+            for start in range(0, len(impacts), BLOCK_SIZE):
+                end = min(start + BLOCK_SIZE, len(impacts))
+                block_last.append(doc_ids[end - 1])
+                block_max.append(max(impacts[start:end]))
+            bounds = self._bounds[term] = (block_last, block_max)
+        return bounds
+
+    def precompute_upper_bounds(self) -> int:
+        """
+        Compute the per-term score bounds of the whole vocabulary ahead
+        of time (otherwise each term's bound is computed on its first
+        query). Returns the number of terms.
+        """
+        self._load_stats()
+        for term in vocabulary(self.index):
+            found = self.index.postings(term)
+            if found:
+                self._term_bounds(term, found)
+        return len(self._bounds)
+
+    # ---------- queries ----------
+
+    def _query_cursors(self, query: str) -> list[_ScoredCursor]:
+        """
+        One cursor per distinct query term that occurs in the index, in
+        query order.
+        """
+        self._load_stats()
+        terms = []
+        for term, query_tf in Counter(self.tokenizer.tokenize(query)).items():
+            found = self.index.postings(term)
+            if not found:
+                continue
+            idf = self._idf(len(found[0]))
+            if self.scoring == "bm25":
+                weight = idf * query_tf
+            else:
+                weight = idf * (1 + math.log(query_tf))
+            terms.append((term, found, weight))
+
+        if self.scoring == "tfidf":
+            # Normalize the query vector, then fold in the document side's idf
+            query_norm = math.sqrt(sum(weight ** 2 for _, _, weight in terms))
+            terms = [
+                (term, found, weight * self._idf(len(found[0])) / query_norm if query_norm else 0.0)
+                for term, found, weight in terms
+            ]
+
+        return [
+            _ScoredCursor(found[0], found[1], weight, self._term_bounds(term, found))
+            for term, found, weight in terms
+        ]
+
+    def search(self, query: str, k: int = 10, prune: bool = True) -> list[tuple[int, float]]:
+        """
+        The k best (doc_id, score) pairs for query, best first.
+        With prune=False every posting is scored (reference implementation).
+        """
+        if k <= 0:
+            return []
+        cursors = self._query_cursors(query)
+        postings = sum(c.cost for c in cursors)
+        if prune:
+            heap, scored = self._wand(cursors, k)
+        else:
+            heap, scored = self._exhaustive(cursors, k)
+        self.last_stats = {"postings": postings, "scored": scored}
+        return [(-neg_doc, score) for score, neg_doc in sorted(heap, reverse=True)]
+
+    def search_urls(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """
+        Like search(), with URLs instead of doc IDs.
+        """
+        docs = self._docs()
+        return [(docs[doc_id]["url"], score) for doc_id, score in self.search(query, k)]
+
+    def _exhaustive(self, cursors, k: int):
+        # Term-at-a-time accumulators; terms are added in query order, the
+        # same order _wand() sums them in, so scores match bit for bit
+        scores = {}
+        for cursor in cursors:
+            for doc_id, tf in zip(cursor.docs, cursor.tfs):
+                scores[doc_id] = scores.get(doc_id, 0.0) + cursor.weight * self._impact(tf, doc_id)
+        best = heapq.nlargest(k, ((score, -doc_id) for doc_id, score in scores.items()))
+        return best, len(scores)
+
+    def _wand(self, cursors, k: int):
+        # Min-heap of the k best (score, -doc_id): its root is the entry to
+        # beat, and a later doc with an equal score never displaces it
+        heap = []
+        threshold = -1.0
+        scored = 0
+        ordered = list(cursors)   # query order, for summing scores
+
+        while True:
+            cursors.sort(key=lambda c: c.doc)
+
+            # Pivot: first cursor at which the bounds can beat the threshold
+            bound = 0.0
+            pivot = None
+            for p, cursor in enumerate(cursors):
+                if cursor.doc == END:
+                    break
+                bound += cursor.upper_bound
+                if bound > threshold:
+                    pivot = cursor.doc
+                    break
+            if pivot is None:
+                break
+            while p + 1 < len(cursors) and cursors[p + 1].doc == pivot:
+                p += 1
+
+            # Block-max check: if the blocks the pivot falls in cannot beat
+            # the threshold, no document up to the end of the first of those
+            # blocks (or the next cursor's doc) can either
+            block_bound = 0.0
+            skip_to = cursors[p + 1].doc if p + 1 < len(cursors) else END
+            for cursor in cursors[:p + 1]:
+                upper, last = cursor.block_bound(pivot)
+                block_bound += upper
+                skip_to = min(skip_to, last + 1)
+            if block_bound * _BOUND_SLACK <= threshold:
+                for cursor in cursors[:p + 1]:
+                    cursor.advance(skip_to)
+                continue
+
+            if cursors[0].doc == pivot:
+                # Every cursor up to the pivot is on it: score the document
+                score = 0.0
+                for cursor in ordered:
+                    if cursor.doc == pivot:
+                        score += cursor.weight * self._impact(cursor.tf(), pivot)
+                        cursor.next()
+                scored += 1
+
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, -pivot))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, -pivot))
+                if len(heap) == k:
+                    threshold = heap[0][0]
+            else:
+                # Documents before the pivot cannot make the top k
+                for cursor in cursors:
+                    if cursor.doc >= pivot:
+                        break
+                    cursor.advance(pivot)
+
+        return heap, scored
@@ -1,14 +1,35 @@
-#from index.storage import load_index_json
-from src.index.storage import load_index_json
+import argparse
+import os
+import sys
 
-def get_docs_for_term(index: dict, term: str) -> set[int]:
+from index.storage import load_index_json
+from index.tokenizer import Tokenizer
+from queries.batch import print_stats, read_queries, run_batch
+
+
+# The assignment's query terms, used when no others are given
+DEFAULT_TERMS = ("sustainability", "waste")
+
+def get_docs_for_term(index: dict, term: str, tokenizer: Tokenizer | None = None) -> set[int]:
     """
-    Returns the set of document IDs containing the given token.
+    Returns the set of document IDs containing the given term. The term
+    is tokenized like the documents were; a term of several words
+    matches documents containing all of them.
     """
-    term = term.lower()
-    if term not in index:
+    tokens = (tokenizer or Tokenizer()).tokenize(term)
+    if not tokens:
         return set()
-    return set(index[term].keys())
+    found = [set(index[t].keys()) if t in index else set() for t in tokens]
+    return set.intersection(*found)
+
+
+def term_file_name(term: str, tokenizer: Tokenizer | None = None) -> str:
+    """
+    Output file name for term: its tokens joined by "_", so it never
+    contains path separators (e.g. "waste/energy" -> waste_energy_docs.txt).
+    """
+    tokens = (tokenizer or Tokenizer()).tokenize(term)
+    return f"{'_'.join(tokens) or 'empty'}_docs.txt"
 
 
 def save_collection_to_file(doc_ids: set[int], docs_meta: dict, path: str):
@@ -23,40 +44,78 @@ def save_collection_to_file(doc_ids: set[int], docs_meta: dict, path: str):
             f.write(f"{doc_id}\t{url}\n")
 
 
-def run_queries(index_path: str = "data/index.json"):
+def run_queries(index_path: str = "data/index.json", terms=DEFAULT_TERMS, out_dir: str = "data"):
     """
-    Load index and run queries for 'sustainability' and 'waste'.
-    Save:
-        sustainability_docs.txt
-        waste_docs.txt
-        my_collection.txt
+    Load index and run one query per term (by default 'sustainability'
+    and 'waste').
+    Save to out_dir:
+        <term>_docs.txt for every term (see term_file_name)
+        my_collection.txt (documents matching any term)
     """
 
     print("=== Loading Index ===")
     index, docs_meta = load_index_json(index_path)
+    tokenizer = Tokenizer()
 
     # 1. Query terms
-    sustainability_docs = get_docs_for_term(index, "sustainability")
-    waste_docs = get_docs_for_term(index, "waste")
-
-    print(f"Documents with 'sustainability': {len(sustainability_docs)}")
-    print(f"Documents with 'waste': {len(waste_docs)}")
+    term_docs = {term: get_docs_for_term(index, term, tokenizer) for term in terms}
+    for term, doc_ids in term_docs.items():
+        print(f"Documents with '{term}': {len(doc_ids)}")
 
     # 2. Intersection + union
-    intersection = sustainability_docs.intersection(waste_docs)
-    my_collection = sustainability_docs.union(waste_docs)
+    results = list(term_docs.values())
+    intersection = set.intersection(*results) if results else set()
+    my_collection = set.union(set(), *results)
 
-    print(f"Documents in both: {len(intersection)}")
+    print(f"Documents in all: {len(intersection)}")
     print(f"MyCollection size: {len(my_collection)}")
 
     # 3. Save output files
-    save_collection_to_file(sustainability_docs, docs_meta, "data/sustainability_docs.txt")
-    save_collection_to_file(waste_docs, docs_meta, "data/waste_docs.txt")
-    save_collection_to_file(my_collection, docs_meta, "data/my_collection.txt")
+    os.makedirs(out_dir, exist_ok=True)
+    saved = []
+    for term, doc_ids in term_docs.items():
+        saved.append(term_file_name(term, tokenizer))
+        save_collection_to_file(doc_ids, docs_meta, os.path.join(out_dir, saved[-1]))
+    saved.append("my_collection.txt")
+    save_collection_to_file(my_collection, docs_meta, os.path.join(out_dir, saved[-1]))
 
     print("\n=== Query Phase Complete ===")
-    print("Saved: sustainability_docs.txt, waste_docs.txt, my_collection.txt")
+    print(f"Saved: {', '.join(saved)}")
+
+
+def run_query_file(index_path: str, source, out_dir: str = "data") -> dict:
+    """
+    Run a file of queries (see queries.batch.read_queries) as Boolean
+    queries and save every hit to out_dir/query_results.txt as
+    "query_id  doc_id  url" rows, one file for any number of queries.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, "query_results.txt")
+    with open(path, "w", encoding="utf-8") as out:
+        stats = run_batch(index_path, read_queries(source), out, fmt="tsv", workers=1)
+    print_stats(stats)
+    print(f"Saved: {path}")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Save the documents containing each query term.")
+    parser.add_argument("terms", nargs="*", help=f"query terms (default: {' '.join(DEFAULT_TERMS)})")
+    parser.add_argument("--queries", default=None, help="file of queries, one per line ('-': stdin), saved to query_results.txt")
+    parser.add_argument("--index", default="data/index.json", help="JSON index file")
+    parser.add_argument("--out-dir", default="data")
+    args = parser.parse_args(argv)
+
+    if args.terms or not args.queries:
+        run_queries(args.index, args.terms or DEFAULT_TERMS, args.out_dir)
+    if args.queries:
+        source = sys.stdin if args.queries == "-" else open(args.queries, "r", encoding="utf-8")
+        try:
+            run_query_file(args.index, source, args.out_dir)
+        finally:
+            if source is not sys.stdin:
+                source.close()
 
 
 if __name__ == "__main__":
-    run_queries(r"C:\Yannis\School\UNI\Y4-T1\COMP479\Coding\Project_2\data\index.json")
+    main()
@@ -0,0 +1,379 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from index.binary_storage import BinaryIndex
+from index.lexicon import Lexicon, lexicon_path_for, load_lexicon
+from index.storage import load_index_json
+from .boolean import QuerySyntaxError
+from .cache import QueryCache
+
+
+# Largest request body accepted (batch requests included)
+MAX_BODY_BYTES = 1024 ** 2
+
+# Latencies kept per endpoint for the percentiles in /stats
+LATENCY_WINDOW = 10000
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class BadRequest(ValueError):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def open_index(path: str):
+    """
+    Open an index for querying: a binary index directory (memory-mapped,
+    see index.binary_storage) or a JSON index file. Returns (index, docs);
+    docs is None when the index carries its own.
+    """
+    if os.path.isdir(path):
+        return BinaryIndex(path), None
+    return load_index_json(path)
+
+
+def open_lexicon(index_path: str, index, lexicon_path: str | None = None) -> Lexicon | None:
+    """
+    Load the lexicon of the index opened from index_path: lexicon_path, or
+    the one the pipeline saved with it (index.lexicon.lexicon_path_for).
+    Returns None, so the engine builds one from the index vocabulary, if
+    there is none or it does not match the index.
+    """
+    path = lexicon_path or lexicon_path_for(index_path)
+    if lexicon_path is None and not os.path.exists(path):
+        return None
+    lexicon = load_lexicon(path)
+    terms = lexicon.terms
+    if len(terms) != len(index) or (terms and (terms[0] not in index or terms[-1] not in index)):
+        print(f"[Warning] Lexicon {path} does not match the index; building one from the index instead")
+        return None
+    return lexicon
+
+
+def percentiles(values) -> dict:
+    """
+    count, p50/p90/p99 and max of latencies given in seconds, reported in ms
+    (nearest-rank percentiles).
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(50),
+        "p90_ms": rank(90),
+        "p99_ms": rank(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _log_error(what: str):
+    print(f"[Error] {what} failed:", file=sys.stderr)
+    traceback.print_exc()
+
+
+class SearchServer:
+    """
+    Local JSON-over-HTTP search service. The index is loaded once and
+    queried through a QueryCache (postings and result caches).
+
+    Endpoints (parameters in the query string or, for POST, a JSON body):
+        GET  /term?q=waste                     docs containing one term
+        GET  /boolean?q=a AND (b OR c)&limit=  Boolean query
+        GET  /ranked?q=...&k=10                top-k (BM25 by default)
+        POST /batch  {"queries": [{"endpoint": "ranked", "q": ..., "k": 5}, ...]}
+        GET  /stats                            latency percentiles + cache stats
+
+    Connections are served concurrently by asyncio (HTTP/1.1 keep-alive
+    supported). Queries run one at a time on a single query thread: the
+    engines and caches are not thread-safe, and the event loop stays free
+    to accept and read other requests while a query runs. A batch queues
+    its queries one by one, so other requests get in between them.
+    Throughput is therefore that of one core; run one server per core
+    (or the batch runner, queries.batch) for more.
+
+    An unexpected error in a query is logged to stderr and answered with
+    500; the server keeps running.
+    """
+
+    def __init__(
+        self,
+        index,
+        docs: dict | None = None,
+        host: str = "127.0.0.1",
+        port: int = 8479,
+        scoring: str = "bm25",
+        default_limit: int = 100,
+        lexicon: Lexicon | None = None
+    ):
+        self.queries = QueryCache(index, docs, scoring=scoring, lexicon=lexicon)
+        self.host = host
+        self.port = port
+        self.default_limit = default_limit
+        self.latencies = {}     # endpoint -> recent latencies (seconds)
+        self._server = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query")
+        self._routes = {
+            "/term": self._term,
+            "/boolean": self._boolean,
+            "/ranked": self._ranked,
+            "/batch": self._batch,
+            "/stats": self._stats,
+        }
+
+    # ---------- lifecycle ----------
+
+    async def start(self):
+        """
+        Bind and start accepting connections. With port=0 the OS picks a
+        free port; self.port is updated to the bound one.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False)
+
+    # ---------- HTTP ----------
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                if len(parts) != 3:
+                    status, payload, endpoint = 400, {"error": "malformed request line"}, None
+                    keep_alive = False
+                else:
+                    method, target, version = parts
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                    try:
+                        length = int(headers.get("content-length") or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        status, payload, endpoint = 400, {"error": "bad Content-Length"}, None
+                        keep_alive = False
+                    elif length > MAX_BODY_BYTES:
+                        status, payload, endpoint = 413, {"error": "request body too large"}, None
+                        keep_alive = False
+                    else:
+                        body = await reader.readexactly(length) if length else b""
+                        status, payload, endpoint = await self._dispatch(method, target, body)
+
+                data = json.dumps(payload).encode("utf-8")
+                if endpoint is not None:
+                    self._record(endpoint, time.perf_counter() - start)
+
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _record(self, endpoint: str, seconds: float):
+        window = self.latencies.get(endpoint)
+        if window is None:
+            window = self.latencies[endpoint] = deque(maxlen=LATENCY_WINDOW)
+        window.append(seconds)
+
+    async def _dispatch(self, method: str, target: str, body: bytes):
+        """
+        Returns (status, JSON payload, endpoint name or None).
+        """
+        url = urlsplit(target)
+        handler = self._routes.get(url.path)
+        if handler is None:
+            return 404, {"error": f"unknown endpoint {url.path}"}, None
+        endpoint = url.path.lstrip("/")
+
+        if method not in ("GET", "POST") or (endpoint == "batch" and method != "POST"):
+            return 405, {"error": f"{method} not allowed on {url.path}"}, endpoint
+
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            if body:
+                try:
+                    data = json.loads(body)
+                except ValueError:
+                    raise BadRequest("body is not valid JSON")
+                if not isinstance(data, dict):
+                    raise BadRequest("body must be a JSON object")
+                params.update(data)
+            if endpoint == "batch":
+                return 200, await handler(params), endpoint
+            if endpoint == "stats":
+                return 200, handler(params), endpoint
+            return 200, await self._run(handler, params), endpoint
+        except BadRequest as e:
+            return e.status, {"error": str(e)}, endpoint
+        except QuerySyntaxError as e:
+            return 400, {"error": str(e)}, endpoint
+        except Exception:
+            _log_error(f"{method} {target}")
+            return 500, {"error": "internal server error"}, endpoint
+
+    async def _run(self, handler, params: dict) -> dict:
+        """
+        Run a query handler on the query thread (see the class docstring).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, handler, params)
+
+    # ---------- endpoints ----------
+
+    def _int_param(self, params: dict, name: str, default: int) -> int:
+        value = params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError, OverflowError):
+            raise BadRequest(f"{name} must be an integer")
+        if value < 0:
+            raise BadRequest(f"{name} must not be negative")
+        return value
+
+    def _query_param(self, params: dict) -> str:
+        query = params.get("q")
+        if not isinstance(query, str) or not query.strip():
+            raise BadRequest("missing query parameter q")
+        return query
+
+    def _describe(self, doc_ids) -> list[dict]:
+        docs = self.queries.index.get_docs()
+        return [{"doc_id": doc_id, "url": docs[doc_id]["url"]} for doc_id in doc_ids]
+
+    def _term(self, params: dict) -> dict:
+        query = self._query_param(params)
+        limit = self._int_param(params, "limit", self.default_limit)
+        terms = self.queries.tokenizer.tokenize(query)
+        if len(terms) > 1:
+            raise BadRequest("term queries take a single term")
+        doc_ids = self.queries.index.doc_ids(terms[0]) if terms else []
+        return {"query": query, "count": len(doc_ids), "results": self._describe(doc_ids[:limit])}
+
+    def _boolean(self, params: dict) -> dict:
+        query = self._query_param(params)
+        limit = self._int_param(params, "limit", self.default_limit)
+        doc_ids = self.queries.boolean_search(query)
+        return {"query": query, "count": len(doc_ids), "results": self._describe(doc_ids[:limit])}
+
+    def _ranked(self, params: dict) -> dict:
+        query = self._query_param(params)
+        k = self._int_param(params, "k", 10)
+        hits = self.queries.ranked_search(query, k)
+        results = self._describe([doc_id for doc_id, _ in hits])
+        for result, (_, score) in zip(results, hits):
+            result["score"] = score
+        return {"query": query, "results": results}
+
+    async def _batch(self, params: dict) -> dict:
+        queries = params.get("queries")
+        if not isinstance(queries, list):
+            raise BadRequest("batch body needs a list of queries")
+
+        results = []
+        for item in queries:
+            if not isinstance(item, dict):
+                results.append({"error": "each query must be a JSON object"})
+                continue
+            handler = {"term": self._term, "boolean": self._boolean, "ranked": self._ranked}.get(item.get("endpoint"))
+            if handler is None:
+                results.append({"error": f"unknown endpoint {item.get('endpoint')!r}"})
+                continue
+            try:
+                results.append(await self._run(handler, item))
+            except (BadRequest, QuerySyntaxError) as e:
+                results.append({"error": str(e)})
+            except Exception:
+                _log_error(f"batch query {item!r}")
+                results.append({"error": "internal server error"})
+        return {"results": results}
+
+    def _stats(self, params: dict) -> dict:
+        return {
+            "endpoints": {name: percentiles(window) for name, window in sorted(self.latencies.items())},
+            "cache": self.queries.stats(),
+        }
+
+
+def run_server(
+    index_path: str = "data/index.json",
+    host: str = "127.0.0.1",
+    port: int = 8479,
+    scoring: str = "bm25",
+    lexicon_path: str | None = None
+):
+    """
+    Load the index (and the lexicon for wildcard/fuzzy terms, see
+    open_lexicon) once and serve queries until interrupted. Queries are
+    evaluated one at a time (see SearchServer).
+    """
+    print("=== Loading Index ===")
+    index, docs = open_index(index_path)
+    lexicon = open_lexicon(index_path, index, lexicon_path)
+    server = SearchServer(index, docs, host=host, port=port, scoring=scoring, lexicon=lexicon)
+
+    async def serve():
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port} (one query at a time)")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n=== Server stopped ===")
+
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,138 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from index.binary_storage import save_index_binary
+from index.indexer import Indexer
+from index.lexicon import Lexicon, lexicon_path_for, save_lexicon
+from index.storage import save_index_json
+from queries import batch
+from queries.batch import latency_histogram, read_queries, run_batch
+from queries.ranking import RankedSearcher
+from queries.server import open_index, open_lexicon
+
+
+def build():
+    idx = Indexer()
+    idx.add_document(["sustainability", "waste"], "http://example.com/0.pdf")
+    idx.add_document(["waste", "recycling", "waste"], "http://example.com/1.pdf")
+    idx.add_document(["sustainability", "energy"], "http://example.com/2.pdf")
+    return idx
+
+
+QUERIES = [
+    "# topics",
+    "sus\tsustainability",
+    "waste AND NOT recycling",
+    "",
+    "energy OR recycling",
+    "(broken",
+]
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.binary_dir = os.path.join(self.tmp, "bin")
+        save_index_binary(build(), self.binary_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_jsonl(self, index_path, workers, **kwargs):
+        out = io.StringIO()
+        stats = run_batch(index_path, read_queries(QUERIES), out, workers=workers, chunk_size=2, **kwargs)
+        return [json.loads(line) for line in out.getvalue().splitlines()], stats
+
+    def test_read_queries(self):
+        self.assertEqual(list(read_queries(QUERIES)), [
+            ("sus", "sustainability"),
+            ("3", "waste AND NOT recycling"),
+            ("5", "energy OR recycling"),
+            ("6", "(broken"),
+        ])
+
+    def test_boolean_jsonl_in_order(self):
+        rows, stats = self.run_jsonl(self.binary_dir, workers=1)
+        self.assertEqual([row["id"] for row in rows], ["sus", "3", "5", "6"])
+        self.assertEqual([r["doc_id"] for r in rows[0]["results"]], [0, 2])
+        self.assertEqual([r["url"] for r in rows[1]["results"]], ["http://example.com/0.pdf"])
+        self.assertEqual(rows[2]["count"], 2)
+        self.assertIn("error", rows[3])
+
+        self.assertEqual((stats["queries"], stats["errors"]), (4, 1))
+        self.assertGreater(stats["qps"], 0)
+        self.assertEqual(sum(count for _, count in stats["histogram"]), 4)
+
+    def test_unexpected_error_fails_only_its_query(self):
+        evaluate = batch._evaluate
+
+        def failing(queries, mode, query, k, limit):
+            if query == "energy":
+                raise KeyError(7)
+            return evaluate(queries, mode, query, k, limit)
+
+        out = io.StringIO()
+        with mock.patch.object(batch, "_evaluate", failing), mock.patch("sys.stderr", io.StringIO()):
+            stats = run_batch(self.binary_dir, [("1", "waste"), ("2", "energy"), ("3", "recycling")], out, workers=1)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row["id"] for row in rows], ["1", "2", "3"])
+        self.assertEqual(rows[1]["error"], "internal error: KeyError")
+        self.assertEqual(rows[2]["count"], 1)
+        self.assertEqual(stats["errors"], 1)
+
+    def test_worker_pool_matches_single_process(self):
+        json_path = os.path.join(self.tmp, "index.json")
+        save_index_json(build(), json_path)
+        single, _ = self.run_jsonl(json_path, workers=1, mode="ranked", k=2)
+        pooled, _ = self.run_jsonl(self.binary_dir, workers=2, mode="ranked", k=2)
+        self.assertEqual(single, pooled)
+        expected = RankedSearcher(build()).search("sustainability", k=2)
+        self.assertEqual([(r["doc_id"], r["score"]) for r in pooled[0]["results"]], expected)
+
+    def test_worker_pool_converts_json_index_once(self):
+        json_path = os.path.join(self.tmp, "index.json")
+        save_index_json(build(), json_path)
+        single, _ = self.run_jsonl(json_path, workers=1)
+        pooled, _ = self.run_jsonl(json_path, workers=2)
+        self.assertEqual(single, pooled)
+
+    def test_tsv(self):
+        out = io.StringIO()
+        run_batch(self.binary_dir, [("t1", "waste")], out, fmt="tsv", workers=1)
+        self.assertEqual(out.getvalue(), "t1\t0\thttp://example.com/0.pdf\nt1\t1\thttp://example.com/1.pdf\n")
+
+    def test_histogram(self):
+        histogram = dict(latency_histogram([0.00005, 0.0003, 0.0003, 5.0]))
+        self.assertEqual(histogram["<= 0.1 ms"], 1)
+        self.assertEqual(histogram["<= 0.5 ms"], 2)
+        self.assertEqual(histogram["> 1000 ms"], 1)
+
+    def test_lexicon_saved_with_index(self):
+        index, _ = open_index(self.binary_dir)
+        self.assertIsNone(open_lexicon(self.binary_dir, index))
+
+        save_lexicon(Lexicon(build().terms), lexicon_path_for(self.binary_dir))
+        lexicon = open_lexicon(self.binary_dir, index)
+        self.assertEqual(lexicon.terms, sorted(build().terms))
+
+        # A lexicon of another index is not used
+        stale = os.path.join(self.tmp, "stale.bin")
+        save_lexicon(Lexicon(["waste", "zebra"]), stale)
+        self.assertIsNone(open_lexicon(self.binary_dir, index, stale))
+
+        out = io.StringIO()
+        run_batch(self.binary_dir, [("w", "recyc*")], out, workers=1, lexicon_path=stale)
+        self.assertEqual(json.loads(out.getvalue())["count"], 1)
+
+    def test_bad_mode(self):
+        with self.assertRaises(ValueError):
+            run_batch(self.binary_dir, [], io.StringIO(), mode="fuzzy")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+from index.binary_storage import BinaryIndex, BinaryIndexWriter, convert_json_to_binary, save_index_binary
+from index.compression import encode_postings
+from index.indexer import Indexer
+from index.storage import save_index_json
+
+
+class TestBinaryStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.idx = Indexer()
+        self.idx.add_document(["waste", "management", "waste"], "http://example.com/a.pdf")
+        self.idx.add_document(["energy", "zoning", "waste"], "http://example.com/é.pdf")
+        self.idx.add_document(["management"] * 300, "http://example.com/c.pdf")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def check(self, index):
+        self.assertEqual(len(index), 4)
+        self.assertEqual(list(index), ["energy", "management", "waste", "zoning"])
+        self.assertIn("waste", index)
+        self.assertNotIn("missing", index)
+        self.assertEqual(dict(index["waste"]), {0: 2, 1: 1})
+        self.assertEqual(index["management"][2], 300)
+        self.assertEqual(list(index.doc_ids("management")), [0, 2])
+        self.assertEqual(list(index.doc_ids("missing")), [])
+        self.assertEqual(list(index.iter_postings("energy")), [(1, 1)])
+        self.assertEqual(index.doc_freq("waste"), 2)
+        self.assertEqual(index.total_docs(), 3)
+        self.assertEqual(index.docs[1]["url"], "http://example.com/é.pdf")
+        self.assertEqual(index.docs[2]["length"], 300)
+        with self.assertRaises(KeyError):
+            index.docs[7]
+        self.assertEqual([index.term_at(i) for i in index.term_range("m", "n")], ["management"])
+        self.assertEqual(len(index.term_range("w")), 2)
+
+    def test_save_and_open(self):
+        path = os.path.join(self.tmp, "bin")
+        save_index_binary(self.idx, path)
+        with BinaryIndex(path) as index:
+            self.check(index)
+
+    def test_convert_from_json(self):
+        for compress in (False, True):
+            json_path = os.path.join(self.tmp, "index.json")
+            path = os.path.join(self.tmp, f"bin{compress}")
+            save_index_json(self.idx, json_path, compress=compress)
+            convert_json_to_binary(json_path, path)
+            with BinaryIndex(path) as index:
+                self.check(index)
+
+    def test_writer_needs_sorted_terms(self):
+        writer = BinaryIndexWriter(os.path.join(self.tmp, "bin"))
+        writer.add("waste", encode_postings([0, 4], [2, 1]))
+        with self.assertRaises(ValueError):
+            writer.add("energy", encode_postings([1], [1]))
+        writer.finish([(0, "http://example.com/a.pdf", 3), (4, "http://example.com/b.pdf", 1)])
+        with BinaryIndex(writer.directory) as index:
+            self.assertEqual(dict(index["waste"]), {0: 2, 4: 1})
+
+    def test_empty_index(self):
+        path = os.path.join(self.tmp, "empty")
+        save_index_binary(Indexer(), path)
+        with BinaryIndex(path) as index:
+            self.assertEqual(len(index), 0)
+            self.assertNotIn("waste", index)
+            self.assertEqual(index.total_docs(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
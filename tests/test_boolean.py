@@ -0,0 +1,140 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+from index.binary_storage import BinaryIndex, save_index_binary
+from index.indexer import Indexer
+from index.storage import load_index_json, save_index_json
+from queries.boolean import BooleanQueryEngine, QuerySyntaxError, TermCursor
+
+
+DOCS = [
+    ["sustainability", "waste"],            # 0
+    ["waste", "recycling"],                 # 1
+    ["sustainability", "energy"],           # 2
+    ["sustainability", "waste", "plastic"], # 3
+    ["energy"],                             # 4
+    ["recycling", "sustainability"],        # 5
+]
+
+
+def build():
+    idx = Indexer()
+    for i, tokens in enumerate(DOCS):
+        idx.add_document(tokens, f"http://example.com/{i}.pdf")
+    return idx
+
+
+def brute_force(predicate):
+    return [i for i, tokens in enumerate(DOCS) if predicate(set(tokens))]
+
+
+class TestBooleanQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = BooleanQueryEngine(build())
+
+    def search(self, query):
+        return list(self.engine.search(query))
+
+    def test_operators(self):
+        self.assertEqual(self.search("sustainability AND waste"), [0, 3])
+        self.assertEqual(self.search("sustainability waste"), [0, 3])
+        self.assertEqual(self.search("waste OR energy"), [0, 1, 2, 3, 4])
+        self.assertEqual(self.search("NOT sustainability"), [1, 4])
+        self.assertEqual(self.search("sustainability AND NOT waste"), [2, 5])
+        self.assertEqual(self.search("sustainability NOT waste NOT energy"), [5])
+
+    def test_precedence_and_parentheses(self):
+        self.assertEqual(
+            self.search("sustainability AND (waste OR recycling) NOT plastic"),
+            brute_force(lambda t: "sustainability" in t and ("waste" in t or "recycling" in t) and "plastic" not in t)
+        )
+        self.assertEqual(
+            self.search("energy OR sustainability AND plastic"),
+            brute_force(lambda t: "energy" in t or ("sustainability" in t and "plastic" in t))
+        )
+        self.assertEqual(
+            self.search("NOT (waste OR energy)"),
+            brute_force(lambda t: not ("waste" in t or "energy" in t))
+        )
+
+    def test_normalization_and_missing_terms(self):
+        self.assertEqual(self.search("Sustainability and WASTE"), [0, 3])
+        self.assertEqual(self.search("the waste"), [0, 1, 3])
+        self.assertEqual(self.search("unknown AND waste"), [])
+        self.assertEqual(self.search("unknown OR waste"), [0, 1, 3])
+        self.assertEqual(self.search("the"), [])
+        self.assertEqual(self.engine.count("sustainability"), 4)
+
+    def test_syntax_errors(self):
+        for query in ("waste AND", "(waste OR energy", "waste )", "OR waste", "NOT", "*", "waste AND **"):
+            with self.assertRaises(QuerySyntaxError):
+                self.search(query)
+
+    def test_other_index_types(self):
+        idx = build()
+        tmp = tempfile.mkdtemp()
+        try:
+            json_path = os.path.join(tmp, "index.json")
+            save_index_json(idx, json_path)
+            index, docs = load_index_json(json_path)
+            self.assertEqual(list(BooleanQueryEngine(index, docs).search("sustainability NOT waste")), [2, 5])
+
+            save_index_binary(idx, os.path.join(tmp, "bin"))
+            with BinaryIndex(os.path.join(tmp, "bin")) as binary:
+                self.assertEqual(list(BooleanQueryEngine(binary).search("recycling OR plastic")), [1, 3, 5])
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_random_queries_match_brute_force(self):
+        rng = random.Random(7)
+        words = ["a1", "b2", "c3", "d4", "e5"]
+        docs = [[w for w in words if rng.random() < 0.4] for _ in range(200)]
+        idx = Indexer()
+        for i, tokens in enumerate(docs):
+            idx.add_document(tokens, f"http://example.com/{i}.pdf")
+        engine = BooleanQueryEngine(idx)
+
+        for _ in range(100):
+            a, b, c = rng.sample(words, 3)
+            query = f"{a} AND NOT ({b} OR {c})" if rng.random() < 0.5 else f"({a} OR {b}) {c}"
+            if "NOT" in query:
+                expected = [i for i, t in enumerate(docs) if a in t and b not in t and c not in t]
+            else:
+                expected = [i for i, t in enumerate(docs) if (a in t or b in t) and c in t]
+            self.assertEqual(list(engine.search(query)), expected, query)
+
+    def test_parse_from_several_threads(self):
+        queries = ["sustainability AND (waste OR energy)", "NOT waste", "(energy OR waste) NOT sustainability"] * 50
+        expected = {query: self.engine.parse(query) for query in queries}
+        mismatches = []
+
+        def parse_all():
+            for query in queries:
+                if self.engine.parse(query) != expected[query]:
+                    mismatches.append(query)
+
+        threads = [threading.Thread(target=parse_all) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(mismatches, [])
+
+    def test_galloping_cursor(self):
+        cursor = TermCursor(list(range(0, 10000, 3)))
+        cursor.advance(2999)
+        self.assertEqual(cursor.doc, 3000)
+        cursor.advance(3000)
+        self.assertEqual(cursor.doc, 3000)
+        cursor.next()
+        self.assertEqual(cursor.doc, 3003)
+        cursor.advance(20000)
+        self.assertEqual(cursor.doc, 1 << 63)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from crawler.cache import ResponseCache
+from crawler.client import HttpClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.request = None
+
+    def close(self):
+        pass
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_and_conditional_headers(self):
+        cache = ResponseCache(self.dir)
+        cache.store("http://x/a", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, b"body")
+
+        headers = cache.conditional_headers("http://x/a")
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertIn("If-Modified-Since", headers)
+        self.assertEqual(cache.read("http://x/a"), b"body")
+
+        # Index survives a restart
+        cache.flush()
+        self.assertEqual(ResponseCache(self.dir).read("http://x/a"), b"body")
+
+    def test_index_flushed_every_few_stores(self):
+        cache = ResponseCache(self.dir, flush_every=3)
+        cache.store("http://x/a", {"ETag": "a"}, b"a")
+        cache.store("http://x/b", {"ETag": "b"}, b"b")
+        self.assertEqual(ResponseCache(self.dir).entries, {})
+
+        cache.store("http://x/c", {"ETag": "c"}, b"c")
+        self.assertEqual(len(ResponseCache(self.dir).entries), 3)
+
+        cache.store("http://x/d", {"ETag": "d"}, b"d")
+        cache.flush()
+        self.assertEqual(len(ResponseCache(self.dir).entries), 4)
+
+    def test_object_written_under_lock(self):
+        # store() must not put a body in place while another thread holds
+        # the lock, or a concurrent _unref() of that digest could delete it
+        # before the new entry references it
+        cache = ResponseCache(self.dir)
+        cache.store("http://x/a", {"ETag": "a"}, b"shared")
+        path = cache._object_path(cache.entries["http://x/a"]["digest"])
+
+        with cache._lock:
+            cache._unref(cache.entries.pop("http://x/a"))
+            writer = threading.Thread(target=cache.store, args=("http://x/b", {"ETag": "b"}, b"shared"))
+            writer.start()
+            writer.join(0.2)
+            self.assertFalse(os.path.exists(path))
+        writer.join()
+
+        self.assertEqual(cache.read("http://x/b"), b"shared")
+        self.assertEqual(cache.total_bytes(), 6)
+
+    def test_no_validators_not_cached(self):
+        cache = ResponseCache(self.dir)
+        self.assertFalse(cache.store("http://x/a", {}, b"body"))
+        self.assertEqual(cache.conditional_headers("http://x/a"), {})
+
+    def test_identical_bodies_share_one_object(self):
+        cache = ResponseCache(self.dir)
+        cache.store("http://x/a", {"ETag": "a"}, b"same")
+        cache.store("http://x/b", {"ETag": "b"}, b"same")
+        self.assertEqual(cache.total_bytes(), 4)
+
+        cache.remove("http://x/a")
+        self.assertEqual(cache.read("http://x/b"), b"same")
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(self.dir, max_bytes=10)
+        cache.store("http://x/a", {"ETag": "a"}, b"aaaaa")
+        cache.store("http://x/b", {"ETag": "b"}, b"bbbbb")
+        cache.lookup("http://x/a")
+        cache.store("http://x/c", {"ETag": "c"}, b"ccccc")
+
+        self.assertIsNotNone(cache.lookup("http://x/a"))
+        self.assertIsNone(cache.lookup("http://x/b"))
+        self.assertLessEqual(cache.total_bytes(), 10)
+
+    def test_client_serves_304_from_cache(self):
+        cache = ResponseCache(self.dir)
+        client = HttpClient(cache=cache, max_retries=0)
+        client.session.get = mock.Mock(side_effect=[
+            FakeResponse(200, b"<html>v1</html>", {"ETag": '"v1"', "Content-Type": "text/html"}),
+            FakeResponse(304, b"", {"ETag": '"v1"'}),
+        ])
+
+        first = client.get("http://x/page")
+        second = client.get("http://x/page")
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.from_cache)
+        sent = client.session.get.call_args_list[1].kwargs["headers"]
+        self.assertEqual(sent["If-None-Match"], '"v1"')
+        self.assertEqual(client.stats.summary()["cache_hits"], 1)
+
+    def test_client_refetches_when_304_body_is_gone(self):
+        cache = ResponseCache(self.dir)
+        client = HttpClient(cache=cache, max_retries=0)
+        client.session.get = mock.Mock(side_effect=[
+            FakeResponse(200, b"<html>v1</html>", {"ETag": '"v1"'}),
+            FakeResponse(304, b"", {"ETag": '"v1"'}),
+            FakeResponse(200, b"<html>v1</html>", {"ETag": '"v1"'}),
+        ])
+        client.get("http://x/page")
+
+        conditional_headers = cache.conditional_headers
+
+        def evicted_after_headers(url):
+            # Evicted between sending the validators and the 304 arriving
+            headers = conditional_headers(url)
+            cache.remove(url)
+            return headers
+
+        with mock.patch.object(cache, "conditional_headers", evicted_after_headers):
+            resp = client.get("http://x/page")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, b"<html>v1</html>")
+        self.assertNotIn("If-None-Match", client.session.get.call_args_list[2].kwargs["headers"] or {})
+        self.assertIsNotNone(cache.lookup("http://x/page"))
+
+
+if __name__ == "__main__":
+    unittest.main()
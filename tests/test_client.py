@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from crawler.client import HttpClient, parse_retry_after
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+
+    def make_client(self, responses):
+        client = HttpClient(max_retries=2, backoff_base=0.0)
+        client.session.get = mock.Mock(side_effect=responses)
+        return client
+
+    def test_retries_then_succeeds(self):
+        client = self.make_client([FakeResponse(503), FakeResponse(200, b"hello")])
+
+        resp = client.get("https://example.com/")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(client.session.get.call_count, 2)
+        summary = client.stats.summary()
+        self.assertEqual(summary["requests"], 1)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["bytes"], 5)
+
+    def test_gives_up_after_max_retries(self):
+        client = self.make_client([requests.ConnectionError()] * 3)
+
+        self.assertIsNone(client.get("https://example.com/"))
+        self.assertEqual(client.session.get.call_count, 3)
+        self.assertEqual(client.stats.summary()["failures"], 1)
+
+    def test_no_retry_on_404(self):
+        client = self.make_client([FakeResponse(404)])
+
+        self.assertEqual(client.get("https://example.com/").status_code, 404)
+        self.assertEqual(client.session.get.call_count, 1)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from index.compression import (
+    decode_postings,
+    encode_postings,
+    iter_postings,
+    iter_vbyte,
+    vbyte_decode,
+    vbyte_encode,
+)
+
+
+class TestCompression(unittest.TestCase):
+
+    def test_vbyte_round_trip(self):
+        numbers = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 32 - 1]
+        data = vbyte_encode(numbers)
+
+        self.assertEqual(vbyte_decode(data), numbers)
+        self.assertEqual(len(vbyte_encode([5])), 1)
+        self.assertEqual(len(vbyte_encode([128])), 2)
+
+    def test_vbyte_rejects_negative_and_truncated(self):
+        with self.assertRaises(ValueError):
+            vbyte_encode([-1])
+        with self.assertRaises(ValueError):
+            vbyte_decode(vbyte_encode([300])[:1])
+
+    def test_postings_round_trip(self):
+        doc_ids = [3, 4, 10, 1000, 70000]
+        tfs = [1, 5, 2, 200, 1]
+        data = encode_postings(doc_ids, tfs)
+
+        self.assertEqual(list(iter_postings(data)), list(zip(doc_ids, tfs)))
+        decoded_docs, decoded_tfs = decode_postings(data)
+        self.assertEqual(list(decoded_docs), doc_ids)
+        self.assertEqual(list(decoded_tfs), tfs)
+
+        # Small gaps and tfs take one byte each
+        self.assertEqual(len(encode_postings([1, 2, 3], [1, 1, 1])), 6)
+
+    def test_iter_postings_is_lazy(self):
+        data = encode_postings(range(0, 100000, 7), [1] * len(range(0, 100000, 7)))
+        it = iter_postings(data)
+
+        self.assertEqual(next(it), (0, 1))
+        self.assertEqual(next(it), (7, 1))
+
+    def test_long_lists_decode_like_short_ones(self):
+        # Long lists take the vectorized path
+        doc_ids = list(range(0, 3000000, 999))
+        tfs = [i % 300 + 1 for i in range(len(doc_ids))]
+        data = encode_postings(doc_ids, tfs)
+
+        decoded_docs, decoded_tfs = decode_postings(data)
+        self.assertEqual(list(decoded_docs), doc_ids)
+        self.assertEqual(list(decoded_tfs), tfs)
+        self.assertEqual(vbyte_decode(data), list(iter_vbyte(data)))
+
+    def test_unsorted_doc_ids_rejected(self):
+        with self.assertRaises(ValueError):
+            encode_postings([5, 2], [1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
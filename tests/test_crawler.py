@@ -0,0 +1,196 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from crawler.crawler import SpectrumCrawler
+
+
+ROOT = "https://example.com"
+
+# Small fake site: page -> list of hrefs
+SITE = {
+    "/": ["/a", "/b", "/c", "https://other.org/x"],
+    "/a": ["/a1", "/doc/a.pdf", "/b"],
+    "/b": ["/doc/b.pdf", "/b1"],
+    "/c": ["/doc/c.pdf", "/"],
+    "/a1": ["/doc/a1.pdf"],
+    "/b1": ["/doc/b1.pdf"],
+}
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+def fake_request(url, timeout=5.0):
+    path = url[len(ROOT):] or "/"
+    if path not in SITE:
+        return FakeResponse("", 404)
+    links = "".join(f'<a href="{href}">x</a>' for href in SITE[path])
+    return FakeResponse(f"<html><body>{links}</body></html>")
+
+
+class AllowAll:
+    crawl_delay = None
+
+    def get(self, url):
+        return self
+
+    def is_allowed(self, url):
+        return True
+
+
+@mock.patch("crawler.crawler.RobotsCache", AllowAll)
+@mock.patch("crawler.crawler.safe_request", side_effect=fake_request)
+class TestCrawler(unittest.TestCase):
+
+    def test_sequential_crawl(self, _):
+        results = SpectrumCrawler(ROOT + "/", max_files=10).crawl()
+        self.assertEqual(results["pdf_urls"], [
+            ROOT + "/doc/a.pdf", ROOT + "/doc/b.pdf", ROOT + "/doc/c.pdf",
+            ROOT + "/doc/a1.pdf", ROOT + "/doc/b1.pdf",
+        ])
+
+    def test_concurrent_crawl_matches_sequential_order(self, _):
+        sequential = SpectrumCrawler(ROOT + "/", max_files=10).crawl()
+        concurrent = SpectrumCrawler(ROOT + "/", max_files=10, max_in_flight=4).crawl()
+
+        self.assertEqual(concurrent["pdf_urls"], sequential["pdf_urls"])
+        self.assertEqual(concurrent["visited_count"], sequential["visited_count"])
+        self.assertEqual(list(concurrent["pages_visited"]), list(sequential["pages_visited"]))
+
+    def test_duplicates_dropped_at_enqueue(self, _):
+        crawler = SpectrumCrawler(ROOT + "/", max_files=10, seen_mode="bloom", seen_capacity=100)
+        results = crawler.crawl()
+
+        pages = list(results["pages_visited"])
+        self.assertEqual(len(pages), len(set(pages)))
+        self.assertEqual(results["visited_count"], 6)
+        self.assertEqual(len(results["pdf_urls"]), 5)
+
+    def test_visited_log_closed_after_crawl(self, _):
+        crawler = SpectrumCrawler(ROOT + "/", max_files=10)
+        results = crawler.crawl()
+        self.assertIsNone(crawler._visited_log)
+        self.assertEqual(list(results["pages_visited"])[0], ROOT + "/")
+
+        # The temporary log goes away with the crawler
+        path = crawler.visited_log_path
+        del crawler, results
+        self.assertFalse(os.path.exists(path))
+
+    def test_concurrent_crawl_respects_max_files(self, _):
+        results = SpectrumCrawler(
+            ROOT + "/", max_files=2, max_in_flight=4, per_host_concurrency=1
+        ).crawl()
+        self.assertEqual(results["pdf_urls"], [ROOT + "/doc/a.pdf", ROOT + "/doc/b.pdf"])
+
+    def test_resume_from_checkpoint(self, request_mock):
+        expected = SpectrumCrawler(ROOT + "/", max_files=10).crawl()["pdf_urls"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "crawl.json")
+
+            # Fail on the fourth page fetch, after a checkpoint every page
+            calls = []
+
+            def flaky(url, timeout=5.0):
+                calls.append(url)
+                if len(calls) == 4:
+                    raise ConnectionError("network blip")
+                return fake_request(url)
+
+            request_mock.side_effect = flaky
+            crawler = SpectrumCrawler(ROOT + "/", max_files=10, checkpoint_path=path, checkpoint_every=1)
+            with self.assertRaises(ConnectionError):
+                crawler.crawl()
+            self.assertTrue(os.path.exists(path))
+
+            request_mock.side_effect = fake_request
+            resumed = SpectrumCrawler(ROOT + "/", max_files=10, checkpoint_path=path, checkpoint_every=1)
+            self.assertTrue(resumed.resumed)
+            results = resumed.crawl()
+            self.assertEqual(results["pdf_urls"], expected)
+
+            # Pages visited before the interruption are still in the log
+            pages = list(results["pages_visited"])
+            self.assertEqual(len(pages), results["visited_count"])
+            self.assertEqual(sorted(pages), sorted(set(pages)))
+            self.assertEqual(results["visited_count"], 6)
+
+            # Finished crawls remove their checkpoint
+            self.assertFalse(os.path.exists(path))
+
+
+class RobotsClient:
+    """
+    Stand-in HTTP client for robots.txt fetches.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    def get(self, url, timeout=None):
+        return FakeResponse(self.text)
+
+
+class RecordingSite:
+    """
+    fake_request that records when each page fetch starts and the peak
+    number of fetches in flight.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.starts = []
+        self.in_flight = 0
+        self.peak = 0
+
+    def __call__(self, url, timeout=5.0):
+        with self.lock:
+            self.starts.append(time.monotonic())
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        return fake_request(url)
+
+
+class TestCrawlerPoliteness(unittest.TestCase):
+
+    def crawl(self, robots_txt, **kwargs):
+        site = RecordingSite()
+        with mock.patch("crawler.robots.get_client", return_value=RobotsClient(robots_txt)), \
+                mock.patch("crawler.crawler.safe_request", side_effect=site):
+            results = SpectrumCrawler(ROOT + "/", max_files=10, **kwargs).crawl()
+        self.assertEqual(results["visited_count"], 6)
+        return site
+
+    def test_one_request_per_host_by_default(self):
+        site = self.crawl("User-agent: *\nDisallow:\n", max_in_flight=4)
+        self.assertEqual(site.peak, 1)
+
+    def test_per_host_concurrency_limit(self):
+        site = self.crawl("User-agent: *\nDisallow:\n", max_in_flight=4, per_host_concurrency=2)
+        self.assertLessEqual(site.peak, 2)
+
+    def test_robots_crawl_delay_spaces_requests(self):
+        for max_in_flight in (1, 4):
+            site = self.crawl("User-agent: *\nCrawl-delay: 0.05\n", max_in_flight=max_in_flight, per_host_concurrency=4)
+            gaps = [b - a for a, b in zip(site.starts, site.starts[1:])]
+            self.assertTrue(all(gap >= 0.045 for gap in gaps), gaps)
+
+    def test_per_host_delay(self):
+        site = self.crawl("", max_in_flight=4, per_host_concurrency=4, per_host_delay=0.05)
+        gaps = [b - a for a, b in zip(site.starts, site.starts[1:])]
+        self.assertTrue(all(gap >= 0.045 for gap in gaps), gaps)
+
+
+if __name__ == "__main__":
+    unittest.main()
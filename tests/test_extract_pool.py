@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+import unittest
+
+from index.extract_pool import ExtractionPool
+
+
+def fake_extract(source):
+    # Test double for pdfminer: bytes decide the behaviour
+    if source == b"slow":
+        time.sleep(30)
+    if source == b"bad":
+        raise ValueError("broken xref table")
+    if source == b"pid":
+        return str(os.getpid())
+    return source.decode("utf-8")
+
+
+# Stands in for a lock (e.g. in urllib3) held by another thread of the parent
+_held_lock = threading.Lock()
+
+
+def locked_extract(source):
+    with _held_lock:
+        return source.decode("utf-8")
+
+
+class TestExtractionPool(unittest.TestCase):
+
+    def test_extracts_real_pdf(self):
+        with ExtractionPool(workers=2) as pool:
+            results = pool.map([("doc", "tests/assets/479_test.pdf")])
+
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0]["ok"])
+        self.assertGreater(len(results[0]["text"].strip()), 0)
+
+    def test_failures_are_reported(self):
+        tasks = [("a", b"alpha"), ("bad", b"bad"), ("slow", b"slow"), ("b", b"beta")]
+        with ExtractionPool(workers=2, timeout=1.0, extract_fn=fake_extract) as pool:
+            results = {r["key"]: r for r in pool.imap(tasks)}
+            stats = pool.stats()
+
+        self.assertEqual(results["a"]["text"], "alpha")
+        self.assertEqual(results["b"]["text"], "beta")
+        self.assertFalse(results["bad"]["ok"])
+        self.assertIn("broken xref table", results["bad"]["error"])
+        self.assertEqual(results["slow"]["error"], "timeout")
+        self.assertEqual(stats["processed"], 4)
+        self.assertEqual(stats["failed"], 2)
+        self.assertEqual(stats["timeouts"], 1)
+
+    def test_workers_are_recycled(self):
+        tasks = [(i, b"pid") for i in range(6)]
+        with ExtractionPool(workers=1, max_tasks_per_worker=2, extract_fn=fake_extract) as pool:
+            pids = [r["text"] for r in pool.imap(tasks)]
+
+        self.assertEqual(len(set(pids)), 3)
+
+    def test_workers_do_not_inherit_parent_locks(self):
+        # A forked worker would start with the lock taken and hang
+        with _held_lock, ExtractionPool(workers=1, timeout=5.0, extract_fn=locked_extract) as pool:
+            results = pool.map([("a", b"alpha")])
+        self.assertEqual(results[0]["text"], "alpha")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from clustering.cluster import ClusterEngine, find_forward_index
+from index.forward import ForwardIndex, forward_path_for, save_forward_index
+from index.indexer import Indexer
+from index.storage import save_index_json
+from index.tokenizer import Tokenizer
+
+
+TEXTS = [
+    "Waste management and recycling of municipal waste in Montreal.",
+    "Solar energy policy: subsidies for solar panels and energy storage.",
+    "Water treatment plants; waste water and energy use.",
+    "Urban climate adaptation, green roofs and water management.",
+    "Recycling policy and circular economy for plastic waste.",
+    "A b c energy x y z",
+]
+# "study" is in every document, so max_df=0.85 drops it
+TEXTS = [text + " study" for text in TEXTS]
+
+
+class TestForwardIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        tokenizer = Tokenizer()
+        self.idx = Indexer(compress=True)
+        for i, text in enumerate(TEXTS):
+            self.idx.add_document(tokenizer.tokenize(text), f"http://example.com/{i}.pdf")
+        self.index_path = os.path.join(self.tmp, "index.json")
+        self.forward_path = os.path.join(self.tmp, "forward.bin")
+        save_index_json(self.idx, self.index_path)
+        save_forward_index(self.idx, self.forward_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip(self):
+        forward = ForwardIndex(self.forward_path)
+        self.assertEqual(forward.terms, self.idx.terms)
+        self.assertEqual(len(forward), len(TEXTS))
+
+        for doc_id, term_ids, tfs in forward:
+            expected = {term: tf for term in self.idx.terms for d, tf in self.idx.iter_postings(term) if d == doc_id}
+            got = {forward.terms[t]: tf for t, tf in zip(term_ids, tfs)}
+            self.assertEqual(got, expected)
+            self.assertEqual(list(term_ids), sorted(term_ids))
+
+        docs = list(forward.documents())
+        self.assertEqual(docs[1], (1, "http://example.com/1.pdf", self.idx.docs[1].length))
+
+    def test_cluster_matrix_matches_vectorizer(self):
+        legacy = ClusterEngine(self.index_path)
+        legacy.vectorize()
+        fast = ClusterEngine(self.index_path, forward_path=self.forward_path)
+        fast.vectorize()
+
+        self.assertEqual(list(fast.feature_names), list(legacy.feature_names))
+        self.assertNotIn("study", fast.feature_names)
+        self.assertTrue(np.allclose(fast.tfidf_matrix.toarray(), legacy.tfidf_matrix.toarray()))
+        self.assertEqual(fast.docs_meta["2"]["url"], legacy.docs_meta["2"]["url"])
+
+    def test_find_forward_index(self):
+        # Only the forward index saved next to the index is picked up
+        self.assertIsNone(find_forward_index(self.index_path))
+        path = forward_path_for(self.index_path)
+        save_forward_index(self.idx, path)
+        self.assertEqual(find_forward_index(self.index_path), path)
+
+        # An index rebuilt after the forward index was written
+        stat = os.stat(path)
+        os.utime(self.index_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(find_forward_index(self.index_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,6 +19,52 @@ class TestIndexer(unittest.TestCase):
         self.assertEqual(idx.docs[0]["url"], url)
         self.assertEqual(idx.docs[0]["length"], 3)
 
+    def test_postings_arrays(self):
+        idx = Indexer()
+        idx.add_document(["waste", "energy"], "http://example.com/a.pdf")
+        idx.add_document(["energy", "energy"], "http://example.com/b.pdf")
+
+        doc_ids, tfs = idx.postings("energy")
+        self.assertEqual(list(doc_ids), [0, 1])
+        self.assertEqual(list(tfs), [1, 2])
+        self.assertEqual(list(idx.doc_ids("waste")), [0])
+        self.assertEqual(list(idx.doc_ids("missing")), [])
+        self.assertIsNone(idx.postings("missing"))
+
+        # Term IDs are assigned in first-seen order
+        self.assertEqual(idx.terms, ["waste", "energy"])
+        self.assertEqual(idx.term_ids["energy"], 1)
+
+    def test_index_view_behaves_like_dict(self):
+        idx = Indexer()
+        idx.add_document(["waste", "energy"], "http://example.com/a.pdf")
+        idx.add_document(["energy", "energy"], "http://example.com/b.pdf")
+
+        index = idx.get_index()
+        self.assertEqual(len(index), 2)
+        self.assertNotIn("missing", index)
+        self.assertEqual(dict(index["energy"]), {0: 1, 1: 2})
+        self.assertNotIn(1, index["waste"])
+        self.assertEqual(index["energy"].get(5), None)
+        self.assertEqual(dict(idx.docs[1]), {"url": "http://example.com/b.pdf", "length": 2})
+        self.assertEqual(idx.total_docs(), 2)
+
+    def test_compressed_mode_matches_plain(self):
+        docs = [["waste", "energy", "waste"], ["energy"], ["solar", "waste"]]
+        plain = Indexer()
+        packed = Indexer(compress=True)
+        for i, tokens in enumerate(docs):
+            plain.add_document(tokens, f"http://example.com/{i}.pdf")
+            packed.add_document(tokens, f"http://example.com/{i}.pdf")
+
+        for term in plain.index:
+            self.assertEqual(dict(packed.index[term]), dict(plain.index[term]))
+            self.assertEqual(list(packed.iter_postings(term)), list(plain.iter_postings(term)))
+            self.assertEqual(packed.doc_freq(term), plain.doc_freq(term))
+        self.assertEqual(packed.index["waste"][2], 1)
+        self.assertEqual(list(packed.doc_ids("waste")), [0, 2])
+        self.assertEqual(packed.encoded_postings(0), plain.encoded_postings(0))
+
 
 if __name__ == "__main__":
     unittest.main()
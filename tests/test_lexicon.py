@@ -0,0 +1,134 @@
+import fnmatch
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from index.indexer import Indexer
+from index.lexicon import Lexicon, edit_distance, load_lexicon, save_lexicon
+from queries.boolean import BooleanQueryEngine
+
+
+TERMS = [
+    "sustainability", "sustainable", "sustain", "suspend", "waste", "wastewater",
+    "recycling", "recycle", "cycling", "energy", "policy", "ability", "capability",
+]
+
+
+def random_terms(n=3000, seed=5):
+    rng = random.Random(seed)
+    return {"".join(rng.choice("abcdeilnorst") for _ in range(rng.randint(2, 12))) for _ in range(n)}
+
+
+class TestLexicon(unittest.TestCase):
+
+    def setUp(self):
+        self.lexicon = Lexicon(TERMS)
+
+    def test_prefix(self):
+        self.assertEqual(self.lexicon.prefix("sustain"), ["sustain", "sustainability", "sustainable"])
+        self.assertEqual(self.lexicon.prefix("sus", limit=2), ["suspend", "sustain"])
+        self.assertEqual(self.lexicon.prefix("zzz"), [])
+        self.assertEqual(self.lexicon.wildcard("waste*"), ["waste", "wastewater"])
+
+    def test_wildcard(self):
+        self.assertEqual(self.lexicon.wildcard("*ability"), ["ability", "capability", "sustainability"])
+        self.assertEqual(self.lexicon.wildcard("re*cling"), ["recycling"])
+        self.assertEqual(self.lexicon.wildcard("*cycl*"), ["cycling", "recycle", "recycling"])
+        self.assertEqual(self.lexicon.wildcard("s*n*y"), ["sustainability"])
+        self.assertEqual(self.lexicon.wildcard("*y*"), sorted(t for t in TERMS if "y" in t))
+        self.assertEqual(self.lexicon.wildcard("energy"), ["energy"])
+        with self.assertRaises(ValueError):
+            self.lexicon.wildcard("**")
+
+    def test_wildcard_matches_fnmatch(self):
+        terms = random_terms()
+        lexicon = Lexicon(terms)
+        rng = random.Random(9)
+        for _ in range(200):
+            term = rng.choice(sorted(terms))
+            chars = list(term)
+            for i in sorted(rng.sample(range(len(chars)), rng.randint(1, min(3, len(chars)))), reverse=True):
+                chars[i] = "*"
+            pattern = "".join(chars)
+            if not pattern.strip("*"):
+                continue
+            with self.subTest(pattern=pattern):
+                self.assertEqual(lexicon.wildcard(pattern), sorted(fnmatch.filter(terms, pattern)))
+
+    def test_fuzzy(self):
+        self.assertEqual(self.lexicon.fuzzy("sustainibility")[0], ("sustainability", 1))
+        self.assertEqual(self.lexicon.fuzzy("wast", max_distance=1), [("waste", 1)])
+        self.assertEqual(self.lexicon.fuzzy("recycling", max_distance=0), [("recycling", 0)])
+
+    def test_fuzzy_matches_brute_force(self):
+        terms = random_terms()
+        lexicon = Lexicon(terms)
+        rng = random.Random(3)
+        for word in rng.sample(sorted(terms), 20) + ["listen", "ordinates"]:
+            distances = {t: edit_distance(word, t, limit=2) for t in terms}
+            for distance in (1, 2):
+                if len(word) + 3 - lexicon.k - lexicon.k * distance <= 0:
+                    continue   # too short for the k-gram count filter to be exact
+                expected = sorted((d, t) for t, d in distances.items() if d <= distance)
+                if not expected:
+                    continue
+                with self.subTest(word=word, distance=distance):
+                    self.assertEqual(lexicon.fuzzy(word, distance), [(t, d) for d, t in expected])
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", limit=1), 2)
+        self.assertEqual(edit_distance("", "abc"), 3)
+
+    def test_save_and_load(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "lexicon.bin")
+            save_lexicon(self.lexicon, path)
+            loaded = load_lexicon(path)
+            self.assertEqual(loaded.terms, self.lexicon.terms)
+            self.assertEqual(loaded.wildcard("*cycl*"), self.lexicon.wildcard("*cycl*"))
+            self.assertEqual(loaded.fuzzy("sustainibility"), self.lexicon.fuzzy("sustainibility"))
+        finally:
+            shutil.rmtree(tmp)
+
+
+class TestBooleanExpansion(unittest.TestCase):
+
+    def setUp(self):
+        idx = Indexer()
+        idx.add_document(["sustainability", "waste"], "http://example.com/0.pdf")
+        idx.add_document(["sustainable", "energy"], "http://example.com/1.pdf")
+        idx.add_document(["wastewater", "recycling"], "http://example.com/2.pdf")
+        idx.add_document(["energy"], "http://example.com/3.pdf")
+        self.engine = BooleanQueryEngine(idx)
+
+    def search(self, query):
+        return list(self.engine.search(query))
+
+    def test_wildcards(self):
+        self.assertEqual(self.search("sustainab*"), [0, 1])
+        self.assertEqual(self.search("Waste*"), [0, 2])
+        self.assertEqual(self.search("sustainab* AND energy"), [1])
+        self.assertEqual(self.search("energy AND NOT *water"), [1, 3])
+        self.assertEqual(self.search("nothing* OR energy"), [1, 3])
+        self.assertEqual(self.search("nothing* AND energy"), [])
+
+    def test_expansions_matching_nothing(self):
+        self.assertEqual(self.search("(zzz*) AND waste"), [])
+        self.assertEqual(self.search("(zzz~1) waste"), [])
+        self.assertEqual(self.search("waste AND (zzz* OR qqq*)"), [])
+        self.assertEqual(self.search("(zzz* OR qqq*) OR energy"), [1, 3])
+        self.assertEqual(self.search("NOT (zzz*)"), [0, 1, 2, 3])
+        self.assertEqual(self.search("energy NOT (zzz* OR qqq~1)"), [1, 3])
+        self.assertEqual(self.engine.parse("(zzz*)"), ("none",))
+
+    def test_fuzzy(self):
+        self.assertEqual(self.search("sustainibility~"), [0])
+        self.assertEqual(self.search("sustainibility~1 OR recyclng~1"), [0, 2])
+        self.assertEqual(self.search("enrgy~1 NOT sustainable"), [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from crawler.links import LinkExtractor
+
+
+ROOT = "https://spectrum.library.concordia.ca"
+
+
+class TestLinkExtractor(unittest.TestCase):
+
+    def test_mock_page(self):
+        with open("tests/assets/mock_page.html", "r", encoding="utf-8") as f:
+            html = f.read()
+
+        links = LinkExtractor(ROOT).extract(ROOT + "/", html)
+        self.assertEqual(links, [
+            ROOT + "/doc1.pdf",
+            ROOT + "/doc2.pdf",
+            ROOT + "/page2",
+        ])
+
+    def test_filters_and_normalizes(self):
+        html = (
+            '<a href="#top">top</a>'
+            '<a href="javascript:void(0)">js</a>'
+            '<a href="mailto:a@b.c">mail</a>'
+            '<a href="https://google.com/x">off-site</a>'
+            '<a>no href</a>'
+            '<a href="view/1#section">rel</a>'
+            '<a href="/view/2?a=1&amp;b=2">entity</a>'
+        )
+        links = LinkExtractor(ROOT).extract(ROOT + "/list/", html)
+        self.assertEqual(links, [
+            ROOT + "/list/view/1",
+            ROOT + "/view/2?a=1&b=2",
+        ])
+
+    def test_base_href(self):
+        html = '<head><base href="/archive/"></head><body><a href="doc.pdf">d</a></body>'
+        links = LinkExtractor(ROOT).extract(ROOT + "/list/page", html)
+        self.assertEqual(links, [ROOT + "/archive/doc.pdf"])
+
+    def test_repeated_links_hit_cache(self):
+        extractor = LinkExtractor(ROOT)
+        html = '<a href="/view/">v</a>' * 5
+        extractor.extract(ROOT + "/", html)
+        info = extractor.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 4)
+
+    def test_links_repeated_across_pages_hit_cache(self):
+        extractor = LinkExtractor(ROOT)
+        html = '<a href="/view/">v</a><a href="https://doi.org/10.1000/1">doi</a><a href="next">n</a>'
+        for i in range(50):
+            links = extractor.extract(f"{ROOT}/list/{i}/page", html)
+            self.assertEqual(links, [ROOT + "/view/", f"{ROOT}/list/{i}/next"])
+        info = extractor.cache_info()
+        # Only the path-relative link misses on every page
+        self.assertEqual(info.misses, 2 + 50)
+        self.assertEqual(info.hits, 2 * 49)
+
+
+if __name__ == "__main__":
+    unittest.main()
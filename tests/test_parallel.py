@@ -0,0 +1,66 @@
+import unittest
+from index.indexer import Indexer
+from index.parallel import build_index_parallel
+from index.tokenizer import Tokenizer
+
+
+DOCS = [
+    (f"http://example.com/{i}.pdf", text)
+    for i, text in enumerate([
+        "Waste management and recycling.",
+        "Solar energy policy for waste water.",
+        "",
+        "Urban climate adaptation; energy, energy, energy.",
+        "Recycling plants manage municipal waste.",
+        "Climate policy and solar subsidies.",
+        "Water treatment and waste.",
+    ])
+]
+
+
+def sequential(compress=False, positional=False):
+    tokenizer = Tokenizer()
+    idx = Indexer(compress=compress, positional=positional)
+    for url, text in DOCS:
+        idx.add_document(tokenizer.tokenize(text), url)
+    return idx
+
+
+def snapshot(idx):
+    return (
+        idx.terms,
+        [list(idx.iter_postings(term)) for term in idx.terms],
+        [bytes(idx.encoded_postings(i)) for i in range(len(idx.terms))],
+        {doc_id: dict(meta) for doc_id, meta in idx.docs.items()},
+        idx.next_doc_id,
+    )
+
+
+class TestParallelIndexing(unittest.TestCase):
+
+    def test_identical_to_single_process(self):
+        expected = snapshot(sequential())
+        for workers, shard_size in ((1, 100), (2, 1), (3, 2)):
+            idx = build_index_parallel(DOCS, workers=workers, shard_size=shard_size)
+            self.assertEqual(snapshot(idx), expected)
+
+    def test_compressed_and_positional_shards(self):
+        for compress, positional in ((True, False), (False, True), (True, True)):
+            expected = sequential(compress, positional)
+            idx = build_index_parallel(DOCS, workers=2, shard_size=2, compress=compress, positional=positional)
+            self.assertEqual(snapshot(idx), snapshot(expected))
+            if positional:
+                for term in expected.terms:
+                    self.assertEqual(list(idx.iter_positions(term)), list(expected.iter_positions(term)))
+
+    def test_extend_rejects_overlapping_doc_ids(self):
+        a = Indexer()
+        a.add_document(["waste"], "http://example.com/a.pdf")
+        b = Indexer()
+        b.add_document(["waste"], "http://example.com/b.pdf")
+        with self.assertRaises(ValueError):
+            a.extend(b)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,29 @@
 import unittest
-from index.pdf_extractor import extract_pdf_text
+from unittest import mock
+
+from crawler.client import HttpClient
+from index.pdf_extractor import download_pdf_to_file, extract_pdf_text
+
+
+class FakeStreamResponse:
+    def __init__(self, body, headers=None, status_code=200):
+        self.body = body
+        self.headers = headers or {}
+        self.status_code = status_code
+        self.request = None
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def fake_client(response):
+    client = HttpClient(max_retries=0)
+    client.session.get = mock.Mock(return_value=response)
+    return client
 
 
 class TestPDFExtractor(unittest.TestCase):
@@ -12,6 +36,34 @@ class TestPDFExtractor(unittest.TestCase):
         self.assertTrue(isinstance(text, str))
         self.assertGreater(len(text.strip()), 0)
 
+    def test_extract_from_file_object(self):
+        with open("tests/assets/479_test.pdf", "rb") as f:
+            text = extract_pdf_text(f)
+        self.assertGreater(len(text.strip()), 0)
+
+    def test_streaming_download(self):
+        with open("tests/assets/479_test.pdf", "rb") as f:
+            body = f.read()
+
+        client = fake_client(FakeStreamResponse(body, {"Content-Type": "application/pdf"}))
+        with mock.patch("index.pdf_extractor.get_client", return_value=client):
+            spool = download_pdf_to_file("http://x/doc.pdf", spool_threshold=1024)
+
+        with spool:
+            self.assertEqual(spool.read(), body)
+        self.assertEqual(client.stats.bytes, len(body))
+
+    def test_download_rejects_oversized_and_non_pdf(self):
+        cases = [
+            FakeStreamResponse(b"%PDF-1.4" + b"x" * 5000, {"Content-Type": "application/pdf"}),
+            FakeStreamResponse(b"%PDF-1.4", {"Content-Length": "999999"}),
+            FakeStreamResponse(b"<html>login</html>", {"Content-Type": "text/html"}),
+            FakeStreamResponse(b"<html>login</html>", {"Content-Type": "application/octet-stream"}),
+        ]
+        for response in cases:
+            with mock.patch("index.pdf_extractor.get_client", return_value=fake_client(response)):
+                self.assertIsNone(download_pdf_to_file("http://x/doc.pdf", max_bytes=1000))
+
 
 if __name__ == "__main__":
     unittest.main()
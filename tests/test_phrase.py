@@ -0,0 +1,75 @@
+import os
+import unittest
+from index.indexer import Indexer
+from index.storage import load_indexer_json, save_index_json
+from queries.phrase import phrase_matches, phrase_query, proximity_query
+
+
+DOCS = [
+    "Waste management is the management of waste.",
+    "Management of municipal waste and energy.",
+    "Solid waste management plans for the city; waste management matters.",
+    "Energy policy.",
+]
+
+
+def build(compress=False):
+    from index.tokenizer import Tokenizer
+    tokenizer = Tokenizer()
+    idx = Indexer(compress=compress, positional=True)
+    for i, text in enumerate(DOCS):
+        idx.add_document(tokenizer.tokenize(text), f"http://example.com/{i}.pdf")
+    return idx
+
+
+class TestPhrase(unittest.TestCase):
+
+    def test_positions_recorded(self):
+        idx = build()
+        # tokens of doc 0: waste management management waste
+        self.assertEqual(idx.positions("waste", 0), [0, 3])
+        self.assertEqual(idx.positions("management", 0), [1, 2])
+        self.assertEqual(idx.positions("energy", 0), [])
+        self.assertEqual(dict(idx.iter_positions("energy")), {1: [3], 3: [0]})
+        self.assertEqual(idx.index["waste"][2], 2)
+
+    def test_phrase_query(self):
+        for compress in (False, True):
+            idx = build(compress)
+            self.assertEqual(phrase_query(idx, "waste management"), [0, 2])
+            self.assertEqual(phrase_matches(idx, "waste management"), [(0, [0]), (2, [1, 5])])
+            self.assertEqual(phrase_query(idx, "management waste"), [0])
+            self.assertEqual(phrase_query(idx, "solid waste management plans"), [2])
+            self.assertEqual(phrase_query(idx, "waste energy"), [1])
+            self.assertEqual(phrase_query(idx, "unknown waste"), [])
+            self.assertEqual(phrase_query(idx, ["waste"]), [0, 1, 2])
+
+    def test_proximity_query(self):
+        idx = build()
+        self.assertEqual(proximity_query(idx, "waste energy", 1), [(1, 1)])
+        self.assertEqual(proximity_query(idx, "energy management", 3), [(1, 3)])
+        self.assertEqual(proximity_query(idx, "energy management", 2), [])
+        self.assertEqual(proximity_query(idx, "city plans", 2), [(2, 1)])
+
+    def test_requires_positional_index(self):
+        idx = Indexer()
+        idx.add_document(["waste", "management"], "http://example.com")
+        with self.assertRaises(ValueError):
+            phrase_query(idx, "waste management")
+
+    def test_positions_survive_save_and_load(self):
+        idx = build()
+        for compress in (False, True):
+            save_index_json(idx, "tests/tmp_index.json", compress=compress)
+            loaded = load_indexer_json("tests/tmp_index.json")
+            os.remove("tests/tmp_index.json")
+
+            self.assertTrue(loaded.positional)
+            self.assertEqual(loaded.total_docs(), 4)
+            self.assertEqual(loaded.docs[2]["url"], "http://example.com/2.pdf")
+            self.assertEqual(phrase_matches(loaded, "waste management"), [(0, [0]), (2, [1, 5])])
+            self.assertEqual(loaded.positions("waste", 2), idx.positions("waste", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,18 +1,152 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
+
+import main
+from index.extract_pool import ExtractionPool
+from index.storage import load_index_json
 from main import run_pipeline
 
 
+def fake_extract(path):
+    # Test double for pdfminer: the "PDF" holds its text
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text == "broken":
+        raise ValueError("broken xref table")
+    return text
+
+
+class FakeExtractionPool(ExtractionPool):
+    def __init__(self, **kwargs):
+        super().__init__(extract_fn=fake_extract, **kwargs)
+
+
+class FakeCrawler:
+    """
+    Stand-in for SpectrumCrawler: reports `urls` through on_pdf, then
+    raises `error` if one is set.
+    """
+
+    urls = []
+    error = None
+
+    def __init__(self, seed_url, max_files, **kwargs):
+        self.resumed = False
+        self.pdf_links = []
+        self.on_pdf = None
+
+    def crawl(self):
+        for url in self.urls:
+            self.pdf_links.append(url)
+            self.on_pdf(url)
+        if self.error is not None:
+            raise self.error
+
+
+def fake_download(url, max_bytes=None, dest=None):
+    # Finish out of crawl order; "missing" URLs fail like a 404
+    time.sleep(random.uniform(0, 0.02))
+    name = url.rsplit("/", 1)[-1]
+    if name.startswith("missing"):
+        return None
+    if name.startswith("crash"):
+        raise ConnectionError("connection reset")
+    text = "broken" if name.startswith("broken") else f"{name} waste recycling"
+    with open(dest, "w", encoding="utf-8") as f:
+        f.write(text)
+    return open(dest, "rb")
+
+
 class TestPipeline(unittest.TestCase):
 
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.tmp, "index.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
     def test_pipeline_smoke(self):
         # Run pipeline with max_files=0 meaning no downloads
-        run_pipeline(max_files=0, output_path="tests/tmp_index.json")
+        run_pipeline(
+            max_files=0,
+            output_path=self.output_path,
+            crawl_checkpoint=None,
+            cache_dir=None
+        )
+        # The index and its side files are written next to output_path
+        self.assertTrue(os.path.exists(self.output_path))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "index.forward.bin")))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "index.lexicon.bin")))
+
+    def run_fake(self, urls, error=None, timeout=60, **kwargs):
+        """
+        Run the threaded pipeline with a fake crawler, download and PDF
+        extraction; fails instead of hanging if a stage deadlocks.
+        Returns the exception run_pipeline raised, or None.
+        """
+        crawler = type("Crawler", (FakeCrawler,), {"urls": urls, "error": error})
+        raised = []
+
+        def run():
+            try:
+                run_pipeline(
+                    output_path=self.output_path,
+                    crawl_checkpoint=None,
+                    cache_dir=None,
+                    extract_workers=2,
+                    **kwargs
+                )
+            except Exception as e:
+                raised.append(e)
+
+        with mock.patch.object(main, "SpectrumCrawler", crawler), \
+                mock.patch.object(main, "download_pdf_to_file", fake_download), \
+                mock.patch.object(main, "ExtractionPool", FakeExtractionPool):
+            thread = threading.Thread(target=run, daemon=True)
+            thread.start()
+            thread.join(timeout)
+        self.assertFalse(thread.is_alive(), "pipeline did not finish")
+        return raised[0] if raised else None
+
+    def indexed_urls(self):
+        _, docs = load_index_json(self.output_path)
+        return [docs[doc_id]["url"] for doc_id in sorted(docs, key=int)]
+
+    def test_documents_indexed_in_crawl_order(self):
+        urls = [f"http://x/doc{i}.pdf" for i in range(12)]
+        self.assertIsNone(self.run_fake(urls, download_workers=4))
+        self.assertEqual(self.indexed_urls(), urls)
+
+    def test_failed_downloads_and_extractions_are_skipped(self):
+        urls = [
+            "http://x/doc0.pdf",
+            "http://x/missing1.pdf",
+            "http://x/broken2.pdf",
+            "http://x/doc3.pdf",
+            "http://x/crash4.pdf",
+            "http://x/doc5.pdf",
+        ]
+        self.assertIsNone(self.run_fake(urls, download_workers=3))
+        self.assertEqual(self.indexed_urls(), ["http://x/doc0.pdf", "http://x/doc3.pdf", "http://x/doc5.pdf"])
 
-        # File should exist
-        import os
-        self.assertTrue(os.path.exists("tests/tmp_index.json"))
+    def test_crawler_error_is_raised_after_the_stages_finish(self):
+        error = self.run_fake(["http://x/doc0.pdf", "http://x/doc1.pdf"], error=RuntimeError("crawl failed"))
+        self.assertIsInstance(error, RuntimeError)
+        self.assertEqual(str(error), "crawl failed")
 
-        os.remove("tests/tmp_index.json")
+    def test_full_queues_do_not_deadlock(self):
+        # Far more PDFs than queue slots: every stage blocks on a full
+        # queue at some point and must still drain
+        urls = [f"http://x/doc{i}.pdf" for i in range(40)]
+        self.assertIsNone(self.run_fake(urls, download_workers=2, queue_size=1))
+        self.assertEqual(self.indexed_urls(), urls)
 
 
 if __name__ == "__main__":
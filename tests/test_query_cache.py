@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from index.indexer import Indexer
+from index.segments import SegmentedIndex
+from index.storage import load_index_json, save_index_json
+from queries.boolean import BooleanQueryEngine
+from queries.cache import LRUCache, QueryCache
+from queries.ranking import RankedSearcher
+
+
+def build():
+    idx = Indexer()
+    idx.add_document(["sustainability", "waste"], "http://example.com/0.pdf")
+    idx.add_document(["waste", "recycling", "waste"], "http://example.com/1.pdf")
+    idx.add_document(["sustainability", "energy"], "http://example.com/2.pdf")
+    return idx
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_eviction_and_stats(self):
+        cache = LRUCache(max_bytes=30, sizeof=len)
+        cache.put("a", "x" * 10)
+        cache.put("b", "x" * 10)
+        cache.put("c", "x" * 10)
+        self.assertEqual(cache.get("a"), "x" * 10)   # a is now most recent
+        cache.put("d", "x" * 10)                      # evicts b
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 1, 1))
+        self.assertEqual(stats["bytes"], 30)
+
+        cache.put("huge", "x" * 100)   # larger than the whole cache: not stored
+        self.assertEqual(len(cache), 3)
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def test_results_match_engines(self):
+        idx = build()
+        cache = QueryCache(idx)
+        for query in ["waste", "sustainability AND NOT waste", "waste OR energy"]:
+            self.assertEqual(cache.boolean_search(query), list(BooleanQueryEngine(idx).search(query)))
+        self.assertEqual(cache.ranked_search("waste", k=2), RankedSearcher(idx).search("waste", k=2))
+
+    def test_normalized_query_hits(self):
+        cache = QueryCache(build())
+        cache.boolean_search("sustainability AND waste")
+        self.assertEqual(cache.boolean_search("Sustainability   and WASTE"), [0])
+        cache.ranked_search("waste energy")
+        cache.ranked_search("Waste, energy!")
+
+        stats = cache.stats()["results"]
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+        # The second query of each pair never touched the postings
+        self.assertEqual(cache.stats()["postings"]["entries"], 3)
+
+    def test_postings_cache_shared_between_engines(self):
+        cache = QueryCache(build())
+        cache.boolean_search("waste")
+        cache.ranked_search("waste")
+        self.assertGreaterEqual(cache.stats()["postings"]["hits"], 1)
+
+    def test_invalidated_on_new_documents(self):
+        idx = build()
+        cache = QueryCache(idx)
+        self.assertEqual(cache.boolean_search("energy"), [2])
+        before = cache.ranked_search("energy")
+
+        idx.add_document(["energy", "energy"], "http://example.com/3.pdf")
+        self.assertEqual(cache.boolean_search("energy"), [2, 3])
+        self.assertNotEqual(cache.ranked_search("energy"), before)
+        self.assertEqual(cache.boolean_search("NOT energy"), [0, 1])
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_invalidated_when_postings_see_the_change_first(self):
+        idx = build()
+        cache = QueryCache(idx)
+        self.assertEqual(cache.boolean_search("energy"), [2])
+
+        idx.add_document(["energy"], "http://example.com/3.pdf")
+        # A postings lookup notices the new version before the query layer does
+        self.assertEqual(list(cache.index.doc_ids("energy")), [2, 3])
+        self.assertEqual(cache.boolean_search("energy"), [2, 3])
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_result_of_old_version_not_served_after_change(self):
+        idx = build()
+        cache = QueryCache(idx)
+        evaluate = cache.boolean.evaluate
+
+        def racing_evaluate(tree):
+            result = list(evaluate(tree))
+            # Another thread adds a document and its query invalidates the
+            # caches before this (now stale) result is stored
+            idx.add_document(["energy"], "http://example.com/3.pdf")
+            cache.index.check_version()
+            return result
+
+        with mock.patch.object(cache.boolean, "evaluate", racing_evaluate):
+            self.assertEqual(cache.boolean_search("energy"), [2])
+        self.assertEqual(cache.boolean_search("energy"), [2, 3])
+
+    def test_invalidated_on_segment_delete(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            segmented = SegmentedIndex(os.path.join(tmp, "segments"), background_merge=False)
+            segmented.add_document(["waste"], "http://example.com/a.pdf")
+            segmented.add_document(["waste"], "http://example.com/b.pdf")
+            cache = QueryCache(segmented)
+            self.assertEqual(cache.boolean_search("waste"), [0, 1])
+
+            segmented.delete_document("http://example.com/a.pdf")
+            self.assertEqual(cache.boolean_search("waste"), [1])
+            segmented.close()
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_postings_bound(self):
+        cache = QueryCache(build(), postings_bytes=200)
+        for term in ["waste", "energy", "recycling", "sustainability"]:
+            cache.boolean_search(term)
+        stats = cache.stats()["postings"]
+        self.assertLessEqual(stats["bytes"], 200)
+        self.assertGreater(stats["evictions"], 0)
+
+    def test_postings_bound_over_json_index(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "index.json")
+            save_index_json(build(), path)
+            index, docs = load_index_json(path)
+            cache = QueryCache(index, docs, postings_bytes=200)
+            for term in ["waste", "energy", "recycling", "sustainability"]:
+                cache.boolean_search(term)
+            self.assertEqual(cache.boolean_search("waste OR energy"), [0, 1, 2])
+            # Evicted postings are not kept anywhere else
+            self.assertEqual(vars(cache.index.index).keys(), {"index", "docs", "terms"})
+            self.assertLessEqual(cache.stats()["postings"]["bytes"], 200)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import math
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from index.binary_storage import BinaryIndex, save_index_binary
+from index.forward import save_forward_index
+from index.indexer import Indexer
+from index.storage import load_index_json, save_index_json
+from queries.ranking import RankedSearcher
+
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo"]
+VOCAB = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+
+def build_random(n_docs=400, seed=7):
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCAB))]
+    idx = Indexer()
+    for i in range(n_docs):
+        tokens = rng.choices(VOCAB, weights=weights, k=rng.randint(5, 120))
+        idx.add_document(tokens, f"http://example.com/{i}.pdf")
+    return idx
+
+
+def random_queries(n=60, seed=11):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        # Mix of common (low rank) and rare terms
+        terms = [VOCAB[min(int(rng.expovariate(0.05)), len(VOCAB) - 1)] for _ in range(rng.randint(1, 4))]
+        queries.append(" ".join(terms))
+    return queries
+
+
+class TestRanking(unittest.TestCase):
+
+    def test_bm25_matches_formula(self):
+        idx = Indexer()
+        idx.add_document(["waste", "waste", "energy"], "http://example.com/a.pdf")
+        idx.add_document(["energy"], "http://example.com/b.pdf")
+        searcher = RankedSearcher(idx)
+
+        n, df, avg_length = 2, 1, 2.0
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        expected = idf * 2 * 2.2 / (2 + 1.2 * (1 - 0.75 + 0.75 * 3 / avg_length))
+
+        results = searcher.search("waste", k=10)
+        self.assertEqual([doc_id for doc_id, _ in results], [0])
+        self.assertAlmostEqual(results[0][1], expected)
+        self.assertEqual(searcher.search_urls("waste")[0][0], "http://example.com/a.pdf")
+
+    def test_tfidf_is_cosine(self):
+        idx = Indexer()
+        idx.add_document(["waste", "energy"], "http://example.com/a.pdf")
+        idx.add_document(["energy", "solar"], "http://example.com/b.pdf")
+        idx.add_document(["zoning"], "http://example.com/c.pdf")
+        searcher = RankedSearcher(idx, scoring="tfidf")
+
+        # Same terms as document 0: cosine 1
+        results = searcher.search("waste energy")
+        self.assertEqual(results[0][0], 0)
+        self.assertAlmostEqual(results[0][1], 1.0)
+        self.assertLess(results[1][1], 1.0)
+
+    def test_pruned_equals_exhaustive(self):
+        idx = build_random()
+        for scoring in ("bm25", "tfidf"):
+            searcher = RankedSearcher(idx, scoring=scoring)
+            for query in random_queries():
+                for k in (1, 3, 10):
+                    with self.subTest(scoring=scoring, query=query, k=k):
+                        self.assertEqual(
+                            searcher.search(query, k),
+                            searcher.search(query, k, prune=False)
+                        )
+
+    def test_common_terms_skip_postings(self):
+        idx = build_random(n_docs=1500)
+        searcher = RankedSearcher(idx)
+        query = f"{VOCAB[0]} {VOCAB[40]}"   # in ~all documents + in ~1 in 4
+
+        searcher.search(query, k=10, prune=False)
+        exhaustive = searcher.last_stats["scored"]
+        searcher.search(query, k=10)
+        self.assertLess(searcher.last_stats["scored"], exhaustive / 2)
+
+    def test_other_index_types(self):
+        idx = build_random(n_docs=150)
+        expected = RankedSearcher(idx).search("kakaka lololo mimimi", k=5)
+
+        tmp = tempfile.mkdtemp()
+        try:
+            json_path = os.path.join(tmp, "index.json")
+            save_index_json(idx, json_path)
+            index, docs = load_index_json(json_path)
+            self.assertEqual(RankedSearcher(index, docs).search("kakaka lololo mimimi", k=5), expected)
+
+            save_index_binary(idx, os.path.join(tmp, "bin"))
+            with BinaryIndex(os.path.join(tmp, "bin")) as binary:
+                self.assertEqual(RankedSearcher(binary).search("kakaka lololo mimimi", k=5), expected)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_forward_index_norms(self):
+        idx = build_random(n_docs=150)
+        tmp = tempfile.mkdtemp()
+        try:
+            forward_path = os.path.join(tmp, "forward.bin")
+            save_forward_index(idx, forward_path)
+            direct = RankedSearcher(idx, scoring="tfidf").search("kakaka lokaka", k=10)
+            from_forward = RankedSearcher(idx, scoring="tfidf", forward_path=forward_path).search("kakaka lokaka", k=10)
+            self.assertEqual([d for d, _ in direct], [d for d, _ in from_forward])
+            for (_, a), (_, b) in zip(direct, from_forward):
+                self.assertAlmostEqual(a, b)
+
+            # Any index the Boolean engine accepts, e.g. a loaded JSON index
+            json_path = os.path.join(tmp, "index.json")
+            save_index_json(idx, json_path)
+            index, docs = load_index_json(json_path)
+            from_json = RankedSearcher(index, docs, scoring="tfidf", forward_path=forward_path).search("kakaka lokaka", k=10)
+            self.assertEqual([d for d, _ in from_json], [d for d, _ in direct])
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_edge_cases(self):
+        searcher = RankedSearcher(build_random(n_docs=20))
+        self.assertEqual(searcher.search("missingterm"), [])
+        self.assertEqual(searcher.search("the and of"), [])
+        self.assertEqual(searcher.search("kakaka", k=0), [])
+        with self.assertRaises(ValueError):
+            RankedSearcher(Indexer(), scoring="pagerank")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
 import unittest
+from unittest import mock
 from crawler.robots import RobotsTxt
 
+
+def offline_robots(seed_url, **kwargs):
+    # Build a RobotsTxt without fetching robots.txt over the network
+    with mock.patch.object(RobotsTxt, "_fetch_and_parse"):
+        return RobotsTxt(seed_url, **kwargs)
+
 class TestRobots(unittest.TestCase):
 
     def test_robots_fetch(self):
@@ -23,6 +30,42 @@ class TestRobots(unittest.TestCase):
         r.allowed_paths.append("/data/public")
         self.assertTrue(r.is_allowed("https://example.com/data/public/abc"))
 
+    def test_longest_match_wins(self):
+        r = offline_robots("https://example.com/")
+        r.allowed_paths.append("/data")
+        r.disallowed_paths.append("/data/private")
+        self.assertTrue(r.is_allowed("https://example.com/data/x"))
+        self.assertFalse(r.is_allowed("https://example.com/data/private/x"))
+
+    def test_wildcards(self):
+        r = offline_robots("https://example.com/")
+        r.disallowed_paths.extend(["/*.pdf$", "/search*q="])
+        self.assertFalse(r.is_allowed("https://example.com/a/b/file.pdf"))
+        self.assertTrue(r.is_allowed("https://example.com/a/b/file.pdf?x=1"))
+        self.assertFalse(r.is_allowed("https://example.com/search?q=waste"))
+        self.assertTrue(r.is_allowed("https://example.com/search"))
+
+    def test_user_agent_groups_and_crawl_delay(self):
+        r = offline_robots("https://example.com/", user_agent="SpectrumCrawler")
+        r._parse_robots_text(
+            "User-agent: *\n"
+            "Disallow: /\n"
+            "\n"
+            "User-agent: OtherBot\n"
+            "User-agent: spectrumcrawler\n"
+            "Disallow: /cgi/\n"
+            "Crawl-delay: 2.5\n"
+        )
+        self.assertTrue(r.is_allowed("https://example.com/view/"))
+        self.assertFalse(r.is_allowed("https://example.com/cgi/users"))
+        self.assertEqual(r.crawl_delay, 2.5)
+
+    def test_star_group_fallback(self):
+        r = offline_robots("https://example.com/", user_agent="SpectrumCrawler")
+        r._parse_robots_text("User-agent: OtherBot\nDisallow: /\n\nUser-agent: *\nDisallow: /cgi/\n")
+        self.assertTrue(r.is_allowed("https://example.com/view/"))
+        self.assertFalse(r.is_allowed("https://example.com/cgi/"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,56 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from index.indexer import Indexer
+from index.storage import save_index_json
+from queries.run_queries import main
+
+
+class TestRunQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        idx = Indexer()
+        idx.add_document(["sustainability", "waste"], "http://example.com/0.pdf")
+        idx.add_document(["waste", "recycling"], "http://example.com/1.pdf")
+        idx.add_document(["energy"], "http://example.com/2.pdf")
+        self.index_path = os.path.join(self.tmp, "index.json")
+        save_index_json(idx, self.index_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def read(self, name):
+        with open(os.path.join(self.tmp, name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_default_terms(self):
+        main(["--index", self.index_path, "--out-dir", self.tmp])
+        self.assertEqual(self.read("sustainability_docs.txt"), "0\thttp://example.com/0.pdf\n")
+        self.assertEqual(self.read("my_collection.txt").count("\n"), 2)
+
+    def test_terms_from_arguments(self):
+        main(["energy", "Waste/Recycling", "--index", self.index_path, "--out-dir", self.tmp])
+
+        self.assertEqual(self.read("energy_docs.txt"), "2\thttp://example.com/2.pdf\n")
+        # Tokenized like the documents: both words, no path separator
+        self.assertEqual(self.read("waste_recycling_docs.txt"), "1\thttp://example.com/1.pdf\n")
+        self.assertEqual(self.read("my_collection.txt"), "1\thttp://example.com/1.pdf\n2\thttp://example.com/2.pdf\n")
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, "waste_docs.txt")))
+
+    def test_query_file_goes_to_one_file(self):
+        queries = os.path.join(self.tmp, "queries.txt")
+        with open(queries, "w", encoding="utf-8") as f:
+            f.write("# one query per line\nwaste/energy\nq2\twaste recycling\n")
+        with mock.patch("sys.stderr", io.StringIO()):
+            main(["--queries", queries, "--index", self.index_path, "--out-dir", self.tmp])
+
+        self.assertEqual(self.read("query_results.txt"), "q2\t1\thttp://example.com/1.pdf\n")
+        self.assertEqual(sorted(os.listdir(self.tmp)), ["index.json", "queries.txt", "query_results.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
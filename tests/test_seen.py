@@ -0,0 +1,79 @@
+import unittest
+from crawler.seen import (
+    BloomFilter,
+    FingerprintSet,
+    ScalableBloomFilter,
+    make_seen_set,
+    seen_from_state,
+    seen_to_state,
+)
+
+
+class TestFingerprintSet(unittest.TestCase):
+
+    def test_add_and_contains(self):
+        seen = FingerprintSet(capacity=4)
+        urls = [f"https://example.com/page/{i}" for i in range(5000)]
+
+        self.assertTrue(all(seen.add(url) for url in urls))
+        self.assertFalse(seen.add(urls[123]))
+        self.assertEqual(len(seen), 5000)
+        self.assertIn(urls[4999], seen)
+        self.assertNotIn("https://example.com/other", seen)
+
+    def test_round_trip(self):
+        seen = FingerprintSet()
+        for i in range(100):
+            seen.add(f"u{i}")
+
+        restored = seen_from_state(seen_to_state(seen))
+        self.assertEqual(len(restored), 100)
+        self.assertIn("u42", restored)
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=2000, error_rate=1e-3)
+        urls = [f"https://example.com/page/{i}" for i in range(2000)]
+        for url in urls:
+            bloom.add(url)
+
+        self.assertTrue(all(url in bloom for url in urls))
+        false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(2000))
+        self.assertLess(false_positives, 20)
+
+    def test_round_trip(self):
+        bloom = BloomFilter(capacity=100)
+        bloom.add("a")
+        restored = seen_from_state(seen_to_state(bloom))
+        self.assertIn("a", restored)
+        self.assertFalse(restored.add("a"))
+
+
+class TestScalableBloomFilter(unittest.TestCase):
+
+    def test_grows_past_capacity(self):
+        bloom = make_seen_set("bloom", capacity=100, error_rate=1e-3)
+        self.assertIsInstance(bloom, ScalableBloomFilter)
+        urls = [f"https://example.com/page/{i}" for i in range(5000)]
+        added = sum(bloom.add(url) for url in urls)
+        self.assertGreater(added, 4975)   # a few false positives at most
+
+        self.assertGreater(len(bloom.filters), 1)
+        self.assertTrue(all(url in bloom for url in urls))
+        false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(5000))
+        self.assertLess(false_positives, 25)
+
+    def test_round_trip(self):
+        bloom = ScalableBloomFilter(capacity=10)
+        for i in range(50):
+            bloom.add(f"u{i}")
+        restored = seen_from_state(seen_to_state(bloom))
+        self.assertEqual(len(restored.filters), len(bloom.filters))
+        self.assertEqual(len(restored), len(bloom))
+        self.assertFalse(restored.add("u42"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from index.segments import SegmentedIndex
+
+
+class TestSegmentedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def open(self, **kwargs):
+        kwargs.setdefault("background_merge", False)
+        return SegmentedIndex(self.tmp, **kwargs)
+
+    def test_add_query_across_segments_and_buffer(self):
+        idx = self.open()
+        idx.add_document(["waste", "energy"], "http://example.com/a.pdf")
+        idx.commit()
+        idx.add_document(["waste", "waste"], "http://example.com/b.pdf")
+
+        self.assertEqual(list(idx.doc_ids("waste")), [0, 1])
+        self.assertEqual(list(idx.iter_postings("waste")), [(0, 1), (1, 2)])
+        self.assertEqual(idx.terms(), {"waste", "energy"})
+        self.assertEqual(idx.total_docs(), 2)
+        self.assertEqual(idx.stats()["segments"], 1)
+
+    def test_update_and_delete_by_url(self):
+        idx = self.open()
+        idx.add_document(["waste"], "http://example.com/a.pdf")
+        idx.add_document(["energy"], "http://example.com/b.pdf")
+        idx.commit()
+
+        new_id = idx.update_document(["solar"], "http://example.com/a.pdf")
+        self.assertEqual(new_id, 2)
+        self.assertEqual(list(idx.doc_ids("waste")), [])
+        self.assertEqual(list(idx.doc_ids("solar")), [2])
+        self.assertEqual(idx.document("http://example.com/a.pdf")["length"], 1)
+
+        self.assertTrue(idx.delete_document("http://example.com/b.pdf"))
+        self.assertFalse(idx.delete_document("http://example.com/missing.pdf"))
+        self.assertEqual(list(idx.doc_ids("energy")), [])
+        self.assertEqual(set(idx.get_docs()), {2})
+
+    def test_doc_ids_persist_across_reopen(self):
+        idx = self.open()
+        idx.add_document(["waste"], "http://example.com/a.pdf")
+        idx.add_document(["energy"], "http://example.com/b.pdf")
+        idx.delete_document("http://example.com/a.pdf")
+        idx.close()
+
+        idx = self.open()
+        self.assertEqual(list(idx.doc_ids("waste")), [])
+        self.assertEqual(idx.add_document(["waste"], "http://example.com/c.pdf"), 2)
+        self.assertEqual(idx.total_docs(), 2)
+
+        # Uncommitted documents are not persisted
+        idx = self.open()
+        self.assertEqual(idx.next_doc_id, 2)
+
+    def test_merge_policy_compacts_and_purges_tombstones(self):
+        idx = self.open(merge_factor=3)
+        for i in range(9):
+            idx.add_document(["waste", f"t{i}"], f"http://example.com/{i}.pdf")
+            idx.commit()
+        idx.merge_all()
+
+        # 9 one-doc segments -> 3 three-doc segments -> 1 segment
+        self.assertEqual(idx.stats()["segments"], 1)
+        self.assertEqual(idx.merges, 4)
+        self.assertEqual(list(idx.doc_ids("waste")), list(range(9)))
+        segment_files = [n for n in os.listdir(self.tmp) if n.startswith("seg_")]
+        self.assertEqual(len(segment_files), 1)
+
+        # A deleted document is dropped for good when its segment is merged
+        idx.delete_document("http://example.com/4.pdf")
+        for i in range(9, 11):
+            idx.add_document(["waste"], f"http://example.com/{i}.pdf")
+            idx.commit()
+        idx.add_document(["waste"], "http://example.com/11.pdf")
+        idx.commit()
+        idx.merge_all()
+        self.assertEqual(idx.stats()["tombstones"], 1)   # big segment not merged yet
+
+        idx = self.open(merge_factor=3)
+        self.assertEqual(list(idx.doc_ids("waste")), [0, 1, 2, 3, 5, 6, 7, 8, 9, 10, 11])
+        self.assertEqual(list(idx.doc_ids("t4")), [])
+
+    def test_merge_purges_tombstones(self):
+        idx = self.open(merge_factor=2)
+        idx.add_document(["waste"], "http://example.com/a.pdf")
+        idx.add_document(["energy"], "http://example.com/b.pdf")
+        idx.commit()
+        idx.add_document(["waste"], "http://example.com/c.pdf")
+        idx.add_document(["waste"], "http://example.com/d.pdf")
+        idx.delete_document("http://example.com/a.pdf")
+        idx.commit()
+        idx.merge_all()
+
+        stats = idx.stats()
+        self.assertEqual(stats["segments"], 1)
+        self.assertEqual(stats["tombstones"], 0)
+        self.assertEqual(list(idx.doc_ids("waste")), [2, 3])
+        self.assertNotIn(0, idx.get_docs())
+
+    def test_background_merge(self):
+        idx = self.open(merge_factor=2, background_merge=True)
+        for i in range(4):
+            idx.add_document(["waste"], f"http://example.com/{i}.pdf")
+            idx.commit()
+        idx.close()
+        idx.wait_for_merges()
+
+        self.assertEqual(idx.stats()["segments"], 1)
+        self.assertEqual(list(idx.doc_ids("waste")), [0, 1, 2, 3])
+
+    def test_queries_run_alongside_adds(self):
+        # Nothing is committed, so every read goes through the live buffer
+        idx = self.open(max_buffered_docs=100000)
+        done = threading.Event()
+        errors = []
+
+        def write():
+            for i in range(40000):
+                idx.add_document(["waste", f"a{i}", f"b{i}", "waste"], f"http://example.com/{i}.pdf")
+            done.set()
+
+        def read():
+            try:
+                while not done.is_set():
+                    docs = idx.get_docs()
+                    postings = list(idx.iter_postings("waste"))
+                    idx.terms()
+                    # Every posting is whole: tf 2, ascending doc IDs
+                    self.assertTrue(all(tf == 2 for _, tf in postings))
+                    ids = [doc_id for doc_id, _ in postings]
+                    self.assertEqual(ids, sorted(ids))
+                    self.assertTrue(all(meta["length"] == 4 for meta in docs.values()))
+            except Exception as e:
+                errors.append(e)
+                done.set()
+
+        # Switch threads often so reads land in the middle of adds
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            writer = threading.Thread(target=write)
+            reader = threading.Thread(target=read)
+            reader.start()
+            writer.start()
+            writer.join()
+            reader.join()
+        finally:
+            sys.setswitchinterval(interval)
+        idx.close()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(list(idx.doc_ids("waste")), list(range(40000)))
+
+
+if __name__ == "__main__":
+    unittest.main()
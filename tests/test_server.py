@@ -0,0 +1,162 @@
+import asyncio
+import io
+import json
+import unittest
+from unittest import mock
+from index.indexer import Indexer
+from queries.ranking import RankedSearcher
+from queries.server import SearchServer, percentiles
+
+
+def build():
+    idx = Indexer()
+    idx.add_document(["sustainability", "waste"], "http://example.com/0.pdf")
+    idx.add_document(["waste", "recycling", "waste"], "http://example.com/1.pdf")
+    idx.add_document(["sustainability", "energy"], "http://example.com/2.pdf")
+    return idx
+
+
+async def request(port, method, path, body=None, reader_writer=None):
+    """
+    Send one HTTP request to 127.0.0.1:port; returns (status, JSON payload).
+    """
+    reader, writer = reader_writer or await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    connection = "keep-alive" if reader_writer else "close"
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: {connection}\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    payload = json.loads(await reader.readexactly(length))
+    if reader_writer is None:
+        writer.close()
+    return status, payload
+
+
+class TestSearchServer(unittest.TestCase):
+
+    def run_with_server(self, scenario):
+        async def main():
+            server = SearchServer(build(), port=0)
+            await server.start()
+            try:
+                return await scenario(server.port)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+
+    def test_endpoints(self):
+        async def scenario(port):
+            status, term = await request(port, "GET", "/term?q=Waste")
+            self.assertEqual(status, 200)
+            self.assertEqual(term["count"], 2)
+            self.assertEqual(term["results"][0], {"doc_id": 0, "url": "http://example.com/0.pdf"})
+
+            _, boolean = await request(port, "GET", "/boolean?q=sustainability%20AND%20NOT%20waste")
+            self.assertEqual([r["doc_id"] for r in boolean["results"]], [2])
+
+            _, ranked = await request(port, "POST", "/ranked", {"q": "waste", "k": 1})
+            expected = RankedSearcher(build()).search("waste", k=1)
+            self.assertEqual([(r["doc_id"], r["score"]) for r in ranked["results"]], expected)
+
+            _, limited = await request(port, "GET", "/boolean?q=waste&limit=1")
+            self.assertEqual((limited["count"], len(limited["results"])), (2, 1))
+
+        self.run_with_server(scenario)
+
+    def test_batch_and_stats(self):
+        async def scenario(port):
+            status, batch = await request(port, "POST", "/batch", {"queries": [
+                {"endpoint": "term", "q": "energy"},
+                {"endpoint": "boolean", "q": "waste OR energy"},
+                {"endpoint": "ranked", "q": "waste", "k": 5},
+                {"endpoint": "boolean", "q": "(waste"},
+                {"endpoint": "nope", "q": "waste"},
+            ]})
+            self.assertEqual(status, 200)
+            results = batch["results"]
+            self.assertEqual(results[0]["count"], 1)
+            self.assertEqual(results[1]["count"], 3)
+            self.assertEqual(len(results[2]["results"]), 2)
+            self.assertIn("error", results[3])
+            self.assertIn("error", results[4])
+
+            _, stats = await request(port, "GET", "/stats")
+            self.assertEqual(stats["endpoints"]["batch"]["count"], 1)
+            self.assertIn("p99_ms", stats["endpoints"]["batch"])
+            self.assertIn("results", stats["cache"])
+
+        self.run_with_server(scenario)
+
+    def test_errors(self):
+        async def scenario(port):
+            self.assertEqual((await request(port, "GET", "/missing"))[0], 404)
+            self.assertEqual((await request(port, "GET", "/batch"))[0], 405)
+            self.assertEqual((await request(port, "GET", "/boolean"))[0], 400)
+            self.assertEqual((await request(port, "GET", "/boolean?q=waste%20AND"))[0], 400)
+            self.assertEqual((await request(port, "GET", "/ranked?q=waste&k=many"))[0], 400)
+            self.assertEqual((await request(port, "GET", "/term?q=waste%20energy"))[0], 400)
+
+        self.run_with_server(scenario)
+
+    def test_unexpected_errors_return_500(self):
+        async def scenario(port):
+            # k too large for an int: a client error, not a crash
+            status, _ = await request(port, "POST", "/ranked", {"q": "waste", "k": 1e309})
+            self.assertEqual(status, 400)
+
+            with mock.patch.object(SearchServer, "_describe", side_effect=KeyError(7)), \
+                    mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                status, payload = await request(port, "GET", "/term?q=waste")
+                _, batch = await request(port, "POST", "/batch", {"queries": [
+                    {"endpoint": "boolean", "q": "waste"},
+                    {"endpoint": "ranked", "q": "waste"},
+                ]})
+            self.assertEqual(status, 500)
+            self.assertEqual(payload, {"error": "internal server error"})
+            self.assertEqual(batch["results"][0], {"error": "internal server error"})
+            self.assertIn("KeyError", stderr.getvalue())
+
+            # The server is still up
+            self.assertEqual((await request(port, "GET", "/term?q=waste"))[0], 200)
+
+        self.run_with_server(scenario)
+
+    def test_concurrent_and_keep_alive(self):
+        async def scenario(port):
+            responses = await asyncio.gather(*[
+                request(port, "GET", f"/ranked?q={term}")
+                for term in ["waste", "energy", "sustainability", "recycling"] * 10
+            ])
+            self.assertTrue(all(status == 200 for status, _ in responses))
+
+            connection = await asyncio.open_connection("127.0.0.1", port)
+            for _ in range(3):
+                status, _ = await request(port, "GET", "/term?q=waste", reader_writer=connection)
+                self.assertEqual(status, 200)
+            connection[1].close()
+
+        self.run_with_server(scenario)
+
+    def test_percentiles(self):
+        stats = percentiles([i / 1000 for i in range(1, 101)])
+        self.assertEqual(stats["count"], 100)
+        self.assertAlmostEqual(stats["p50_ms"], 50)
+        self.assertAlmostEqual(stats["p99_ms"], 99)
+        self.assertAlmostEqual(stats["max_ms"], 100)
+        self.assertEqual(percentiles([]), {"count": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+from index.binary_storage import BinaryIndex
+from index.indexer import Indexer
+from index.spimi import SpimiIndexer
+from index.storage import load_index_json, save_index_json
+
+
+def documents(n=60):
+    words = ["waste", "energy", "solar", "policy", "water", "recycling", "urban", "climate"]
+    for i in range(n):
+        yield [words[(i * 7 + j * 3) % len(words)] for j in range(i % 11 + 1)] + [f"rare{i % 13}"]
+
+
+class TestSpimi(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.block_dir = os.path.join(self.tmp, "blocks")
+        self.out = os.path.join(self.tmp, "index.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def reference(self):
+        idx = Indexer()
+        for i, tokens in enumerate(documents()):
+            idx.add_document(tokens, f"http://example.com/{i}.pdf")
+        path = os.path.join(self.tmp, "reference.json")
+        save_index_json(idx, path)
+        return load_index_json(path)
+
+    def test_matches_in_memory_index(self):
+        spimi = SpimiIndexer(self.block_dir, memory_budget=2000)
+        for i, tokens in enumerate(documents()):
+            spimi.add_document(tokens, f"http://example.com/{i}.pdf")
+        stats = spimi.finish(self.out)
+
+        self.assertGreater(stats["blocks"], 3)
+        self.assertEqual(stats["documents"], 60)
+        self.assertLessEqual(stats["peak_memory_bytes"], 2000 + 2000)
+        self.assertEqual(load_index_json(self.out), self.reference())
+        self.assertFalse(os.path.exists(os.path.join(self.block_dir, "manifest.json")))
+
+    def test_compressed_output(self):
+        spimi = SpimiIndexer(self.block_dir, memory_budget=1500)
+        for i, tokens in enumerate(documents()):
+            spimi.add_document(tokens, f"http://example.com/{i}.pdf")
+        spimi.finish(self.out, compress=True)
+
+        self.assertEqual(load_index_json(self.out), self.reference())
+
+    def test_binary_output_from_the_same_merge(self):
+        spimi = SpimiIndexer(self.block_dir, memory_budget=2000)
+        for i, tokens in enumerate(documents()):
+            spimi.add_document(tokens, f"http://example.com/{i}.pdf")
+        binary_dir = os.path.join(self.tmp, "bin")
+        spimi.finish(self.out, binary_dir=binary_dir)
+
+        index, docs = self.reference()
+        with BinaryIndex(binary_dir) as binary:
+            self.assertEqual(list(binary), sorted(index))
+            for term, postings in index.items():
+                self.assertEqual(dict(binary[term]), {int(d): tf for d, tf in postings.items()})
+                self.assertEqual(binary.doc_freq(term), len(postings))
+            self.assertEqual({str(d): dict(meta) for d, meta in binary.docs.items()}, docs)
+
+    def test_resume_after_crash(self):
+        docs = list(documents())
+        spimi = SpimiIndexer(self.block_dir, memory_budget=2000)
+        for i, tokens in enumerate(docs[:40]):
+            spimi.add_document(tokens, f"http://example.com/{i}.pdf")
+        flushed = spimi.stats()["blocks"]
+        spimi.close()   # crash: the unflushed block is lost
+
+        spimi = SpimiIndexer(self.block_dir, memory_budget=2000)
+        self.assertTrue(spimi.resumed)
+        self.assertEqual(len(spimi.blocks), flushed)
+        for i in range(spimi.next_doc_id, len(docs)):
+            spimi.add_document(docs[i], f"http://example.com/{i}.pdf")
+        spimi.finish(self.out)
+
+        self.assertEqual(load_index_json(self.out), self.reference())
+
+    def test_fresh_build_ignores_old_blocks(self):
+        spimi = SpimiIndexer(self.block_dir, memory_budget=500)
+        for tokens in documents(20):
+            spimi.add_document(tokens, "http://example.com/old.pdf")
+        spimi.close()
+
+        spimi = SpimiIndexer(self.block_dir, memory_budget=500, resume=False)
+        self.assertFalse(spimi.resumed)
+        spimi.add_document(["waste"], "http://example.com/new.pdf")
+        spimi.finish(self.out)
+
+        index, docs = load_index_json(self.out)
+        self.assertEqual(index, {"waste": {"0": 1}})
+        self.assertEqual(docs, {"0": {"url": "http://example.com/new.pdf", "length": 1}})
+
+
+if __name__ == "__main__":
+    unittest.main()
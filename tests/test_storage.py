@@ -18,6 +18,23 @@ class TestStorage(unittest.TestCase):
 
         os.remove("tests/tmp_index.json")
 
+    def test_save_and_load_compressed_json(self):
+        idx = Indexer()
+        idx.add_document(["waste", "management", "waste"], "http://example.com/a")
+        idx.add_document(["waste"], "http://example.com/b")
+
+        save_index_json(idx, "tests/tmp_index.json")
+        plain_index, _ = load_index_json("tests/tmp_index.json")
+        save_index_json(idx, "tests/tmp_index.json", compress=True)
+        index, docs = load_index_json("tests/tmp_index.json")
+        raw, _ = load_index_json("tests/tmp_index.json", decode=False)
+        os.remove("tests/tmp_index.json")
+
+        self.assertEqual(index, plain_index)
+        self.assertEqual(index["waste"], {"0": 2, "1": 1})
+        self.assertEqual(docs["1"]["url"], "http://example.com/b")
+        self.assertIsInstance(raw["waste"], bytes)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import unittest
+
+from crawler.throttle import HostThrottle
+
+
+def run_requests(throttle, urls, duration=0.02):
+    """
+    Send one fake request per URL concurrently through the throttle.
+    Returns ({host: peak in-flight requests}, {host: [start times]}).
+    """
+    in_flight = {}
+    peak = {}
+    starts = {}
+
+    async def request(url):
+        host = url.split("/")[2]
+        await throttle.acquire(url)
+        try:
+            starts.setdefault(host, []).append(time.monotonic())
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+            await asyncio.sleep(duration)
+            in_flight[host] -= 1
+        finally:
+            throttle.release(url)
+
+    async def main():
+        await asyncio.gather(*(request(url) for url in urls))
+
+    asyncio.run(main())
+    return peak, starts
+
+
+def gaps(times):
+    return [b - a for a, b in zip(times, times[1:])]
+
+
+class TestHostThrottle(unittest.TestCase):
+
+    def test_peak_concurrency_per_host(self):
+        urls = [f"http://a.org/{i}" for i in range(8)] + [f"http://b.org/{i}" for i in range(8)]
+        peak, _ = run_requests(HostThrottle(per_host_concurrency=2), urls)
+        self.assertEqual(peak, {"a.org": 2, "b.org": 2})
+
+    def test_default_is_one_request_per_host(self):
+        peak, _ = run_requests(HostThrottle(), [f"http://a.org/{i}" for i in range(4)])
+        self.assertEqual(peak, {"a.org": 1})
+
+    def test_delay_between_request_starts(self):
+        throttle = HostThrottle(per_host_concurrency=4, per_host_delay=0.05)
+        _, starts = run_requests(throttle, [f"http://a.org/{i}" for i in range(4)], duration=0)
+        for gap in gaps(starts["a.org"]):
+            self.assertGreaterEqual(gap, 0.045)
+
+    def test_host_delay_override(self):
+        throttle = HostThrottle(per_host_concurrency=4)
+        throttle.set_delay("slow.org", 0.05)
+        urls = [f"http://slow.org/{i}" for i in range(3)] + [f"http://fast.org/{i}" for i in range(3)]
+        _, starts = run_requests(throttle, urls, duration=0)
+        self.assertTrue(all(gap >= 0.045 for gap in gaps(starts["slow.org"])))
+        self.assertLess(starts["fast.org"][-1] - starts["fast.org"][0], 0.04)
+
+    def test_blocking_wait(self):
+        throttle = HostThrottle(per_host_delay=0.05)
+        starts = []
+        for i in range(3):
+            throttle.wait(f"http://a.org/{i}")
+            starts.append(time.monotonic())
+        self.assertTrue(all(gap >= 0.045 for gap in gaps(starts)))
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            HostThrottle(per_host_concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
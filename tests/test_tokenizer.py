@@ -18,6 +18,27 @@ class TestTokenizer(unittest.TestCase):
         self.assertIn("hello", tokens)
         self.assertIn("world", tokens)
 
+    def test_tokenize_many(self):
+        t = Tokenizer()
+        batches = list(t.tokenize_many(["Waste Management", "", "the SUSTAINABILITY"]))
+        self.assertEqual(batches, [["waste", "management"], [], ["sustainability"]])
+
+    def test_stream_matches_tokenize(self):
+        t = Tokenizer()
+        text = "Recycling of e-waste, in 2024: plastics & metals... The END"
+        expected = t.tokenize(text)
+        for size in (1, 3, 7, 64):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertEqual(list(t.tokenize_stream(chunks)), expected)
+
+    def test_stemming_cache(self):
+        t = Tokenizer(use_stemming=True)
+        tokens = t.tokenize("recycling recycled recycling recycling")
+        self.assertEqual(tokens, ["recycl"] * 4)
+        info = t.stem_cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 2)
+
 
 if __name__ == "__main__":
     unittest.main()